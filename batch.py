@@ -0,0 +1,219 @@
+import argparse
+import os
+import re
+import sys
+import time
+
+try:
+    from concurrent import futures
+    from concurrent.futures.process import BrokenProcessPool
+except ImportError:
+    futures = None
+
+from src import pipeline
+
+
+FIELDS = ['inputFile', 'outputFile', 'status', 'error', 'readsCount', 'contigsCount', 'length', 'tier', 'isTested', 'time']
+
+# outputs of earlier runs in the same folder, not inputs
+OUTPUT_SUFFIXES = ('_assembled', '_stats', '_reference')
+
+
+def isInputFile(fileName):
+    """Checks if a file in a folder is an input FASTA file, not an output of an earlier run
+
+    Args:
+        fileName (string): Name of file
+
+    Returns:
+        bool
+    """
+    name = os.path.basename(fileName)
+    if name.endswith('.gz'):
+        name = name[:-len('.gz')]
+    (name, extension) = os.path.splitext(name)
+    return extension in ('.txt', '.fa', '.fasta', '.fna') and not name.endswith(OUTPUT_SUFFIXES)
+
+
+def findInputFiles(paths, manifestFile=None):
+    """Lists input files from file names, folders, and a manifest
+
+    Args:
+        paths (:obj:`list` of string): Input files, or folders of input files (see :func:`isInputFile`)
+        manifestFile (:obj:`string`, optional): File listing an input file on each line; empty lines and lines starting with "#" are skipped
+
+    Returns:
+        :obj:`list` of string: Names of input files, each only once, in the given order
+    """
+    paths = list(paths)
+    if manifestFile is not None:
+        with open(manifestFile) as f:
+            paths.extend(line.strip() for line in f if len(line.strip()) and not line.startswith('#'))
+
+    inputFiles = []
+    for path in paths:
+        if os.path.isdir(path):
+            inputFiles.extend(
+                os.path.join(path, name)
+                for name in sorted(os.listdir(path))
+                if os.path.isfile(os.path.join(path, name)) and isInputFile(name)
+            )
+        else:
+            inputFiles.append(path)
+
+    seen = set()
+    return [fileName for fileName in inputFiles if not (fileName in seen or seen.add(fileName))]
+
+
+def findOutputDirectories(inputFiles, outputDirectory=None):
+    """Lists the folder of the output files of each input file, keeping the folders of the inputs below their common folder
+
+        Inputs of the same name in different folders, e.g. "a/x.txt" and "b/x.txt", are written to "outputDirectory/a/" and "outputDirectory/b/", so they do not overwrite each other.
+
+    Args:
+        inputFiles (:obj:`list` of string): Names of input FASTA files
+        outputDirectory (:obj:`string`, optional): Folder of the output files; next to each input file if not given
+
+    Returns:
+        :obj:`list` of string: Folder of the output files of each input file, or None if next to it
+    """
+    if outputDirectory is None:
+        return [None] * len(inputFiles)
+    inputDirectories = [os.path.dirname(os.path.abspath(inputFile)) for inputFile in inputFiles]
+    # common prefix of whole folder names, not of characters
+    baseDirectory = os.sep.join(os.path.commonprefix([inputDirectory.split(os.sep) for inputDirectory in inputDirectories])) or os.sep
+    return [os.path.normpath(os.path.join(outputDirectory, os.path.relpath(inputDirectory, baseDirectory))) for inputDirectory in inputDirectories]
+
+
+def recordFailure(inputFile, error, t0):
+    """Summary of a job that failed
+
+    Args:
+        inputFile (string): Name of input FASTA file
+        error (:obj:`Exception`): The error of the job
+        t0 (float): Start time of the job
+
+    Returns:
+        :obj:`dict`: Summary of the job, with keys of "FIELDS"
+    """
+    return {
+        'inputFile': inputFile,
+        'status': 'failure',
+        'error': re.sub('\033\\[[0-9;]*m', '', str(error) or type(error).__name__),
+        'time': round(time.time() - t0, 4)
+    }
+
+
+def runJob(inputFile, options, outputDirectory=None, isQuiet=True):
+    """Worker: assembles one file by :func:`pipeline.assembleFile`, recording its failure instead of raising
+
+    Args:
+        inputFile (string): Name of input FASTA file
+        options (:obj:`argparse.Namespace`): Options added by :func:`pipeline.addAssemblyArguments`
+        outputDirectory (:obj:`string`, optional): Folder of the output files; next to the input file if not given
+        isQuiet (:obj:`bool`, optional): Whether to hide the messages of the assembly
+
+    Returns:
+        :obj:`dict`: Summary of the job, with keys of "FIELDS"
+    """
+    t0 = time.time()
+    stdout = sys.stdout
+    if isQuiet:
+        sys.stdout = open(os.devnull, 'w')
+    try:
+        record = pipeline.assembleFile(inputFile, options, outputDirectory)
+        record.update({'status': 'success', 'error': ''})
+    except Exception as e:
+        record = recordFailure(inputFile, e, t0)
+    finally:
+        if isQuiet:
+            sys.stdout.close()
+            sys.stdout = stdout
+    record['time'] = round(record['time'], 4)
+    return record
+
+
+def iterJobs(inputFiles, options, outputDirectory=None, jobs=1, isQuiet=True):
+    """Runs :func:`runJob` on each file, in a pool of worker processes if more than 1 job
+
+    Args:
+        inputFiles (:obj:`list` of string): Names of input FASTA files
+        options (:obj:`argparse.Namespace`): Options added by :func:`pipeline.addAssemblyArguments`
+        outputDirectory (:obj:`string`, optional): Folder of the output files, keeping the folders of the inputs (see :func:`findOutputDirectories`); next to the input files if not given
+        jobs (:obj:`int`, optional): Number of worker processes
+        isQuiet (:obj:`bool`, optional): Whether to hide the messages of each assembly
+
+    Yields:
+        :obj:`dict`: Summary of each job, as soon as it finishes; if a worker process dies, the jobs not finished fail
+
+    Raises:
+        ImportError: When :mod:`concurrent.futures` is not available for more than 1 job
+    """
+    outputDirectories = findOutputDirectories(inputFiles, outputDirectory)
+    if jobs <= 1:
+        for (inputFile, jobDirectory) in zip(inputFiles, outputDirectories):
+            yield runJob(inputFile, options, jobDirectory, isQuiet)
+        return
+
+    if futures is None:
+        raise ImportError('\033[41mconcurrent.futures\033[0m is required for more than 1 job.')
+    t0 = time.time()
+    executor = futures.ProcessPoolExecutor(max_workers=jobs)
+    try:
+        pendingFutures = dict(
+            (executor.submit(runJob, inputFile, options, jobDirectory, isQuiet), inputFile)
+            for (inputFile, jobDirectory) in zip(inputFiles, outputDirectories)
+        )
+        for future in futures.as_completed(pendingFutures):
+            try:
+                record = future.result()
+            except BrokenProcessPool as e:
+                # the pool does not run any job after a worker died, each one left is failed
+                record = recordFailure(pendingFutures[future], e, t0)
+            yield record
+    finally:
+        executor.shutdown(wait=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='\033[92mFragment Assembly\033[0m of many FASTA files of reads in one process, each written to inputFile_assembled.ext', epilog='by \033[94mSiqi Tian\033[0m, 2017 for Driver.xyz challenge')
+    parser.add_argument('inputs', type=str, nargs='*', help='Input FASTA files, or folders of input FASTA files')
+    parser.add_argument('--manifest', type=str, default=None, help='File listing an input FASTA file on each line')
+    parser.add_argument('--jobs', type=int, default=1, help='Number of files to assemble in parallel worker processes (Python 3 only)')
+    parser.add_argument('--output-dir', type=str, default=None, help='Folder of the output files; next to each input file if not given')
+    parser.add_argument('--report', type=str, default='batch_report.csv', help='Summary of all files, JSON if it ends with .json, otherwise CSV')
+    parser.add_argument('--verbose', action='store_true', help='Show the messages of each assembly')
+    pipeline.addAssemblyArguments(parser)
+    args = parser.parse_args()
+
+    inputFiles = findInputFiles(args.inputs, args.manifest)
+    if not len(inputFiles):
+        parser.error('no input files')
+    for outputDirectory in set(findOutputDirectories(inputFiles, args.output_dir)):
+        if outputDirectory is not None and not os.path.isdir(outputDirectory):
+            os.makedirs(outputDirectory)
+    if args.jobs > 1 and args.workers > 1:
+        # workers of a job can not start their own pool
+        print('Files are assembled in parallel, ignoring \033[95m--workers\033[0m.')
+        args.workers = 1
+
+    t0 = time.time()
+    records = []
+    for record in iterJobs(inputFiles, args, args.output_dir, args.jobs, not args.verbose):
+        records.append(record)
+        if record['status'] == 'success':
+            print('[%s/%s] \033[92mSUCCESS\033[0m: (\033[94m%s\033[0m) in \033[95m%.2f s\033[0m, %s contigs by %s.' % (len(records), len(inputFiles), record['inputFile'], record['time'], record['contigsCount'], record['tier']))
+        else:
+            print('[%s/%s] \033[41mFAILURE\033[0m: (\033[94m%s\033[0m) in \033[95m%.2f s\033[0m, %s' % (len(records), len(inputFiles), record['inputFile'], record['time'], record['error']))
+
+    records.sort(key=lambda record: inputFiles.index(record['inputFile']))
+    pipeline.writeReport(args.report, records, FIELDS)
+    failuresCount = sum(1 for record in records if record['status'] != 'success')
+    print('Assembled \033[95m%s\033[0m files, \033[95m%s\033[0m failed.' % (len(records) - failuresCount, failuresCount))
+    print('Time elapsed: \033[95m%.2f s\033[0m.' % (time.time() - t0))
+    if failuresCount:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,204 @@
+import argparse
+import itertools
+import os
+import time
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+from src import assembly
+from src import assembly_graph
+from src import index
+from src import model
+from src import pipeline
+from src import simulate
+from src import test
+
+
+ENGINES = {
+    'recursive': assembly.assembleParts,
+    'iterative': assembly.assemblePartsIterative,
+    'graph': assembly_graph.assembleGraph
+}
+
+FIELDS = [
+    'seed', 'genomeLength', 'readLength', 'coverage', 'repeatFraction', 'duplicateRate', 'readsCount',
+    'engine', 'overlapTime', 'searchTime', 'totalTime', 'nodes', 'deadEnds', 'isExhausted', 'peakMemory',
+    'isCorrect', 'validateTime', 'isValid'
+]
+
+
+def parseList(text, convert):
+    """Parses a comma separated list of values
+
+    Args:
+        text (string): e.g. "1000,5000"
+        convert (:obj:`function`): Conversion of each value, e.g. int
+
+    Returns:
+        :obj:`list`
+    """
+    return [convert(value) for value in text.split(',') if len(value)]
+
+
+def runEngine(reads, engine, k=16, timeLimit=None):
+    """Assembles reads with an engine, from the reads in string
+
+    Args:
+        reads (:obj:`list` of string): The reads
+        engine (string): "greedy", or a key of "ENGINES"
+        k (:obj:`int`, optional): Length of seeds of :class:`SeedIndex`
+        timeLimit (:obj:`float`, optional): Time limit of the search in seconds (see :class:`BudgetedStateCache`)
+
+    Returns:
+        :obj:`dict` of {
+            'result': string or None,
+            'overlapTime': float,
+            'searchTime': float,
+            'nodes': int,
+            'deadEnds': int,
+            'isExhausted': bool
+        }
+    """
+    t0 = time.time()
+    readsList = model.initiateReadData(reads)
+    if engine == 'greedy':
+        # no overlap graph, and already tested
+        result = assembly.assembleGreedy(readsList)
+        return {'result': result, 'overlapTime': 0.0, 'searchTime': time.time() - t0, 'nodes': None, 'deadEnds': None, 'isExhausted': False}
+
+    overlapGraph = model.OverlapGraph(readsList, index.SeedIndex(reads, k))
+    t1 = time.time()
+    failedStates = assembly.BudgetedStateCache(timeLimit)
+    result = ENGINES[engine](readsList, overlapGraph, failedStates)
+    return {
+        'result': result,
+        'overlapTime': t1 - t0,
+        'searchTime': time.time() - t1,
+        'nodes': failedStates.hits + failedStates.misses,
+        'deadEnds': len(failedStates),
+        'isExhausted': failedStates.isExhausted
+    }
+
+
+def measurePeakMemory(reads, engine, k=16, timeLimit=None):
+    """Runs :func:`runEngine` again while tracing memory allocations, which slows it down
+
+    Args:
+        reads (:obj:`list` of string): The reads
+        engine (string): "greedy", or a key of "ENGINES"
+        k (:obj:`int`, optional): Length of seeds of :class:`SeedIndex`
+        timeLimit (:obj:`float`, optional): Time limit of the search in seconds
+
+    Returns:
+        int: Peak memory allocated during the run in bytes, or None without :mod:`tracemalloc` (Python 3.4+)
+    """
+    if tracemalloc is None:
+        return None
+    tracemalloc.start()
+    try:
+        runEngine(reads, engine, k, timeLimit)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def validate(result, reads):
+    """Runs :func:`test.validateAssembly` on a result
+
+    Args:
+        result (string): The assembled result, or None
+        reads (:obj:`list` of string): The reads
+
+    Returns:
+        :obj:`tuple` of (
+            isValid (bool): Whether the result passed the test
+            validateTime (float): Time of the test in seconds
+        )
+    """
+    if result is None:
+        return (False, 0.0)
+    t0 = time.time()
+    try:
+        test.validateAssembly(result, reads)
+        isValid = True
+    except AssertionError:
+        isValid = False
+    return (isValid, time.time() - t0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='\033[92mBenchmark\033[0m of assembly engines and the test on simulated reads, sweeping all combinations of the given parameters', epilog='by \033[94mSiqi Tian\033[0m, 2017 for Driver.xyz challenge')
+    parser.add_argument('--genome-lengths', type=str, default='1000,5000,20000', help='Comma separated lengths of full-length sequences')
+    parser.add_argument('--read-lengths', type=str, default='100', help='Comma separated lengths of reads')
+    parser.add_argument('--coverages', type=str, default='10', help='Comma separated average numbers of reads covering each position')
+    parser.add_argument('--repeat-fractions', type=str, default='0,0.1', help='Comma separated fractions of the sequence covered by copies of a repeat')
+    parser.add_argument('--repeat-length', type=int, default=50, help='Length of the repeat unit')
+    parser.add_argument('--duplicate-rates', type=str, default='0', help='Comma separated probabilities of each read to be sequenced twice')
+    parser.add_argument('--engines', type=str, default='greedy,recursive,iterative,graph', help='Comma separated engines: greedy, recursive, iterative, graph')
+    parser.add_argument('--seeds', type=str, default='0', help='Comma separated seeds of simulations, each a separate run')
+    parser.add_argument('--kmer', type=int, default=16, help='Length of seeds to find overlapping reads')
+    parser.add_argument('--time-limit', type=float, default=10, help='Time limit of each search in seconds')
+    parser.add_argument('--no-memory', action='store_true', help='Skip the second run of each engine that traces peak memory')
+    parser.add_argument('--save-dir', type=str, default=None, help='Also write each simulated reads and its reference sequence to this folder')
+    parser.add_argument('--output', type=str, default='benchmark.csv', help='Output file, JSON if it ends with .json, otherwise CSV')
+    args = parser.parse_args()
+
+    engines = parseList(args.engines, str)
+    for engine in engines:
+        if engine != 'greedy' and engine not in ENGINES:
+            parser.error('unknown engine: %s' % engine)
+
+    t0 = time.time()
+    records = []
+    cases = itertools.product(
+        parseList(args.seeds, int),
+        parseList(args.genome_lengths, int),
+        parseList(args.read_lengths, int),
+        parseList(args.coverages, float),
+        parseList(args.repeat_fractions, float),
+        parseList(args.duplicate_rates, float)
+    )
+    for (seed, genomeLength, readLength, coverage, repeatFraction, duplicateRate) in cases:
+        (sequence, reads) = simulate.simulate(genomeLength, readLength, coverage, repeatFraction, args.repeat_length, duplicateRate, seed)
+        if args.save_dir is not None:
+            fileName = os.path.join(args.save_dir, 'simulated_%s_%s_%s_%s_%s_%s_data.txt' % (seed, genomeLength, readLength, coverage, repeatFraction, duplicateRate))
+            simulate.writeSimulation(fileName, sequence, reads)
+
+        for engine in engines:
+            run = runEngine(reads, engine, args.kmer, args.time_limit)
+            (isValid, validateTime) = validate(run['result'], reads)
+            record = {
+                'seed': seed,
+                'genomeLength': genomeLength,
+                'readLength': readLength,
+                'coverage': coverage,
+                'repeatFraction': repeatFraction,
+                'duplicateRate': duplicateRate,
+                'readsCount': len(reads),
+                'engine': engine,
+                'overlapTime': round(run['overlapTime'], 4),
+                'searchTime': round(run['searchTime'], 4),
+                'totalTime': round(run['overlapTime'] + run['searchTime'], 4),
+                'nodes': run['nodes'],
+                'deadEnds': run['deadEnds'],
+                'isExhausted': run['isExhausted'],
+                'peakMemory': None if args.no_memory else measurePeakMemory(reads, engine, args.kmer, args.time_limit),
+                'isCorrect': run['result'] == sequence,
+                'validateTime': round(validateTime, 4),
+                'isValid': isValid
+            }
+            records.append(record)
+            print('%s reads of \033[95m%s\033[0m bp (seed %s, repeats %s, duplicates %s) by \033[95m%s\033[0m: \033[95m%.2f s\033[0m, %s nodes, %s.' % (
+                len(reads), genomeLength, seed, repeatFraction, duplicateRate, engine, record['totalTime'], record['nodes'],
+                '\033[92mcorrect\033[0m' if record['isCorrect'] else ('\033[93mvalid\033[0m' if isValid else '\033[41mfailed\033[0m')
+            ))
+
+    pipeline.writeReport(args.output, records, FIELDS)
+    print('Time elapsed: \033[95m%.2f s\033[0m.' % (time.time() - t0))
+
+
+if __name__ == '__main__':
+    main()
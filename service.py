@@ -0,0 +1,413 @@
+import argparse
+import asyncio
+import json
+import os
+import re
+import signal
+import stat
+import sys
+import time
+from concurrent import futures
+from urllib import parse
+
+from src import fasta
+from src import model
+from src import pipeline
+from src import stats
+
+
+# status of each job record, as HTTP status
+STATUS_CODES = {
+    'success': (200, 'OK'),
+    'failure': (422, 'Unprocessable Entity'),
+    'rejected': (503, 'Service Unavailable'),
+    'timeout': (504, 'Gateway Timeout')
+}
+
+
+def stripColors(message):
+    """Removes terminal color codes from a message
+
+    Args:
+        message (string): The message
+
+    Returns:
+        string
+    """
+    return re.sub('\033\\[[0-9;]*m', '', message)
+
+
+def runJob(payload, options):
+    """Worker: reads, assembles and tests the reads of one FASTA payload, same as :func:`pipeline.assembleFile` without files
+
+    Args:
+        payload (bytes): Content of a FASTA file
+        options (:obj:`argparse.Namespace`): Options added by :func:`pipeline.addAssemblyArguments`
+
+    Returns:
+        :obj:`dict` of {
+            'contigs': :obj:`list` of string,
+            'tier': string,
+            'isTested': bool,
+            'readsCount': int,
+            'phases': :obj:`list` of :obj:`dict`,
+            'time': float
+        }
+
+    Raises:
+        Exception: When there are no reads, no assembly is found, or the assembly fails the test (see :func:`pipeline.validateResult`)
+    """
+    t0 = time.time()
+    runStats = stats.Stats()
+    stdout = sys.stdout
+    sys.stdout = open(os.devnull, 'w')
+    try:
+        with runStats.phase('readFasta'):
+            records = list(fasta.parseFastaLines(payload.splitlines()))
+        if not len(records):
+            raise ValueError('\033[41mMissing\033[0m reads in FASTA payload.')
+        labels = [label for (label, read) in records]
+        reads = [read for (label, read) in records]
+        if options.both_strands:
+            with runStats.phase('orientReads'):
+                reads = pipeline.orientReads(reads, options)
+
+        with runStats.phase('initiateReadData'):
+            readsList = model.initiateReadData(reads)
+        (result, contigs, tier) = pipeline.assembleReads(reads, readsList, options, runStats)
+        isTested = contigs is None
+        if contigs is None:
+            if result is None:
+                raise Exception('\033[41mERROR\033[0m: No assembly of the reads was found.')
+            with runStats.phase('validateAssembly'):
+                pipeline.validateResult(result, reads, labels, pipeline.getMatcher(options))
+            contigs = [result]
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+
+    return {
+        'contigs': contigs,
+        'tier': tier,
+        'isTested': isTested,
+        'readsCount': len(reads),
+        'phases': runStats.phases,
+        'time': time.time() - t0
+    }
+
+
+class AssemblyService(object):
+    """Construct a long-running assembly service, running jobs in a pool of worker processes
+
+        A job waits for a free worker in a queue of at most "queueSize" jobs (running ones included); a job beyond it is rejected at once, so a client can back off instead of piling up. The worker processes are started once, so each job skips the interpreter startup and imports.
+
+        A job is given up after its deadline, counted from when it was queued. The rest of the deadline is also passed to the search as "--time-limit" (see :class:`BudgetedStateCache`), so the search stops on its own and frees its worker; if it did not find a full assembly by then, the contigs of the best partial assembly are returned, untested. A job still running after the deadline and "grace" seconds is reported as timed out, and its worker is only taken back once it finishes.
+
+    Args:
+        options (:obj:`argparse.Namespace`): Options added by :func:`pipeline.addAssemblyArguments`, for every job
+        jobs (:obj:`int`, optional): Number of worker processes
+        queueSize (:obj:`int`, optional): Maximum number of queued and running jobs
+        deadline (:obj:`float`, optional): Default deadline of each job in seconds; no deadline if not given
+        grace (:obj:`float`, optional): Seconds to wait for a worker after the deadline, for the phases not bounded by the search
+
+    Returns:
+        :class:`AssemblyService` of {
+            'counters': :obj:`dict` of string: int
+        }
+    """
+
+    def __init__(self, options, jobs=1, queueSize=64, deadline=None, grace=1.0):
+        self.options = options
+        self.jobs = jobs
+        self.queueSize = queueSize
+        self.deadline = deadline
+        self.grace = grace
+        self.executor = None
+        self.slots = None
+        self.queuedCount = 0
+        self.runningCount = 0
+        self.counters = dict((status, 0) for status in STATUS_CODES)
+
+
+    def start(self):
+        """Starts the worker processes, from within the event loop"""
+        self.executor = futures.ProcessPoolExecutor(max_workers=self.jobs)
+        self.slots = asyncio.Semaphore(self.jobs)
+        # workers are otherwise only started by the first jobs
+        for worker in range(self.jobs):
+            self.executor.submit(os.getpid)
+
+    def stop(self):
+        """Waits for the running jobs, and stops the worker processes"""
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+
+    def release(self, future=None):
+        """Frees the worker of a job
+
+        Args:
+            future (:obj:`asyncio.Future`, optional): The finished job, when called back
+        """
+        self.runningCount -= 1
+        self.slots.release()
+
+    async def submit(self, payload, deadline=None):
+        """Queues a job, and waits for its result, recording its failure instead of raising
+
+        Args:
+            payload (bytes): Content of a FASTA file
+            deadline (:obj:`float`, optional): Deadline of the job in seconds; the default of the service if not given
+
+        Returns:
+            :obj:`dict`: Result of :func:`runJob`, with keys 'status' (see "STATUS_CODES"), 'error' and 'queueTime'
+        """
+        t0 = time.time()
+        if deadline is None:
+            deadline = self.deadline
+        record = {'status': 'success', 'error': '', 'queueTime': 0.0}
+
+        if self.queuedCount + self.runningCount >= self.queueSize:
+            record.update({'status': 'rejected', 'error': 'Queue is full (%s jobs).' % self.queueSize})
+            self.counters['rejected'] += 1
+            return record
+
+        self.queuedCount += 1
+        try:
+            await asyncio.wait_for(self.slots.acquire(), deadline)
+        except asyncio.TimeoutError:
+            record.update({'status': 'timeout', 'error': 'Deadline of %s s passed in queue.' % deadline, 'queueTime': time.time() - t0})
+            self.counters['timeout'] += 1
+            return record
+        finally:
+            self.queuedCount -= 1
+        record['queueTime'] = time.time() - t0
+
+        self.runningCount += 1
+        options = argparse.Namespace(**vars(self.options))
+        timeout = None
+        if deadline is not None:
+            remaining = max(deadline - record['queueTime'], 0.0)
+            options.time_limit = remaining if options.time_limit is None else min(options.time_limit, remaining)
+            timeout = remaining + self.grace
+        future = asyncio.get_running_loop().run_in_executor(self.executor, runJob, payload, options)
+        # released when the job is really done, even if this wait times out or is cancelled
+        future.add_done_callback(self.release)
+        try:
+            # shielded, so the worker stays taken until the job is really done
+            record.update(await asyncio.wait_for(asyncio.shield(future), timeout))
+        except asyncio.TimeoutError:
+            record.update({'status': 'timeout', 'error': 'Deadline of %s s passed in assembly.' % deadline})
+        except Exception as e:
+            record.update({'status': 'failure', 'error': stripColors(str(e))})
+        self.counters[record['status']] += 1
+        return record
+
+    def getStatus(self):
+        """Gets the load of the service
+
+        Returns:
+            :obj:`dict`
+        """
+        status = {
+            'jobs': self.jobs,
+            'queueSize': self.queueSize,
+            'queued': self.queuedCount,
+            'running': self.runningCount
+        }
+        status.update(self.counters)
+        return status
+
+    async def handle(self, reader, writer):
+        """Serves one HTTP request of a connection
+
+            * ``POST /assemble?name=NAME&deadline=SECONDS``: assembles the FASTA body, and answers with the contigs in FASTA, and the timing of the job as JSON in the "X-Assembly-Stats" header. Failures are answered with a JSON body of the status and the error.
+            * ``GET /status``: the load of the service as JSON (see :meth:`getStatus`)
+
+        Args:
+            reader (:obj:`asyncio.StreamReader`): Stream of the request
+            writer (:obj:`asyncio.StreamWriter`): Stream of the response
+        """
+        try:
+            request = await readRequest(reader, self.options.max_payload * 1024 * 1024)
+            if request is None:
+                return
+            (method, path, query, body) = request
+
+            if method == 'GET' and path == '/status':
+                await writeResponse(writer, 200, 'OK', 'application/json', [json.dumps(self.getStatus())])
+            elif method == 'POST' and path == '/assemble':
+                deadline = float(query['deadline']) if 'deadline' in query else None
+                record = await self.submit(body, deadline)
+                await writeRecord(writer, record, query.get('name', 'job'), self.options.line_width)
+            else:
+                await writeResponse(writer, 404, 'Not Found', 'application/json', [json.dumps({'error': 'Unknown request %s %s.' % (method, path)})])
+        except (ValueError, asyncio.LimitOverrunError) as e:
+            await writeResponse(writer, 400, 'Bad Request', 'application/json', [json.dumps({'error': stripColors(str(e))})])
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, socketPath=None, host='127.0.0.1', port=8765):
+        """Serves requests until interrupted or terminated, on a Unix domain socket if given, otherwise on a local TCP port
+
+        Args:
+            socketPath (:obj:`string`, optional): Path of the Unix domain socket
+            host (:obj:`string`, optional): Host name of the TCP port
+            port (:obj:`int`, optional): TCP port
+        """
+        self.start()
+        stopEvent = asyncio.Event()
+        for signalNumber in (signal.SIGINT, signal.SIGTERM):
+            asyncio.get_running_loop().add_signal_handler(signalNumber, stopEvent.set)
+        try:
+            if socketPath is not None:
+                server = await asyncio.start_unix_server(self.handle, path=socketPath)
+                print('\033[92mSUCCESS\033[0m: Serving on socket (\033[94m%s\033[0m) with \033[95m%s\033[0m workers.' % (socketPath, self.jobs))
+            else:
+                server = await asyncio.start_server(self.handle, host, port)
+                print('\033[92mSUCCESS\033[0m: Serving on (\033[94mhttp://%s:%s\033[0m) with \033[95m%s\033[0m workers.' % (host, port, self.jobs))
+            async with server:
+                await stopEvent.wait()
+        finally:
+            self.stop()
+
+
+async def readRequest(reader, maxPayload):
+    """Reads an HTTP request
+
+    Args:
+        reader (:obj:`asyncio.StreamReader`): Stream of the request
+        maxPayload (int): Maximum size of the body in bytes
+
+    Returns:
+        :obj:`tuple` of (
+            method (string): The method, e.g. "POST"
+            path (string): The path, without query
+            query (:obj:`dict` of string: string): The query parameters
+            body (bytes): The body
+        ), or None if the connection is closed before a request
+
+    Raises:
+        ValueError: When the request is malformed, or its body is too large
+    """
+    requestLine = await reader.readline()
+    if not len(requestLine):
+        return None
+    pieces = requestLine.decode('latin-1').split()
+    if len(pieces) != 3:
+        raise ValueError('Malformed request line.')
+    (method, target) = pieces[:2]
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        (name, separator, value) = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    if 'chunked' in headers.get('transfer-encoding', ''):
+        raise ValueError('Chunked request body is not supported, send "Content-Length".')
+
+    length = int(headers.get('content-length', 0))
+    if length > maxPayload:
+        raise ValueError('Payload of %s bytes is larger than %s bytes.' % (length, maxPayload))
+    body = await reader.readexactly(length)
+    url = parse.urlsplit(target)
+    return (method, url.path, dict(parse.parse_qsl(url.query)), body)
+
+
+async def writeResponse(writer, code, reason, contentType, blocks, headers=None):
+    """Writes an HTTP response, streaming its body in chunks as they come
+
+    Args:
+        writer (:obj:`asyncio.StreamWriter`): Stream of the response
+        code (int): HTTP status code
+        reason (string): HTTP reason phrase
+        contentType (string): Type of the body
+        blocks (iterable of string): Consecutive blocks of the body
+        headers (:obj:`dict` of string: string, optional): Other headers
+    """
+    lines = ['HTTP/1.1 %s %s' % (code, reason), 'Content-Type: %s' % contentType, 'Transfer-Encoding: chunked', 'Connection: close']
+    lines.extend('%s: %s' % item for item in sorted((headers or {}).items()))
+    writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+    for block in blocks:
+        data = fasta.toBytes(block)
+        if len(data):
+            writer.write(b'%x\r\n%s\r\n' % (len(data), data))
+            await writer.drain()
+    writer.write(b'0\r\n\r\n')
+    await writer.drain()
+
+
+async def writeRecord(writer, record, name, lineWidth=None):
+    """Writes the result of a job: its contigs in FASTA, longest first, or its error as JSON
+
+    Args:
+        writer (:obj:`asyncio.StreamWriter`): Stream of the response
+        record (:obj:`dict`): The result of :meth:`AssemblyService.submit`
+        name (string): Name of the job, as prefix of the labels
+        lineWidth (:obj:`int`, optional): Maximum length of sequence lines; no wrapping if not given
+    """
+    (code, reason) = STATUS_CODES[record['status']]
+    summary = dict((key, value) for (key, value) in record.items() if key != 'contigs')
+    headers = {'X-Assembly-Stats': json.dumps(summary, separators=(',', ':'))}
+    if record['status'] != 'success':
+        await writeResponse(writer, code, reason, 'application/json', [json.dumps(summary)], headers)
+        return
+
+    contigs = record['contigs']
+    if len(contigs) == 1:
+        labels = ['%s_assembled' % name]
+    else:
+        labels = ['%s_assembled_contig_%s' % (name, i + 1) for i in range(len(contigs))]
+
+    def iterBlocks():
+        for (label, contig) in zip(labels, contigs):
+            yield '>%s\n' % label
+            for block in fasta.wrapSequence(contig, lineWidth):
+                yield block
+
+    await writeResponse(writer, code, reason, 'text/x-fasta', iterBlocks(), headers)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='\033[92mFragment Assembly\033[0m service, assembling FASTA payloads sent over a Unix domain socket or a local HTTP port (Python 3 only)', epilog='by \033[94mSiqi Tian\033[0m, 2017 for Driver.xyz challenge')
+    parser.add_argument('--socket', type=str, default=None, help='Path of Unix domain socket to serve on; a local HTTP port if not given')
+    parser.add_argument('--host', type=str, default='127.0.0.1', help='Host name of HTTP port')
+    parser.add_argument('--port', type=int, default=8765, help='HTTP port')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1, help='Number of worker processes assembling jobs in parallel')
+    parser.add_argument('--queue-size', type=int, default=64, help='Maximum number of queued and running jobs; more are rejected with status 503')
+    parser.add_argument('--deadline', type=float, default=None, help='Default deadline of each job in seconds, from when it is queued; no deadline if not given')
+    parser.add_argument('--max-payload', type=int, default=64, help='Maximum size of a FASTA payload in MB')
+    pipeline.addAssemblyArguments(parser)
+    args = parser.parse_args()
+
+    if args.workers > 1:
+        # workers of a job can not start their own pool
+        print('Jobs are assembled in parallel, ignoring \033[95m--workers\033[0m.')
+        args.workers = 1
+    if args.cache is not None:
+        print('Jobs are not cached, ignoring \033[95m--cache\033[0m.')
+        args.cache = None
+    if args.stats is not None:
+        print('Stats of each job are returned with its result, ignoring \033[95m--stats\033[0m.')
+        args.stats = None
+    if args.socket is not None and os.path.exists(args.socket):
+        # left over by an earlier run
+        if not stat.S_ISSOCK(os.stat(args.socket).st_mode):
+            parser.error('%s exists and is not a socket' % args.socket)
+        os.remove(args.socket)
+
+    service = AssemblyService(args, args.jobs, args.queue_size, args.deadline)
+    try:
+        asyncio.run(service.serve(args.socket, args.host, args.port))
+        print('Served \033[95m%s\033[0m jobs, \033[95m%s\033[0m failed, \033[95m%s\033[0m rejected, \033[95m%s\033[0m timed out.' % (service.counters['success'], service.counters['failure'], service.counters['rejected'], service.counters['timeout']))
+    finally:
+        if args.socket is not None and os.path.exists(args.socket):
+            os.remove(args.socket)
+
+
+if __name__ == '__main__':
+    main()
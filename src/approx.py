@@ -0,0 +1,550 @@
+from . import model
+from . import test
+
+
+def countBits(x):
+    """Counts the set bits of a non-negative integer
+
+    Args:
+        x (int): The integer
+
+    Returns:
+        int
+    """
+    # int.bit_count() is only on python 3.10+
+    return bin(x).count('1')
+
+
+def buildMasks(sequence):
+    """Builds a bit mask of the positions of each character, bit r for position r
+
+        ACCA  ->  A: 1001, C: 0110 (read from bit 3 to bit 0)
+
+    Args:
+        sequence (string): The sequence
+
+    Returns:
+        :obj:`dict` of string: int
+    """
+    masks = {}
+    for (r, character) in enumerate(sequence):
+        masks[character] = masks.get(character, 0) | (1 << r)
+    return masks
+
+
+def findOverlapDistances(leftSequence, rightSequence):
+    """Computes the edit distance between each prefix of a sequence and the best matching suffix of another, by the bit-parallel algorithm of Myers (1999), as formulated by Hyyro
+
+                   ------------------   leftSequence
+                   |  prefix i  |
+                   --------------------------   rightSequence
+
+        The dynamic programming table of "rightSequence" (rows) against "leftSequence" (columns) is kept as bit vectors of its vertical differences in a column, updated in a constant number of integer operations per character of "leftSequence". The first row is 0, so an alignment can start anywhere in "leftSequence"; the last column then holds the distance of each prefix against a suffix.
+
+    Args:
+        leftSequence (string): The sequence on the left, whose suffix is aligned
+        rightSequence (string): The sequence on the right, whose prefixes are aligned
+
+    Returns:
+        :obj:`list` of int: The distance of the prefix of each length, from 0 to the length of "rightSequence"
+    """
+    masks = buildMasks(rightSequence)
+    allBits = (1 << len(rightSequence)) - 1
+    (plusVertical, minusVertical) = (allBits, 0)
+    for character in leftSequence:
+        equal = masks.get(character, 0)
+        crossVertical = equal | minusVertical
+        crossHorizontal = (((equal & plusVertical) + plusVertical) ^ plusVertical) | equal
+        plusHorizontal = minusVertical | (~(crossHorizontal | plusVertical) & allBits)
+        minusHorizontal = plusVertical & crossHorizontal
+        # first row stays 0, nothing shifted in
+        plusHorizontal = (plusHorizontal << 1) & allBits
+        minusHorizontal = (minusHorizontal << 1) & allBits
+        plusVertical = minusHorizontal | (~(crossVertical | plusHorizontal) & allBits)
+        minusVertical = plusHorizontal & crossVertical
+
+    distances = [0]
+    for r in range(len(rightSequence)):
+        distances.append(distances[-1] + ((plusVertical >> r) & 1) - ((minusVertical >> r) & 1))
+    return distances
+
+
+def findPrefixAlignment(pattern, text):
+    """Finds the prefix of a text best aligned to the whole pattern, by the bit-parallel algorithm with the first row counting up
+
+    Args:
+        pattern (string): The pattern, aligned in full
+        text (string): The text, whose prefixes are aligned
+
+    Returns:
+        :obj:`tuple` of (
+            distance (int): The edit distance of the best alignment
+            length (int): The length of the prefix of the text, closest to the length of the pattern among the best
+        )
+    """
+    masks = buildMasks(pattern)
+    allBits = (1 << len(pattern)) - 1
+    lastBit = 1 << (len(pattern) - 1)
+    (plusVertical, minusVertical) = (allBits, 0)
+    distance = len(pattern)
+    best = (distance, len(pattern), 0)
+    for (length, character) in enumerate(text, 1):
+        equal = masks.get(character, 0)
+        crossVertical = equal | minusVertical
+        crossHorizontal = (((equal & plusVertical) + plusVertical) ^ plusVertical) | equal
+        plusHorizontal = minusVertical | (~(crossHorizontal | plusVertical) & allBits)
+        minusHorizontal = plusVertical & crossHorizontal
+        if plusHorizontal & lastBit:
+            distance += 1
+        elif minusHorizontal & lastBit:
+            distance -= 1
+        # first row counts up by 1 for each character
+        plusHorizontal = ((plusHorizontal << 1) | 1) & allBits
+        minusHorizontal = (minusHorizontal << 1) & allBits
+        plusVertical = minusHorizontal | (~(crossVertical | plusHorizontal) & allBits)
+        minusVertical = plusHorizontal & crossVertical
+        best = min(best, (distance, abs(length - len(pattern)), length))
+    return (best[0], best[2])
+
+
+def findMinimumDistance(pattern, text):
+    """Finds the smallest edit distance of a pattern against any substring of a text, by the bit-parallel algorithm
+
+    Args:
+        pattern (string): The pattern
+        text (string): The text
+
+    Returns:
+        int
+    """
+    masks = buildMasks(pattern)
+    allBits = (1 << len(pattern)) - 1
+    lastBit = 1 << (len(pattern) - 1)
+    (plusVertical, minusVertical) = (allBits, 0)
+    distance = len(pattern)
+    minimumDistance = distance
+    for character in text:
+        equal = masks.get(character, 0)
+        crossVertical = equal | minusVertical
+        crossHorizontal = (((equal & plusVertical) + plusVertical) ^ plusVertical) | equal
+        plusHorizontal = minusVertical | (~(crossHorizontal | plusVertical) & allBits)
+        minusHorizontal = plusVertical & crossHorizontal
+        if plusHorizontal & lastBit:
+            distance += 1
+        elif minusHorizontal & lastBit:
+            distance -= 1
+        plusHorizontal = (plusHorizontal << 1) & allBits
+        minusHorizontal = (minusHorizontal << 1) & allBits
+        plusVertical = minusHorizontal | (~(crossVertical | plusHorizontal) & allBits)
+        minusVertical = plusHorizontal & crossVertical
+        minimumDistance = min(minimumDistance, distance)
+    return minimumDistance
+
+
+def countMismatches(leftMasks, rightMasks, startIndex, length):
+    """Counts mismatches between a region of a sequence and the prefix of another, bit-parallel over their masks (see :func:`buildMasks`)
+
+    Args:
+        leftMasks (:obj:`dict` of string: int): Masks of the sequence on the left
+        rightMasks (:obj:`dict` of string: int): Masks of the sequence on the right
+        startIndex (int): Start index of the region in the sequence on the left
+        length (int): Length of the region
+
+    Returns:
+        int
+    """
+    lengthBits = (1 << length) - 1
+    matches = 0
+    for (character, mask) in rightMasks.items():
+        matches += countBits((leftMasks.get(character, 0) >> startIndex) & mask & lengthBits)
+    return length - matches
+
+
+
+def alignToText(sequence, text, textStartIndex=0):
+    """Aligns a sequence in full to its best matching region of a text by edits, with the traceback of the dynamic programming table
+
+        Each position "c" of the text is site "2c + 1", and the characters inserted before it are site "2c" (see :func:`buildConsensus`):
+
+            text        A C - G T      sites 1, 3, 5 and 7
+            sequence      C A G        site 3 "C", site 4 "A" (inserted before position 2), site 5 "G"
+
+    Args:
+        sequence (string): The sequence, aligned in full
+        text (string): The text, in which the region can start and end anywhere
+        textStartIndex (:obj:`int`, optional): Index of the text in the assembly, to shift the sites by
+
+    Returns:
+        :obj:`tuple` of (
+            distance (int): The edit distance
+            startIndex (int): Start index of the region in the assembly
+            endIndex (int): End index of the region in the assembly
+            values (:obj:`dict` of int: string): The characters of the sequence at each site, "" where deleted
+        )
+    """
+    rows = [[0] * (len(text) + 1)]
+    for (i, character) in enumerate(sequence, 1):
+        previous = rows[-1]
+        current = [i] * (len(text) + 1)
+        for j in range(1, len(text) + 1):
+            current[j] = min(previous[j - 1] + (character != text[j - 1]), previous[j] + 1, current[j - 1] + 1)
+        rows.append(current)
+
+    # on ties, the end aligned to the most of the text, not inserted after it
+    (distance, j) = min((distance, -j) for (j, distance) in enumerate(rows[-1]))
+    (j, endIndex) = (-j, -j)
+    values = {}
+    i = len(sequence)
+    while i > 0:
+        if j > 0 and rows[i][j] == rows[i - 1][j - 1] + (sequence[i - 1] != text[j - 1]):
+            values[2 * (textStartIndex + j) - 1] = sequence[i - 1]
+            (i, j) = (i - 1, j - 1)
+        elif rows[i][j] == rows[i - 1][j] + 1:
+            site = 2 * (textStartIndex + j)
+            values[site] = sequence[i - 1] + values.get(site, '')
+            i -= 1
+        else:
+            values[2 * (textStartIndex + j) - 1] = ''
+            j -= 1
+    return (distance, textStartIndex + j, textStartIndex + endIndex, values)
+
+
+def countSiteErrors(value, otherValue):
+    """Counts the edits between the values of a site (see :func:`alignToText`), at most the longer one
+
+    Args:
+        value (string): The value of a read
+        otherValue (string): The value of the consensus
+
+    Returns:
+        int
+    """
+    if value == otherValue:
+        return 0
+    return max(len(value), len(otherValue), 1)
+
+
+def buildConsensus(fullAssembly, alignments, maxErrors):
+    """Builds the consensus of the reads aligned to an assembly, by the majority at each site
+
+        The value of the assembly stays on ties. Then each read still off by more than "maxErrors" takes its own values, one site at a time, as long as no other read gets off by more than "maxErrors" (or more than it already was), since a read with a few more errors than the others can only be tested against an assembly holding some of them.
+
+    Args:
+        fullAssembly (string): String of context
+        alignments (:obj:`list` of :obj:`tuple`): The alignment of each read, from :func:`alignToText`
+        maxErrors (int): Maximum number of errors of each read
+
+    Returns:
+        string: The consensus
+    """
+    # the value of each read at the sites it spans, insertion sites empty unless set
+    readsValues = []
+    siteReads = {}
+    for (k, (distance, startIndex, endIndex, values)) in enumerate(alignments):
+        readValues = dict((site, values.get(site, '')) for site in range(2 * startIndex, 2 * endIndex + 1))
+        readsValues.append(readValues)
+        for site in readValues:
+            siteReads.setdefault(site, []).append(k)
+
+    consensus = [fullAssembly[site // 2] if site % 2 else '' for site in range(2 * len(fullAssembly) + 1)]
+    for (site, readIndices) in siteReads.items():
+        votes = {}
+        for k in readIndices:
+            value = readsValues[k][site]
+            votes[value] = votes.get(value, 0) + 1
+        consensus[site] = max(votes, key=lambda value: (votes[value], value == consensus[site], value))
+
+    errorsCounts = [
+        sum(countSiteErrors(value, consensus[site]) for (site, value) in readValues.items())
+        for readValues in readsValues
+    ]
+    for (k, readValues) in enumerate(readsValues):
+        for (site, value) in sorted(readValues.items()):
+            if errorsCounts[k] <= maxErrors:
+                break
+            if value == consensus[site]:
+                continue
+            newErrorsCounts = dict(
+                (otherK, errorsCounts[otherK] - countSiteErrors(readsValues[otherK][site], consensus[site]) + countSiteErrors(readsValues[otherK][site], value))
+                for otherK in siteReads[site]
+            )
+            if all(newErrorsCount <= max(maxErrors, errorsCounts[otherK]) for (otherK, newErrorsCount) in newErrorsCounts.items() if otherK != k):
+                consensus[site] = value
+                for (otherK, newErrorsCount) in newErrorsCounts.items():
+                    errorsCounts[otherK] = newErrorsCount
+    return ''.join(consensus)
+
+
+class ApproximateMatcher(object):
+    """Construct the checks of overlaps and encompassment between reads, tolerating a few mismatches or edits
+
+        Each check first tries the exact match, as :meth:`PartData.isMatchLeft` and :meth:`PartData.isMatchInside`, and only otherwise counts the errors:
+
+        * mismatches: substitutions only, at every offset, counted over the masks of each nucleotide (see :func:`countMismatches`);
+        * edits: also insertions and deletions, by the bit-parallel algorithm (see :func:`findOverlapDistances`).
+
+        Each read is within "maxErrors" of the full-length sequence, so two reads are compared within twice as many ("pairErrors"), and a read against an assembly within "maxErrors". Among the overlaps within "pairErrors", the one with fewest errors is taken, then the shortest, same as the exact match.
+
+    Args:
+        maxErrors (int): Maximum number of mismatches or edits of each read
+        isEdit (:obj:`bool`, optional): Whether to count insertions and deletions, not only mismatches
+
+    Returns:
+        :class:`ApproximateMatcher` of {
+            'maxErrors': int,
+            'pairErrors': int,
+            'isEdit': bool
+        }
+    """
+
+    def __init__(self, maxErrors, isEdit=False):
+        self.maxErrors = maxErrors
+        self.pairErrors = 2 * maxErrors
+        self.isEdit = isEdit
+
+
+    def findOverlap(self, leftSequence, rightSequence, minOverlapLength):
+        """Finds the overlapping region between the end of a sequence and the start of another, same as :func:`model.findOverlap` within "pairErrors"
+
+        Args:
+            leftSequence (string): The sequence on the left
+            rightSequence (string): The sequence on the right
+            minOverlapLength (int): The minimum length of overlapping region
+
+        Returns:
+            int: The start index of overlapping region in "leftSequence", or -1 if not matched
+        """
+        matchStartIndex = model.findOverlap(leftSequence, rightSequence, minOverlapLength)
+        if matchStartIndex != -1 or not self.pairErrors:
+            return matchStartIndex
+
+        if not self.isEdit:
+            (leftMasks, rightMasks) = (buildMasks(leftSequence), buildMasks(rightSequence))
+            best = (self.pairErrors + 1, -1)
+            for startIndex in range(len(leftSequence) - minOverlapLength, max(0, len(leftSequence) - len(rightSequence)) - 1, -1):
+                mismatches = countMismatches(leftMasks, rightMasks, startIndex, len(leftSequence) - startIndex)
+                if mismatches < best[0]:
+                    best = (mismatches, startIndex)
+            return best[1]
+
+        # an overlap of the right read can span up to pairErrors more of the left read
+        text = leftSequence[-(len(rightSequence) + self.pairErrors):]
+        distances = findOverlapDistances(text, rightSequence)
+        (distance, length) = min((distances[length], length) for length in range(min(minOverlapLength, len(rightSequence)), len(rightSequence) + 1))
+        if distance > self.pairErrors:
+            return -1
+        # the span of the overlap in the left read, aligned backwards from its end
+        (distance, spanLength) = findPrefixAlignment(rightSequence[(length - 1)::-1], text[::-1])
+        return max(0, len(leftSequence) - spanLength)
+
+    def findPieceStartIndices(self, sequence, otherSequence, maxErrors):
+        """Finds where a sequence may start in another, from the exact occurrences of its pieces
+
+            With few errors, one of the "maxErrors + 1" pieces of the sequence occurs exactly, so the sequence can only occur around where the pieces do. With edits, the start is off by up to "maxErrors".
+
+        Args:
+            sequence (string): The sequence, longer than "maxErrors"
+            otherSequence (string): The sequence to search in
+            maxErrors (int): Maximum number of errors
+
+        Returns:
+            :obj:`set` of int: The start indices, which may be out of the other sequence
+        """
+        pieceLength = len(sequence) // (maxErrors + 1)
+        startIndices = set()
+        for pieceStartIndex in range(0, pieceLength * (maxErrors + 1), pieceLength):
+            piece = sequence[pieceStartIndex:(pieceStartIndex + pieceLength)]
+            index = otherSequence.find(piece)
+            while index != -1:
+                startIndices.add(index - pieceStartIndex)
+                index = otherSequence.find(piece, index + 1)
+        return startIndices
+
+    def isSequenceInside(self, sequence, otherSequence, maxErrors=None):
+        """Checks if a sequence occurs in another within "maxErrors"
+
+            Only the regions around the exact occurrences of its pieces are compared (see :meth:`findPieceStartIndices`).
+
+        Args:
+            sequence (string): The sequence
+            otherSequence (string): The sequence to search in
+            maxErrors (:obj:`int`, optional): Maximum number of errors, "maxErrors" of the matcher if not given
+
+        Returns:
+            bool
+        """
+        if maxErrors is None:
+            maxErrors = self.maxErrors
+        if sequence in otherSequence:
+            return True
+        slack = maxErrors if self.isEdit else 0
+        if not maxErrors or len(sequence) > len(otherSequence) + slack:
+            return False
+        if len(sequence) <= maxErrors:
+            # too short to be cut into pieces, and within "maxErrors" of any region of its length
+            return True
+
+        startIndices = self.findPieceStartIndices(sequence, otherSequence, maxErrors)
+        if not self.isEdit:
+            masks = buildMasks(sequence)
+            otherMasks = buildMasks(otherSequence)
+            return any(
+                countMismatches(otherMasks, masks, startIndex, len(sequence)) <= maxErrors
+                for startIndex in startIndices
+                if 0 <= startIndex <= len(otherSequence) - len(sequence)
+            )
+        return any(
+            findMinimumDistance(sequence, otherSequence[max(0, startIndex - slack):(startIndex + len(sequence) + slack)]) <= maxErrors
+            for startIndex in startIndices
+        )
+
+    def findOccurrences(self, sequence, otherSequence, maxErrors=None):
+        """Finds all regions of another sequence the sequence occurs in within "maxErrors", same as :func:`test.findReadsPositions` for one read
+
+            With edits, each start near an occurrence of a piece (see :meth:`findPieceStartIndices`) takes the region it aligns best to (see :func:`findPrefixAlignment`).
+
+        Args:
+            sequence (string): The sequence
+            otherSequence (string): The sequence to search in
+            maxErrors (:obj:`int`, optional): Maximum number of errors, "maxErrors" of the matcher if not given
+
+        Returns:
+            :obj:`list` of `tuple(int, int)`: Start and end indices of the regions, sorted
+        """
+        if maxErrors is None:
+            maxErrors = self.maxErrors
+        slack = maxErrors if self.isEdit else 0
+        if len(sequence) <= maxErrors:
+            return [(startIndex, startIndex + len(sequence)) for startIndex in range(max(0, len(otherSequence) - len(sequence)) + 1)]
+        if not maxErrors:
+            startIndices = set()
+        else:
+            startIndices = self.findPieceStartIndices(sequence, otherSequence, maxErrors)
+        index = otherSequence.find(sequence)
+        while index != -1:
+            startIndices.add(index)
+            index = otherSequence.find(sequence, index + 1)
+
+        regions = set()
+        if not self.isEdit:
+            masks = buildMasks(sequence)
+            otherMasks = buildMasks(otherSequence)
+            for startIndex in startIndices:
+                if 0 <= startIndex <= len(otherSequence) - len(sequence) and countMismatches(otherMasks, masks, startIndex, len(sequence)) <= maxErrors:
+                    regions.add((startIndex, startIndex + len(sequence)))
+            return sorted(regions)
+        for startIndex in startIndices:
+            for shiftedIndex in range(max(0, startIndex - slack), min(len(otherSequence), startIndex + slack) + 1):
+                (distance, length) = findPrefixAlignment(sequence, otherSequence[shiftedIndex:(shiftedIndex + len(sequence) + slack)])
+                if distance <= maxErrors:
+                    regions.add((shiftedIndex, shiftedIndex + length))
+        return sorted(regions)
+
+    def isMatchInside(self, part, other):
+        """Checks if part is encompassed by other, same as :meth:`PartData.isMatchInside` within "pairErrors"
+
+        Args:
+            part (:class:`PartData`): The assembly to check
+            other (:class:`PartData`): The other assembly to merge into
+
+        Returns:
+            bool
+        """
+        return self.isSequenceInside(part.sequence, other.sequence, self.pairErrors)
+
+    def isMatchLeft(self, part, other):
+        """Checks if part is the left neighbor of other, same as :meth:`PartData.isMatchLeft` within "pairErrors"
+
+        Args:
+            part (:class:`PartData`): The assembly on the left
+            other (:class:`PartData`): The other assembly to merge into
+
+        Returns:
+            int: The start index of overlapping region in part, or -1 if not matched
+        """
+        length = min(part.length, other.length)
+        minOverlapLength = min(max(part.right, other.left), other.length)
+        if minOverlapLength > length:
+            return -1
+
+        matchStartIndex = self.findOverlap(part.getSequence(part.length - length), other.getSequence(0, length), minOverlapLength)
+        if matchStartIndex == -1:
+            return -1
+        return part.length - length + matchStartIndex
+
+    def alignRead(self, read, fullAssembly):
+        """Aligns a read to the region of an assembly it occurs in within "pairErrors" with fewest errors (see :func:`alignToText`)
+
+            The assembly is made of the reads, so a read is off from it by its own errors and those of the reads kept over it.
+
+        Args:
+            read (string): The read
+            fullAssembly (string): String of context
+
+        Returns:
+            :obj:`tuple`: As from :func:`alignToText`, or None if the read does not occur
+        """
+        regions = self.findOccurrences(read, fullAssembly, self.pairErrors)
+        if not self.isEdit:
+            best = None
+            for (startIndex, endIndex) in regions:
+                values = dict((2 * (startIndex + r) + 1, character) for (r, character) in enumerate(read))
+                distance = sum(1 for (r, character) in enumerate(read) if character != fullAssembly[startIndex + r])
+                if best is None or distance < best[0]:
+                    best = (distance, startIndex, endIndex, values)
+            return best
+
+        # the regions around one occurrence overlap, aligned at once
+        best = None
+        windows = []
+        for (startIndex, endIndex) in regions:
+            if windows and startIndex <= windows[-1][1]:
+                windows[-1][1] = max(windows[-1][1], endIndex)
+            else:
+                windows.append([startIndex, endIndex])
+        for (startIndex, endIndex) in windows:
+            startIndex = max(0, startIndex - self.pairErrors)
+            alignment = alignToText(read, fullAssembly[startIndex:(endIndex + self.pairErrors)], startIndex)
+            if best is None or alignment[0] < best[0]:
+                best = alignment
+        return best
+
+    def polishAssembly(self, fullAssembly, readsList, roundsCount=3):
+        """Replaces the assembly by the consensus of the reads aligned to it, until it stays the same (see :func:`buildConsensus`)
+
+            The engines keep the characters of the right part at each merge, so the errors of the reads merged last stay in the assembly, and the other reads are tested against them too.
+
+        Args:
+            fullAssembly (string): String of context
+            readsList (:obj:`list` of string): List of string targets
+            roundsCount (:obj:`int`, optional): Maximum number of rounds, as the alignments change with the assembly
+
+        Returns:
+            string: The polished assembly
+        """
+        for roundIndex in range(roundsCount):
+            alignments = [self.alignRead(read, fullAssembly) for read in readsList]
+            polishedAssembly = buildConsensus(fullAssembly, [alignment for alignment in alignments if alignment is not None], self.maxErrors)
+            if polishedAssembly == fullAssembly:
+                break
+            fullAssembly = polishedAssembly
+        return fullAssembly
+
+    def isValidAssembly(self, fullAssembly, readsList):
+        """Checks an assembly by :func:`test.isValidAssembly`, or only if that fails, by the same placement of the reads on regions they occur in within "maxErrors"
+
+            The exact check comes first, so an assembly with every read occurring exactly is held to the minimum overlapping rule between exact positions, not passed by the errors. Otherwise each read is placed on one of its regions (see :meth:`findOccurrences`), with the same coverage and minimum overlapping rule as :func:`test.placeReads`.
+
+        Args:
+            fullAssembly (string): String of context
+            readsList (:obj:`list` of string): List of string targets
+
+        Returns:
+            bool
+        """
+        if test.isValidAssembly(fullAssembly, readsList):
+            return True
+        readsCandidates = [self.findOccurrences(read, fullAssembly) for read in readsList]
+        if not all(len(candidates) for candidates in readsCandidates):
+            return False
+        return test.placeReads(fullAssembly, readsList, readsCandidates=readsCandidates) is not None
@@ -1,10 +1,424 @@
+import collections
+import time
+
+from . import assembly_old
 from . import model
+from . import test
+
+
+class FailedStateCache(object):
+    """Bounded memory of dead ends in the assembly search, evicting the least recently used
+
+        Different merge orders can reach the same set of parts, e.g. (AB, C) and (A, BC) both lead to (ABC). Once such a state failed to assemble, it is skipped when reached again.
+
+        It also keeps the state with the fewest parts reached so far, as the best partial assembly when the search fails (see :func:`collectContigs`), and the depth of the deepest state checked.
+
+    Args:
+        maxSize (:obj:`int`, optional): Maximum number of states to remember
+
+    Returns:
+        :class:`FailedStateCache` of {
+            'hits': int,
+            'misses': int,
+            'maxDepth': int,
+            'bestPartsList': :obj:`list` of :class:`PartData`
+        }
+    """
+
+    def __init__(self, maxSize=100000):
+        self.maxSize = maxSize
+        self.hits = 0
+        self.misses = 0
+        self.maxDepth = 0
+        self.states = collections.OrderedDict()
+        self.bestPartsList = None
+
+
+    def __len__(self):
+        return len(self.states)
+
+    def fingerprint(self, partsList):
+        """Canonical key of a set of parts, independent of list order
+
+            The hashes of the layouts of the parts, kept scrambled by each part (see :func:`model.hashRead`), are combined by XOR, so no layout is walked. Two distinct states share a key only by a collision of 64-bit hashes.
+
+        Args:
+            partsList (:obj:`list` of :class:`PartData`): The list of parts
+
+        Returns:
+            int: Key of the state
+        """
+        key = 0
+        for part in partsList:
+            key ^= part.layoutKey
+        return key
+
+    def isFailed(self, key, depth=0):
+        """Checks if the state is known to be a dead end, and counts hit or miss
+
+        Args:
+            key (int): Key of the state from :meth:`fingerprint`
+            depth (:obj:`int`, optional): Depth of the state in the search, i.e. merges or reads placed from the single reads
+
+        Returns:
+            bool: Whether the state failed before
+        """
+        self.maxDepth = max(self.maxDepth, depth)
+        if key in self.states:
+            # refresh as most recently used
+            self.states[key] = self.states.pop(key)
+            self.hits += 1
+            return True
+
+        self.misses += 1
+        return False
+
+    def addFailed(self, key):
+        """Remembers the state as a dead end
+
+        Args:
+            key (int): Key of the state from :meth:`fingerprint`
+        """
+        self.states[key] = True
+        while len(self.states) > self.maxSize:
+            self.states.popitem(last=False)
+
+    def isBetter(self, partsCount):
+        """Checks if a state of this many parts is better than the best one so far
+
+        Args:
+            partsCount (int): Number of parts of the state
+
+        Returns:
+            bool
+        """
+        return self.bestPartsList is None or partsCount < len(self.bestPartsList)
+
+    def keepBest(self, partsList):
+        """Keeps the state as the best partial assembly, if it has fewer parts than the best one so far
+
+        Args:
+            partsList (:obj:`list` of :class:`PartData`): The list of parts
+        """
+        if self.isBetter(len(partsList)):
+            self.bestPartsList = partsList
+
+    def share(self, fraction):
+        """Constructs an empty cache for a separate search, e.g. of one component
+
+        Args:
+            fraction (float): Share of the budget left to give it, from 0 to 1
+
+        Returns:
+            :class:`FailedStateCache`
+        """
+        return FailedStateCache(self.maxSize)
+
+    def addCounts(self, other):
+        """Adds the counts of a cache from :meth:`share` once its search is done
+
+        Args:
+            other (:class:`FailedStateCache`): The shared cache
+        """
+        self.hits += other.hits
+        self.misses += other.misses
+        self.maxDepth = max(self.maxDepth, other.maxDepth)
+
+
+class BudgetedStateCache(FailedStateCache):
+    """Dead-end cache that reports every state as failed once the search ran out of time or of states to visit
+
+        Each check of a state by the search counts as a visited state, until the budget is exhausted. Then the search unwinds on its own, and the best partial assembly so far is kept in "bestPartsList".
+
+    Args:
+        maxSeconds (:obj:`float`, optional): Wall-clock time limit from now; no limit if not given
+        maxNodes (:obj:`int`, optional): Maximum number of states to visit; no limit if not given
+        maxSize (:obj:`int`, optional): Maximum number of states to remember
+        checkInterval (:obj:`int`, optional): Number of states between checks of the clock
+
+    Returns:
+        :class:`BudgetedStateCache` of {
+            'nodeCount': int,
+            'isExhausted': bool
+        }
+    """
+
+    def __init__(self, maxSeconds=None, maxNodes=None, maxSize=100000, checkInterval=100):
+        super(BudgetedStateCache, self).__init__(maxSize)
+        self.deadline = None if maxSeconds is None else time.time() + maxSeconds
+        self.maxNodes = maxNodes
+        self.checkInterval = checkInterval
+        self.nodeCount = 0
+        self.isExhausted = False
+
+
+    def isFailed(self, key, depth=0):
+        if not self.isExhausted:
+            self.nodeCount += 1
+            if self.maxNodes is not None and self.nodeCount > self.maxNodes:
+                self.isExhausted = True
+            elif self.deadline is not None and self.nodeCount % self.checkInterval == 0:
+                self.isExhausted = time.time() > self.deadline
+        if self.isExhausted:
+            return True
+        return super(BudgetedStateCache, self).isFailed(key, depth)
+
+    def share(self, fraction):
+        maxSeconds = None if self.deadline is None else max(0.0, self.deadline - time.time()) * fraction
+        maxNodes = None if self.maxNodes is None else int(max(0, self.maxNodes - self.nodeCount) * fraction)
+        return BudgetedStateCache(maxSeconds, maxNodes, self.maxSize, self.checkInterval)
+
+    def addCounts(self, other):
+        super(BudgetedStateCache, self).addCounts(other)
+        self.nodeCount += other.nodeCount
+        self.isExhausted = self.isExhausted or other.isExhausted
+
+
+def countDeadEnds(partsList, overlapGraph):
+    """Counts parts that can never be merged to a left neighbor, and parts that can never be merged to a right neighbor
+
+        A part's first read keeps being its first read until it is merged to a left neighbor, and the other parts only ever end with their current last reads. So without an overlap from any of those, the part has to be the left-most one of the full assembly, and only one part can be. The same goes for the right.
+
+        Parts whose ends are encompassed by other reads are never counted, nor parts that another part can overlap by more than their end reads, since they are checked against their sequences (see :meth:`OverlapGraph.isEndSpanned`).
+
+    Args:
+        partsList (:obj:`list` of :class:`PartData`): The list of parts, or their :class:`ChainEnds`
+        overlapGraph (:class:`OverlapGraph`): Precomputed overlaps between single reads
+
+    Returns:
+        :obj:`tuple` of (
+            leftCount (int): Number of parts without any possible left neighbor
+            rightCount (int): Number of parts without any possible right neighbor
+        )
+    """
+    isContained = overlapGraph.isContained
+    firstsCount = collections.Counter(part.first for part in partsList)
+    lastsCount = collections.Counter(part.last for part in partsList)
+    containedFirstsCount = sum(1 for part in partsList if isContained[part.first])
+    containedLastsCount = sum(1 for part in partsList if isContained[part.last])
+
+    # an overlap spans more than the end reads of two parts only if both parts are longer than the shorter one of them
+    lengths = overlapGraph.lengths
+    lastLengths = sorted(lengths[part.last] for part in partsList)
+    firstLengths = sorted(lengths[part.first] for part in partsList)
+    longLastLengths = sorted(lengths[part.last] for part in partsList if part.length > lengths[part.last])
+    longFirstLengths = sorted(lengths[part.first] for part in partsList if part.length > lengths[part.first])
+
+    def isSpanned(part, endLength, otherEndLength, otherLengths, longOtherLengths):
+        # the end lengths of the other parts, without those of part itself
+        isOtherLong = part.length > otherEndLength
+        longCount = len(longOtherLengths) - int(isOtherLong)
+        if part.length > endLength:
+            # long too, any other long part, or any other part whose end is longer
+            maxLength = otherLengths[-2] if otherLengths[-1] == otherEndLength and len(otherLengths) > 1 else otherLengths[-1]
+            return longCount > 0 or (len(otherLengths) > 1 and maxLength > endLength)
+        if not longCount:
+            return False
+        minLength = longOtherLengths[1] if isOtherLong and longOtherLengths[0] == otherEndLength else longOtherLengths[0]
+        return minLength < endLength
+
+    (leftCount, rightCount) = (0, 0)
+    for part in partsList:
+        # any other part ending with an encompassed read may still match
+        if not isContained[part.first] and containedLastsCount == int(isContained[part.last]):
+            if not isSpanned(part, lengths[part.first], lengths[part.last], lastLengths, longLastLengths):
+                if not any(lastsCount[i] > int(i == part.last) for i in overlapGraph.leftNeighbors[part.first]):
+                    leftCount += 1
+        if not isContained[part.last] and containedFirstsCount == int(isContained[part.first]):
+            if not isSpanned(part, lengths[part.last], lengths[part.first], firstLengths, longFirstLengths):
+                if not any(firstsCount[j] > int(j == part.first) for j in overlapGraph.rightNeighbors[part.last]):
+                    rightCount += 1
+    return (leftCount, rightCount)
 
-def assembleParts(remainingReadsList):
+
+def assembleChain(readsList, overlapGraph, failedStates):
+    """Assembles the reads as a single chain, extended one read at a time from the left-most read to the right
+
+        Any other merge order reaches the same assemblies, so this is the only order tried. Candidate neighbors are tried longest overlap first, and a chain is given up as soon as a remaining read can no longer have a left neighbor, or more than one remaining read can no longer have a right neighbor.
+
+        The chain walks the representatives of :class:`ReadGroups`, using one more copy of a representative each time it is appended, so identical reads are not tried one by one. Each copy is first placed separately, as copies of a repeat. Only if that fails, copies not needed by the chain are stacked onto a placed one.
+
+        Reads encompassed by longer reads are left out, and the full assembly is then checked by :meth:`OverlapGraph.isValidAssembly`. Merges spanning those reads are not tried; :func:`assembleParts` falls back to its full search for them.
+
+    Args:
+        readsList (:obj:`list` of :class:`PartData`): The list of single reads to assemble
+        overlapGraph (:class:`OverlapGraph`): Precomputed overlaps between single reads
+        failedStates (:class:`FailedStateCache`): Dead ends already explored
+
+    Returns:
+        sequence (string): The fully assembled context, or None if no chain is found
+    """
+    readGroups = model.ReadGroups(readsList, overlapGraph)
+    (leftNeighbors, offsets) = (readGroups.leftNeighbors, readGroups.offsets)
+    rightNeighbors = dict(
+        (i, sorted(readGroups.rightNeighbors[i], key=lambda j: (offsets[(i, j)], j)))
+        for i in readGroups.representatives
+    )
+    isReadLeftOut = readGroups.countLeftOut() > 0
+    reads = [read.sequence for read in readsList]
+
+    # the left-most read can not have a left neighbor other than its copies, unless the reads go in circle
+    startReads = [j for j in readGroups.representatives if not len(leftNeighbors[j] - set([j]))]
+    if len(startReads) > 1:
+        return None
+    if not len(startReads):
+        startReads = readGroups.representatives
+
+    for isStacked in (False, True):
+        requiredCounts = dict(
+            (i, 1 if isStacked else readGroups.multiplicity[i])
+            for i in readGroups.representatives
+        )
+        for startRead in startReads:
+            sequence = searchChain(readsList, readGroups, rightNeighbors, requiredCounts, startRead, failedStates)
+            if sequence is not None and (not isReadLeftOut or overlapGraph.isValidAssembly(sequence, reads)):
+                return sequence
+
+    return None
+
+
+def searchChain(readsList, readGroups, rightNeighbors, requiredCounts, startRead, failedStates):
+    """Extends a chain from a read depth-first, until it has the required number of copies of each representative, for :func:`assembleChain`
+
+    Args:
+        readsList (:obj:`list` of :class:`PartData`): The list of single reads
+        readGroups (:class:`ReadGroups`): Representatives of the reads
+        rightNeighbors (:obj:`dict` of int: :obj:`list` of int): Right neighbors of each representative, in the order to try
+        requiredCounts (:obj:`dict` of int: int): Number of copies of each representative to place, at most its multiplicity
+        startRead (int): The left-most representative
+        failedStates (:class:`FailedStateCache`): Dead ends already explored
+
+    Returns:
+        sequence (string): The assembled context, or None if no chain is found
+    """
+    (leftNeighbors, offsets) = (readGroups.leftNeighbors, readGroups.offsets)
+    availableCounts = dict((i, readGroups.multiplicity[i]) for i in readGroups.representatives)
+    missingCounts = dict(requiredCounts)
+
+    def isChainPossible(i):
+        endingReadsCount = 0
+        for (j, count) in missingCounts.items():
+            if count <= 0:
+                continue
+            # another copy of itself can be a neighbor too
+            if not any(k == i or availableCounts[k] > int(k == j) for k in leftNeighbors[j]):
+                return False
+            if not any(availableCounts[k] > int(k == j) for k in rightNeighbors[j]):
+                endingReadsCount += 1
+        return endingReadsCount <= 1
+
+    # the counts are hashed by XOR of each read and its count, updated on each place
+    requiredKey = frozenset(requiredCounts.items())
+    availableKey = [0]
+
+    def hashCount(j, count):
+        return model.mixHash(j * (len(readsList) + 1) + count)
+
+    for (j, count) in availableCounts.items():
+        availableKey[0] ^= hashCount(j, count)
+
+    def getStateKey(i):
+        return ('chain', requiredKey, availableKey[0], i)
+
+    def place(j, count):
+        availableKey[0] ^= hashCount(j, availableCounts[j]) ^ hashCount(j, availableCounts[j] - count)
+        availableCounts[j] -= count
+        missingCounts[j] -= count
+        return sum(max(0, count) for count in missingCounts.values())
+
+    missingLength = place(startRead, 1)
+    chain = [startRead]
+    parts = [readsList[startRead]]
+    stack = [iter(rightNeighbors[startRead])]
+
+    while len(stack):
+        if not missingLength:
+            return parts[-1].sequence
+
+        j = next(stack[-1], None)
+        if j is None:
+            # dead end of this chain, back to the previous read
+            failedStates.addFailed(getStateKey(chain[-1]))
+            stack.pop()
+            parts.pop()
+            missingLength = place(chain.pop(), -1)
+            continue
+        if not availableCounts[j]:
+            continue
+
+        i = chain[-1]
+        missingLength = place(j, 1)
+        if failedStates.isFailed(getStateKey(j), len(chain)) or not isChainPossible(j):
+            missingLength = place(j, -1)
+            continue
+        chain.append(j)
+
+        part = parts[-1]
+        parts.append(part.extendLeft(readsList[j], part.length - readsList[i].length + offsets[(i, j)]))
+        stack.append(iter(rightNeighbors[j]))
+
+        # the chain and all reads not in it
+        if failedStates.isBetter(len(readsList) - len(chain) + 1):
+            failedStates.keepBest([parts[-1]] + [
+                readsList[k]
+                for (k, count) in enumerate(readGroups.multiplicity)
+                for copy in range(availableCounts.get(k, 0))
+            ] + [readsList[k] for (k, containerIndex) in enumerate(readGroups.containedIn) if containerIndex is not None])
+
+    return None
+
+
+def iterMergedParts(remainingReadsList, overlapGraph):
+    """Generates the lists of parts after each possible merge of two parts, in the order :func:`assembleParts` tries them
+
+    Args:
+        remainingReadsList (:obj:`list` of :class:`PartData`): The list of parts to assemble
+        overlapGraph (:class:`OverlapGraph`): Precomputed overlaps between single reads
+
+    Yields:
+        :obj:`list` of :class:`PartData`: The list of parts with one merged part appended
+    """
+
+    # first try extend to left
+    for part in remainingReadsList:
+        # find a list of probable neighbors
+        leftNeighbors = overlapGraph.findRightParts(part, remainingReadsList)
+        # longest overlap first
+        leftNeighbors.sort(key=lambda match: match[1])
+
+        # try each neighbor option
+        for (neighbor, matchStartIndex) in leftNeighbors:
+            mergedPart = part.extendLeft(neighbor, matchStartIndex)
+            assembledPartsList = [
+                otherPart
+                for otherPart in remainingReadsList
+                if otherPart is not part and otherPart is not neighbor
+            ]
+            assembledPartsList.append(mergedPart)
+            yield assembledPartsList
+
+    # next try extend to right
+    for part in remainingReadsList:
+        rightNeighbors = overlapGraph.findLeftParts(part, remainingReadsList)
+        rightNeighbors.sort(key=lambda match: match[1] - match[0].length)
+        for (neighbor, matchStartIndex) in rightNeighbors:
+            mergedPart = neighbor.extendLeft(part, matchStartIndex)
+            assembledPartsList = [
+                otherPart
+                for otherPart in remainingReadsList
+                if otherPart is not part and otherPart is not neighbor
+            ]
+            assembledPartsList.append(mergedPart)
+            yield assembledPartsList
+
+
+def assembleParts(remainingReadsList, overlapGraph=None, failedStates=None):
     """Recursively assembles the reads
 
     Args:
         remainingReadsList (:obj:`list` of :class:`PartData`): The list of parts to assemble
+        overlapGraph (:class:`OverlapGraph`, optional): Precomputed overlaps between single reads; built from "remainingReadsList" on the first call if not given
+        failedStates (:class:`FailedStateCache`, optional): Dead ends already explored; a new one is used if not given
 
     Returns:
         sequence (string): The fully assembled context
@@ -14,6 +428,74 @@ def assembleParts(remainingReadsList):
         # successful result return the string
         return remainingReadsList[0].sequence
 
+    # pairwise overlaps are only computed once, on single reads
+    if overlapGraph is None:
+        overlapGraph = model.OverlapGraph(remainingReadsList)
+    if failedStates is None:
+        failedStates = FailedStateCache()
+
+    # on the first call, a single chain from the left-most read is usually enough
+    if len(remainingReadsList) == len(overlapGraph.lengths):
+        result = assembleChain(remainingReadsList, overlapGraph, failedStates)
+        if result is None:
+            result = searchParts(remainingReadsList, overlapGraph, failedStates)
+        if result is None:
+            result = assembleStacked(remainingReadsList, overlapGraph, failedStates, assembleParts)
+        return result
+    return searchParts(remainingReadsList, overlapGraph, failedStates)
+
+
+def assembleStacked(readsList, overlapGraph, failedStates, engine):
+    """Assembles one copy of each distinct read, when the copies can not all be placed separately
+
+        Identical reads do not overlap each other (the shortest overlap is taken), so a copy is only placed where another read overlaps it, as a separate copy of a repeat. Without such a place, the copies are stacked onto one position, same as the original search, which drops the parts identical to the ones it merges. The test places them there too (see :func:`test.placeReads`).
+
+    Args:
+        readsList (:obj:`list` of :class:`PartData`): The list of single reads to assemble
+        overlapGraph (:class:`OverlapGraph`): Precomputed overlaps between single reads
+        failedStates (:class:`FailedStateCache`): Dead ends already explored
+        engine (function): The search, e.g. :func:`assembleParts`
+
+    Returns:
+        sequence (string): The fully assembled context, or None if not found or if there are no identical reads
+    """
+    sequenceIndices = {}
+    for (i, read) in enumerate(readsList):
+        sequenceIndices.setdefault(read.sequence, i)
+    if len(sequenceIndices) == len(readsList):
+        return None
+    indices = sorted(sequenceIndices.values())
+    # the failed states of the full search are keyed by other read indices
+    failedStates.states.clear()
+    return engine(model.initiateReadData([readsList[i].sequence for i in indices]), overlapGraph.subgraph(indices), failedStates)
+
+
+def searchParts(remainingReadsList, overlapGraph, failedStates):
+    """Recursively assembles the parts, each merge of two parts at a time, for :func:`assembleParts`
+
+    Args:
+        remainingReadsList (:obj:`list` of :class:`PartData`): The list of parts to assemble
+        overlapGraph (:class:`OverlapGraph`): Precomputed overlaps between single reads
+        failedStates (:class:`FailedStateCache`): Dead ends already explored
+
+    Returns:
+        sequence (string): The fully assembled context
+    """
+    if len(remainingReadsList) == 1:
+        return remainingReadsList[0].sequence
+
+    # skip states reached before by another merge order
+    stateKey = failedStates.fingerprint(remainingReadsList)
+    if failedStates.isFailed(stateKey, len(overlapGraph.lengths) - len(remainingReadsList)):
+        return None
+    failedStates.keepBest(remainingReadsList)
+
+    # only one part can be left-most, and only one can be right-most
+    (leftCount, rightCount) = countDeadEnds(remainingReadsList, overlapGraph)
+    if leftCount > 1 or rightCount > 1:
+        failedStates.addFailed(stateKey)
+        return None
+
     # no longer checks for inside cases
     # since it can be bridging elsewhere in a repetitive sequence
     # for (i, part) in reversed(list(enumerate(remainingReadsList))):
@@ -22,53 +504,437 @@ def assembleParts(remainingReadsList):
     #             remainingReadsList.pop(i)
     #             break
 
-    # first try extend to left
-    for part in remainingReadsList:
-        # find a list of probable neighbors
-        leftNeighbors = [
-            otherPart
-            for otherPart in remainingReadsList
-            if otherPart != part and part.isMatchLeft(otherPart) != -1
-        ]
-
-        # if no neighbr, pass
-        if len(leftNeighbors):
-            # try each neighbor option
-            for neighbor in leftNeighbors:
-                mergedPart = part.extendLeft(neighbor)
-                assembledPartsList = [
-                    otherPart
-                    for otherPart in remainingReadsList
-                    if otherPart != part and otherPart != neighbor
-                ]
-                assembledPartsList.append(mergedPart)
-
-                # recursively assemble
-                result = assembleParts(assembledPartsList)
-                # if successful, that's it
-                if result is not None and isinstance(result, str):
-                    return result
-
-    # next try extend to right
-    for part in remainingReadsList:
-        rightNeighbors = [
-            otherPart
-            for otherPart in remainingReadsList
-            if otherPart != part and part.isMatchRight(otherPart) != -1
-        ]
-        if len(rightNeighbors):
-            for neighbor in rightNeighbors:
-                mergedPart = part.extendRight(neighbor)
-                assembledPartsList = [
-                    otherPart
-                    for otherPart in remainingReadsList
-                    if otherPart != part and otherPart != neighbor
-                ]
-                assembledPartsList.append(mergedPart)
-
-                result = assembleParts(assembledPartsList)
-                if result is not None and isinstance(result, str):
-                    return result
+    for assembledPartsList in iterMergedParts(remainingReadsList, overlapGraph):
+        # recursively assemble
+        result = searchParts(assembledPartsList, overlapGraph, failedStates)
+        # if successful, that's it
+        if result is not None and isinstance(result, str):
+            return result
 
     # When can't assemble any more (dead end of this DFS)
+    failedStates.addFailed(stateKey)
     return None
+
+
+# the ends of a chain, as read by countDeadEnds from a part
+ChainEnds = collections.namedtuple('ChainEnds', ['first', 'last', 'length'])
+
+
+class ChainState(object):
+    """Mutable state of the iterative search, as chains of single read indices
+
+        read h --> read a --> ... --> read i      chain (head h, tail i)
+        |shift a|
+
+        Merging two chains links the tail of one to the head of the other in place, and is undone by unlinking them on backtrack. Sequences are only joined when needed. The hash of the layout of each chain (see :func:`model.hashRead`), and the key of the state combining them, are updated by each merge and restored by its undo.
+
+        The chains are kept in the order of the list of parts in :func:`assembleParts`, where a merged part goes to the end, so the merges are tried in the same order.
+
+    Args:
+        readsList (:obj:`list` of :class:`PartData`): List of single reads
+        overlapGraph (:class:`OverlapGraph`): Precomputed overlaps between the reads
+
+    Returns:
+        :class:`ChainState` of {
+            'nextRead': :obj:`list` of int,
+            'previousRead': :obj:`list` of int,
+            'shift': :obj:`list` of int,
+            'chainCount': int,
+            'stateKey': int,
+            'order': :obj:`list` of int
+        }
+    """
+
+    def __init__(self, readsList, overlapGraph):
+        self.readsList = readsList
+        self.overlapGraph = overlapGraph
+        self.nextRead = [None] * len(readsList)
+        self.previousRead = [None] * len(readsList)
+        # start of a read relative to start of its previous read in the chain
+        self.shift = [0] * len(readsList)
+        # only valid at chain heads
+        self.tailOf = list(range(len(readsList)))
+        self.chainLength = [read.length for read in readsList]
+        self.chainCount = len(readsList)
+        # only valid at chain heads, same as :attr:`PartData.layoutHash` of the chain
+        self.layoutHash = [read.layoutHash for read in readsList]
+        self.stateKey = 0
+        for read in readsList:
+            self.stateKey ^= read.layoutKey
+        # head reads of the chains, in the order of the parts
+        self.order = list(range(len(readsList)))
+        # joined sequences of chains, dropped when the chain of the head changes
+        self.sequences = {}
+
+
+    def heads(self):
+        """Lists the head read of all chains, in the order of the parts
+
+        Returns:
+            :obj:`list` of int
+        """
+        return list(self.order)
+
+    def ends(self):
+        """Lists the first and last reads and the length of all chains, for :func:`countDeadEnds`
+
+        Returns:
+            :obj:`list` of :class:`ChainEnds`
+        """
+        return [ChainEnds(head, self.tailOf[head], self.chainLength[head]) for head in self.order]
+
+    def sequence(self, head):
+        """Joins the sequence of a chain, kept until the chain changes
+
+            Each read overrides its previous read from its start, same as :meth:`PartData.extendLeft`.
+
+        Args:
+            head (int): The head read of the chain
+
+        Returns:
+            string: The assembled sequence
+        """
+        if head in self.sequences:
+            return self.sequences[head]
+        reads = []
+        position = 0
+        i = head
+        while i is not None:
+            position += self.shift[i]
+            reads.append((position, i))
+            i = self.nextRead[i]
+
+        pieces = []
+        endIndex = None
+        for (position, i) in reversed(reads):
+            if endIndex is None or position < endIndex:
+                sequence = self.readsList[i].sequence
+                pieces.append(sequence if endIndex is None else sequence[0:(endIndex - position)])
+                endIndex = position
+        self.sequences[head] = ''.join(reversed(pieces))
+        return self.sequences[head]
+
+    def matchLeft(self, head, otherHead):
+        """Checks if the chain is the left neighbor of the other chain, same as :meth:`OverlapGraph.matchLeft`
+
+        Args:
+            head (int): The head read of the left chain
+            otherHead (int): The head read of the other chain
+
+        Returns:
+            int: The start index of the overlapping region in the left chain, or -1 if not matched
+        """
+        i = self.tailOf[head]
+        overlapGraph = self.overlapGraph
+        isContained = overlapGraph.isContained[i] or overlapGraph.isContained[otherHead]
+        if not isContained and (i, otherHead) in overlapGraph.overlaps:
+            return self.chainLength[head] - overlapGraph.lengths[i] + overlapGraph.overlaps[(i, otherHead)][0]
+        if not self.isEndSpanned(head, otherHead):
+            return -1
+
+        # same ends as PartData.isMatchLeft
+        length = min(self.chainLength[head], self.chainLength[otherHead])
+        minOverlapLength = min(max(self.readsList[i].right, self.readsList[otherHead].left), self.chainLength[otherHead])
+        if minOverlapLength > length:
+            return -1
+        matchStartIndex = overlapGraph.findOverlap(self.sequence(head)[-length:], self.sequence(otherHead)[0:length], minOverlapLength)
+        if matchStartIndex == -1:
+            return -1
+        return self.chainLength[head] - length + matchStartIndex
+
+    def isEndSpanned(self, head, otherHead):
+        """Checks if an overlap of the chains can span more than their end reads, same as :meth:`OverlapGraph.isEndSpanned`
+
+        Args:
+            head (int): The head read of the left chain
+            otherHead (int): The head read of the other chain
+
+        Returns:
+            bool
+        """
+        i = self.tailOf[head]
+        (isContained, lengths) = (self.overlapGraph.isContained, self.overlapGraph.lengths)
+        if isContained[i] or isContained[otherHead]:
+            return True
+        return min(self.chainLength[head], self.chainLength[otherHead]) > min(lengths[i], lengths[otherHead])
+
+    def iterMerges(self):
+        """Generates all possible merges of two chains in the current state, in the order :func:`iterMergedParts` tries them
+
+            Each merge is computed when asked for, so the state has to be the same then, i.e. any merge since undone.
+
+        Yields:
+            `tuple(int, int, int)`: The left chain head, the right chain head and the start index of the overlapping region in the left chain
+        """
+        overlapGraph = self.overlapGraph
+        heads = self.heads()
+
+        # first try extend to left, longest overlap first
+        for head in heads:
+            neighbors = overlapGraph.rightNeighbors[self.tailOf[head]]
+            merges = []
+            for otherHead in heads:
+                if otherHead == head or not (otherHead in neighbors or self.isEndSpanned(head, otherHead)):
+                    continue
+                matchStartIndex = self.matchLeft(head, otherHead)
+                if matchStartIndex != -1:
+                    merges.append((head, otherHead, matchStartIndex))
+            merges.sort(key=lambda merge: merge[2])
+            for merge in merges:
+                yield merge
+
+        # next try extend to right
+        for head in heads:
+            neighbors = overlapGraph.leftNeighbors[head]
+            merges = []
+            for otherHead in heads:
+                if otherHead == head or not (self.tailOf[otherHead] in neighbors or self.isEndSpanned(otherHead, head)):
+                    continue
+                matchStartIndex = self.matchLeft(otherHead, head)
+                if matchStartIndex != -1:
+                    merges.append((otherHead, head, matchStartIndex))
+            merges.sort(key=lambda merge: merge[2] - self.chainLength[merge[0]])
+            for merge in merges:
+                yield merge
+
+    def merge(self, head, otherHead, matchStartIndex):
+        """Links the tail of a chain to the head of the other chain
+
+        Args:
+            head (int): The head read of the left chain
+            otherHead (int): The head read of the right chain
+            matchStartIndex (int): The start index of the overlapping region in the left chain
+
+        Returns:
+            `tuple(int, int, int, int, int, int, int)`: Undo record for :meth:`undo`
+        """
+        i = self.tailOf[head]
+        otherTail = self.tailOf[otherHead]
+        (headIndex, otherHeadIndex) = (self.order.index(head), self.order.index(otherHead))
+        undoRecord = (head, otherHead, self.chainLength[head], self.layoutHash[head], self.stateKey, headIndex, otherHeadIndex)
+        # the merged part goes to the end
+        self.order.pop(max(headIndex, otherHeadIndex))
+        self.order.pop(min(headIndex, otherHeadIndex))
+        self.order.append(head)
+        # the other chain is left as is, and is a chain again only once this merge is undone
+        self.sequences.pop(head, None)
+
+        # the left chain ends with its tail read
+        self.shift[otherHead] = matchStartIndex - (self.chainLength[head] - self.readsList[i].length)
+        self.nextRead[i] = otherHead
+        self.previousRead[otherHead] = i
+        self.tailOf[head] = otherTail
+        self.chainLength[head] = matchStartIndex + self.chainLength[otherHead]
+        self.chainCount -= 1
+        # the other chain starts at the overlapping region
+        self.stateKey ^= model.mixHash(self.layoutHash[head]) ^ model.mixHash(self.layoutHash[otherHead])
+        self.layoutHash[head] = model.joinLayoutHashes(self.layoutHash[head], self.layoutHash[otherHead], matchStartIndex)
+        self.stateKey ^= model.mixHash(self.layoutHash[head])
+        return undoRecord
+
+    def undo(self, undoRecord):
+        """Reverts a :meth:`merge`
+
+        Args:
+            undoRecord (`tuple(int, int, int, int, int, int, int)`): Returned by :meth:`merge`
+        """
+        (head, otherHead, chainLength, layoutHash, stateKey, headIndex, otherHeadIndex) = undoRecord
+        i = self.previousRead[otherHead]
+        self.order.pop()
+        for (index, h) in sorted([(headIndex, head), (otherHeadIndex, otherHead)]):
+            self.order.insert(index, h)
+        self.sequences.pop(head, None)
+
+        self.shift[otherHead] = 0
+        self.nextRead[i] = None
+        self.previousRead[otherHead] = None
+        self.tailOf[head] = i
+        self.chainLength[head] = chainLength
+        self.chainCount += 1
+        self.layoutHash[head] = layoutHash
+        self.stateKey = stateKey
+
+    def fingerprint(self):
+        """Canonical key of the current state, independent of merge order, same as :meth:`FailedStateCache.fingerprint` of its parts
+
+        Returns:
+            int: Key of the state
+        """
+        return self.stateKey
+
+    def parts(self):
+        """Converts the chains to parts
+
+        Returns:
+            :obj:`list` of :class:`PartData`: One part for each chain
+        """
+        partsList = []
+        for head in self.heads():
+            part = self.readsList[head]
+            position = 0
+            i = self.nextRead[head]
+            while i is not None:
+                position += self.shift[i]
+                part = part.extendLeft(self.readsList[i], position)
+                i = self.nextRead[i]
+            partsList.append(part)
+        return partsList
+
+
+def assemblePartsIterative(readsList, overlapGraph=None, failedStates=None):
+    """Assembles the reads depth-first with an explicit stack, same result as :func:`assembleParts`
+
+        Instead of building new lists of parts, each merge is applied in place on a :class:`ChainState` and undone on backtrack. The merges are tried in the same order (see :meth:`ChainState.iterMerges`), and each state gets the same checks as in :func:`searchParts`, so the same assembly is found.
+
+    Args:
+        readsList (:obj:`list` of :class:`PartData`): The list of single reads to assemble
+        overlapGraph (:class:`OverlapGraph`, optional): Precomputed overlaps between single reads; built from "readsList" if not given
+        failedStates (:class:`FailedStateCache`, optional): Dead ends already explored; a new one is used if not given
+
+    Returns:
+        sequence (string): The fully assembled context
+    """
+
+    if not len(readsList):
+        return None
+    if overlapGraph is None:
+        overlapGraph = model.OverlapGraph(readsList)
+    if failedStates is None:
+        failedStates = FailedStateCache()
+
+    # same as the first call of assembleParts
+    result = assembleChain(readsList, overlapGraph, failedStates)
+    if result is not None:
+        return result
+
+    state = ChainState(readsList, overlapGraph)
+
+    def isDeadEnd(stateKey):
+        # same checks as searchParts on entering a state
+        if failedStates.isFailed(stateKey, len(readsList) - state.chainCount):
+            return True
+        if failedStates.isBetter(state.chainCount):
+            failedStates.keepBest(state.parts())
+        (leftCount, rightCount) = countDeadEnds(state.ends(), overlapGraph)
+        if leftCount > 1 or rightCount > 1:
+            failedStates.addFailed(stateKey)
+            return True
+        return False
+
+    if state.chainCount == 1:
+        return state.sequence(state.heads()[0])
+    # each level keeps its state key, its untried merges, and the undo record that led to it
+    stack = []
+    if not isDeadEnd(state.fingerprint()):
+        stack.append((state.fingerprint(), state.iterMerges(), None))
+
+    while len(stack):
+        (stateKey, merges, undoRecord) = stack[-1]
+        nextMerge = next(merges, None)
+
+        if nextMerge is None:
+            # dead end of this DFS, back to the previous state
+            stack.pop()
+            failedStates.addFailed(stateKey)
+            if undoRecord is not None:
+                state.undo(undoRecord)
+            continue
+
+        undoRecord = state.merge(*nextMerge)
+        if state.chainCount == 1:
+            # successful result return the string
+            return state.sequence(state.heads()[0])
+        if isDeadEnd(state.fingerprint()):
+            state.undo(undoRecord)
+            continue
+        stack.append((state.fingerprint(), state.iterMerges(), undoRecord))
+
+    return assembleStacked(readsList, overlapGraph, failedStates, assemblePartsIterative)
+
+
+def assembleGreedy(readsList):
+    """Assembles the reads by the single-pass greedy approach, and keeps the result only if it passes the test
+
+        The greedy approach (:func:`assembly_old.assembleParts`) is sensitive to the order of reads in repetitive sequences, but is right on most other inputs, much faster than the search. Its result is checked by :func:`test.isValidAssembly`, so a search is only needed when this returns None.
+
+    Args:
+        readsList (:obj:`list` of :class:`PartData`): The list of single reads to assemble
+
+    Returns:
+        sequence (string): The fully assembled context, or None if the greedy approach failed
+    """
+    reads = [read.sequence for read in readsList]
+    if not len(reads):
+        return None
+
+    try:
+        sequence = assembly_old.assembleParts(assembly_old.initiateReadData(reads))
+    except RuntimeError:
+        return None
+    if not test.isValidAssembly(sequence, reads):
+        return None
+    return sequence
+
+
+def collectContigs(partsList):
+    """Lists the sequences of a partial assembly as separate contigs, longest first
+
+        Parts never share a read, so their sequences do not conflict. Parts encompassed by a longer one (e.g. left-over single reads) add nothing and are dropped.
+
+    Args:
+        partsList (:obj:`list` of :class:`PartData`): The list of parts, e.g. "bestPartsList" of :class:`FailedStateCache`
+
+    Returns:
+        :obj:`list` of string: The contigs
+    """
+    contigs = []
+    for sequence in sorted((part.sequence for part in partsList), key=len, reverse=True):
+        if not any(sequence in contig for contig in contigs):
+            contigs.append(sequence)
+    return contigs
+
+
+def assembleContigs(readsList, overlapGraph, engine=None, failedStates=None):
+    """Assembles the reads with a search engine, or into the best partial assembly if it fails
+
+        Reads that fall into separate components (see :meth:`OverlapGraph.findComponents`) are searched by the engine one component at a time, since a full assembly of them is ruled out at once. Each component gets its own dead-end cache, with a share of the budget left proportional to its number of reads (see :meth:`FailedStateCache.share`), and gives its own contigs: its assembled context, or the contigs (see :func:`collectContigs`) of the best partial assembly of its search.
+
+    Args:
+        readsList (:obj:`list` of :class:`PartData`): The list of single reads to assemble
+        overlapGraph (:class:`OverlapGraph`): Precomputed overlaps between single reads
+        engine (:obj:`function`, optional): The search engine, :func:`assembleParts` if not given
+        failedStates (:class:`FailedStateCache`, optional): Dead ends already explored, and the budget of the search; a new one is used if not given
+
+    Returns:
+        :obj:`list` of string: The fully assembled context as a single contig, or the contigs of the best partial assembly
+    """
+    if engine is None:
+        engine = assembleParts
+    if failedStates is None:
+        failedStates = FailedStateCache()
+    if not len(readsList):
+        return []
+
+    components = overlapGraph.findComponents(readsList)
+    if len(components) == 1:
+        result = engine(readsList, overlapGraph, failedStates)
+        if result is not None:
+            return [result]
+        return collectContigs(failedStates.bestPartsList or readsList)
+
+    contigs = []
+    bestPartsList = []
+    readsLeftCount = len(readsList)
+    for component in components:
+        partsList = model.initiateReadData([readsList[i].sequence for i in component])
+        componentStates = failedStates.share(len(component) / float(readsLeftCount))
+        readsLeftCount -= len(component)
+        result = engine(partsList, overlapGraph.subgraph(component), componentStates)
+        failedStates.addCounts(componentStates)
+        if result is not None:
+            contigs.append(result)
+        else:
+            contigs.extend(collectContigs(componentStates.bestPartsList or partsList))
+        bestPartsList.extend(componentStates.bestPartsList or partsList)
+    failedStates.bestPartsList = bestPartsList
+    return sorted(contigs, key=len, reverse=True)
@@ -0,0 +1,263 @@
+import itertools
+
+from . import assembly
+from . import model
+
+
+class StringGraph(object):
+    """Construct the string graph of the reads: the overlap graph without contained reads and transitive edges
+
+        ----------------                        read u
+             ------------------                 read v
+                    -------------------         read w
+
+        Edges u -> v and v -> w imply u -> w with offset(u, w) = offset(u, v) + offset(v, w), so u -> w is removed. Once reduced, an unambiguous sequence is a single path, and branches only remain at repeats.
+
+        A read encompassed by a longer read is dropped, since its sequence is covered anyway. Identical reads are all kept, each of them being a separate copy of a repeat.
+
+    Args:
+        readsList (:obj:`list` of :class:`PartData`): List of single reads
+        overlapGraph (:class:`OverlapGraph`): Precomputed overlaps between the reads
+
+    Returns:
+        :class:`StringGraph` of {
+            'containedIn': :obj:`list` of int,
+            'nodes': :obj:`list` of int,
+            'rightEdges': :obj:`list` of :obj:`dict` of int: int,
+            'leftEdges': :obj:`list` of :obj:`dict` of int: int,
+            'reducedEdges': :obj:`list` of `tuple(int, int, int)`
+        }
+    """
+
+    def __init__(self, readsList, overlapGraph):
+        self.readsList = readsList
+        self.overlapGraph = overlapGraph
+        self.containedIn = overlapGraph.findContainers(readsList)
+        self.nodes = [i for i in range(len(readsList)) if self.containedIn[i] is None]
+
+        # offset of the right read from the start of the left read
+        self.rightEdges = [{} for read in readsList]
+        self.leftEdges = [{} for read in readsList]
+        for ((i, j), (matchStartIndex, minOverlapLength)) in overlapGraph.overlaps.items():
+            if self.containedIn[i] is None and self.containedIn[j] is None:
+                self.rightEdges[i][j] = matchStartIndex
+                self.leftEdges[j][i] = matchStartIndex
+        self.reducedEdges = []
+
+
+    def reduceTransitiveEdges(self):
+        """Removes edges implied by two other edges with consistent offsets
+
+        Returns:
+            int: Number of edges removed
+        """
+        transitiveEdges = set()
+        for i in self.nodes:
+            rightEdges = self.rightEdges[i]
+            for (j, offset) in rightEdges.items():
+                # identical reads can overlap at offset 0, and can not imply each other's edges
+                if offset == 0:
+                    continue
+                for (k, otherOffset) in self.rightEdges[j].items():
+                    if otherOffset != 0 and rightEdges.get(k) == offset + otherOffset:
+                        transitiveEdges.add((i, k))
+
+        for (i, k) in sorted(transitiveEdges):
+            self.reducedEdges.append((i, k, self.rightEdges[i].pop(k)))
+            del self.leftEdges[k][i]
+        return len(transitiveEdges)
+
+    def restoreEdges(self):
+        """Adds back the edges removed by :meth:`reduceTransitiveEdges`"""
+        for (i, k, offset) in self.reducedEdges:
+            self.rightEdges[i][k] = offset
+            self.leftEdges[k][i] = offset
+        self.reducedEdges = []
+
+    def findUnitigs(self):
+        """Collapses non-branching paths into unitigs
+
+            --> u --> v --> w -->      v has 1 left and 1 right edge: u, v, w form one unitig
+
+        Returns:
+            :obj:`list` of :obj:`list` of int: Reads of each unitig, from left to right
+        """
+        (rightEdges, leftEdges) = (self.rightEdges, self.leftEdges)
+
+        def isHead(j):
+            if len(leftEdges[j]) != 1:
+                return True
+            i = next(iter(leftEdges[j]))
+            return len(rightEdges[i]) != 1 or i == j
+
+        unitigs = []
+        visited = set()
+        # heads of paths first, then whatever is left of cycles
+        for head in [j for j in self.nodes if isHead(j)] + self.nodes:
+            if head in visited:
+                continue
+            unitig = [head]
+            visited.add(head)
+            i = head
+            while len(rightEdges[i]) == 1:
+                j = next(iter(rightEdges[i]))
+                if j in visited or len(leftEdges[j]) != 1:
+                    break
+                unitig.append(j)
+                visited.add(j)
+                i = j
+            unitigs.append(unitig)
+        return unitigs
+
+    def iterPaths(self, failedStates, name=''):
+        """Generates orders of unitigs visiting each of them exactly once, walking on while there is a single unvisited unitig next and branching only at forks
+
+            --> A --> B --< C      the walk goes on from A to B, and only C or D next to B is a choice
+                          < D
+
+            The visited unitigs are a bit mask updated on each step and undone on backtrack. Only forks are kept as states in "failedStates", keyed by the visited unitigs and the fork.
+
+        Args:
+            failedStates (:class:`FailedStateCache`): Dead ends already explored
+            name (:obj:`string`, optional): Tag of this graph in the keys of "failedStates", since dead ends differ between graphs
+
+        Yields:
+            :obj:`list` of int: Reads along the path
+        """
+        unitigs = self.findUnitigs()
+        if not len(unitigs):
+            return
+        unitigOf = dict((unitig[0], u) for (u, unitig) in enumerate(unitigs))
+        nextUnitigs = [
+            sorted(
+                (unitigOf[j] for j in self.rightEdges[unitig[-1]] if j in unitigOf),
+                key=lambda v: (self.rightEdges[unitig[-1]][unitigs[v][0]], v)
+            )
+            for unitig in unitigs
+        ]
+
+        # a path can only start at the single unitig without left edges, or anywhere if there is none
+        # edges at offset 0 are between copies of the same read, which can start or end a path together
+        startUnitigs = [u for (u, unitig) in enumerate(unitigs) if not any(self.leftEdges[unitig[0]].values())]
+        endUnitigs = [u for (u, unitig) in enumerate(unitigs) if not any(self.rightEdges[unitig[-1]].values())]
+        if len(startUnitigs) > 1 or len(endUnitigs) > 1:
+            return
+        if not len(startUnitigs):
+            startUnitigs = list(range(len(unitigs)))
+
+        for startUnitig in startUnitigs:
+            path = []
+            visitedMask = 0
+            # length of the path at each fork, and the unitigs left to try there
+            forks = []
+            nextUnitig = startUnitig
+            while nextUnitig is not None:
+                # walk on while there is a single way
+                while nextUnitig is not None:
+                    path.append(nextUnitig)
+                    visitedMask |= 1 << nextUnitig
+                    if len(path) == len(unitigs):
+                        yield [i for u in path for i in unitigs[u]]
+                        break
+                    choices = [v for v in nextUnitigs[nextUnitig] if not (visitedMask >> v) & 1]
+                    if len(choices) > 1:
+                        if not failedStates.isFailed((name, visitedMask, nextUnitig), len(path)):
+                            forks.append((len(path), iter(choices)))
+                        break
+                    nextUnitig = choices[0] if len(choices) else None
+
+                # dead end of this walk, back to the last fork with a choice left
+                nextUnitig = None
+                while nextUnitig is None and len(forks):
+                    (forkLength, choices) = forks[-1]
+                    while len(path) > forkLength:
+                        visitedMask ^= 1 << path.pop()
+                    nextUnitig = next(choices, None)
+                    if nextUnitig is None:
+                        failedStates.addFailed((name, visitedMask, path[-1]))
+                        forks.pop()
+
+    def isValidPath(self, path):
+        """Checks if a path is valid by itself, without searching the reads in its sequence
+
+            This holds if no read was left out of the graph, and each pair of neighbors overlaps by at least half of both reads, as required by :func:`test.validateOverlapLengthEach`.
+
+        Args:
+            path (:obj:`list` of int): Reads from left to right, as from :meth:`iterPaths`
+
+        Returns:
+            bool: Whether the path is known to be valid
+        """
+        if len(self.nodes) != len(self.readsList):
+            return False
+
+        lengths = self.overlapGraph.lengths
+        for (i, j) in zip(path[:-1], path[1:]):
+            overlapLength = lengths[i] - self.rightEdges[i][j]
+            if overlapLength * 2 < lengths[i] or overlapLength * 2 < lengths[j]:
+                return False
+        return True
+
+    def layoutPath(self, path):
+        """Merges the reads along a path into a partial assembly
+
+        Args:
+            path (:obj:`list` of int): Reads from left to right, as from :meth:`iterPaths`
+
+        Returns:
+            :class:`PartData`: The merged assembly
+        """
+        part = self.readsList[path[0]]
+        for (i, j) in zip(path[:-1], path[1:]):
+            part = part.extendLeft(self.readsList[j], part.length - self.readsList[i].length + self.rightEdges[i][j])
+        return part
+
+
+def assembleGraph(readsList, overlapGraph=None, failedStates=None, maxPaths=1000):
+    """Assembles the reads by walking the string graph, same result as :func:`assembly.assembleParts` when the reconstruction is unique
+
+        Tried in order, until one of them yields a path that passes :meth:`StringGraph.isValidPath`, or whose sequence passes :meth:`OverlapGraph.isValidAssembly`:
+
+            1. Paths through the unitigs of the transitively reduced :class:`StringGraph`
+            2. Paths through the unitigs of the unreduced graph, in case a repeat needs a removed edge
+            3. :func:`assembly.assembleParts` on all reads, in case an overlap spans a contained read, or no valid path was among the first "maxPaths"; this is printed
+
+    Args:
+        readsList (:obj:`list` of :class:`PartData`): The list of single reads to assemble
+        overlapGraph (:class:`OverlapGraph`, optional): Precomputed overlaps between single reads; built from "readsList" if not given
+        failedStates (:class:`FailedStateCache`, optional): Dead ends already explored; a new one is used if not given
+        maxPaths (:obj:`int`, optional): Maximum number of paths to check on each graph
+
+    Returns:
+        sequence (string): The fully assembled context
+    """
+
+    if not len(readsList):
+        return None
+    if overlapGraph is None:
+        overlapGraph = model.OverlapGraph(readsList)
+    if failedStates is None:
+        failedStates = assembly.FailedStateCache()
+
+    reads = [read.sequence for read in readsList]
+    stringGraph = StringGraph(readsList, overlapGraph)
+    stringGraph.reduceTransitiveEdges()
+    pathsCounts = []
+    for name in ('reduced', 'unreduced'):
+        if name == 'unreduced':
+            if not len(stringGraph.reducedEdges):
+                break
+            stringGraph.restoreEdges()
+
+        pathsCount = 0
+        for path in itertools.islice(stringGraph.iterPaths(failedStates, name), maxPaths):
+            sequence = stringGraph.layoutPath(path).sequence
+            if stringGraph.isValidPath(path) or overlapGraph.isValidAssembly(sequence, reads):
+                return sequence
+            pathsCount += 1
+        pathsCounts.append('\033[95m%s\033[0m on the %s graph' % (pathsCount, name))
+        if pathsCount == maxPaths:
+            pathsCounts[-1] += ' (\033[93mlimit reached\033[0m)'
+
+    print('String graph: no valid path among %s, falling back to \033[95mrecursive\033[0m search.' % ', '.join(pathsCounts))
+    return assembly.assembleParts(readsList, overlapGraph, failedStates)
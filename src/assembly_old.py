@@ -1,4 +1,45 @@
-from . import model
+def partData(sequence, leftLength=None, rightLength=None):
+    """Construct data representation of a "part" for the greedy approach, which can be either a single read or a partial assembly of reads
+
+    Args:
+        sequence (string): The sequence of the part
+        leftLength (:obj:`int`, optional): The minimum overlapping length on the left; half of the sequence if not given
+        rightLength (:obj:`int`, optional): The minimum overlapping length on the right; half of the sequence if not given
+
+    Returns:
+        :obj:`dict` of {
+            'sequence': string,
+            'minOverlapLength': :obj:`dict` of {
+                'left': int,
+                'right': int
+            }
+        }
+    """
+    if leftLength is None:
+        leftLength = len(sequence) // 2
+    if rightLength is None:
+        rightLength = len(sequence) // 2
+
+    return {
+        'sequence': sequence,
+        'minOverlapLength': {
+            'left': leftLength,
+            'right': rightLength
+        }
+    }
+
+
+def initiateReadData(readsList):
+    """Converts list of reads to list of :obj:`partData`
+
+    Args:
+        readsList (:obj:`list` of string): List of reads in string
+
+    Returns:
+        :obj:`list` of :obj:`partData`
+    """
+
+    return [partData(read) for read in readsList]
 
 
 def matchReadInside(singleRead, assembledPart):
@@ -47,7 +88,7 @@ def matchReadExtendLeft(singleRead, assembledPart):
     else:
         newSequence = singleRead['sequence'][0:matchStartIndex] + assembledPart['sequence']
         newLeftLength = singleRead['minOverlapLength']['left']
-        return (True, model.partData(newSequence, newLeftLength, singleRead['minOverlapLength']['right']))
+        return (True, partData(newSequence, newLeftLength, singleRead['minOverlapLength']['right']))
 
 
 def matchReadExtendRight(singleRead, assembledPart):
@@ -77,7 +118,7 @@ def matchReadExtendRight(singleRead, assembledPart):
     else:
         newSequence = assembledPart['sequence'] + singleRead['sequence'][(matchStartIndex + minOverlapLength):]
         newRightLength = singleRead['minOverlapLength']['right']
-        return (True, model.partData(newSequence, singleRead['minOverlapLength']['left'], newRightLength))
+        return (True, partData(newSequence, singleRead['minOverlapLength']['left'], newRightLength))
 
 
 def assembleParts(remainingReadsList):
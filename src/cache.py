@@ -0,0 +1,238 @@
+import contextlib
+import hashlib
+import json
+import sqlite3
+import time
+
+
+# minimum overlapping length over read length, as in PartData; part of every key
+OVERLAP_RATIO = 0.5
+
+# below the limit of variables in a statement of older SQLite
+QUERY_CHUNK_SIZE = 500
+
+
+def hashRead(read):
+    """Hashes the sequence of a read, as its address in the cache
+
+    Args:
+        read (string): The read
+
+    Returns:
+        string: Hex digest
+    """
+    return hashlib.sha1(read.encode('utf-8')).hexdigest()
+
+
+class AssemblyCache(object):
+    """Construct a persistent cache of overlaps and assemblies in an SQLite file, addressed by the content of reads
+
+        * Assemblies are keyed by the hash of all reads in order, with the overlap ratio and the settings of the search. An unchanged input is not assembled again.
+        * Overlaps are kept for each read, as the results of comparing it to reads on its right, keyed by their hashes. Pairs of reads are only compared again when either read is new to the cache, so an input with a few changed reads only compares those.
+
+        Entries are evicted least recently used first when the file grows over "maxSize". The total size of entries is kept in the "metadata" table, updated by each write in its transaction, so a write does not sum the sizes of all entries. The file can be shared by several processes: it is in write-ahead logging mode, and each write waits for the others up to "timeout".
+
+    Args:
+        fileName (string): Name of SQLite file, created if not existing
+        maxSize (:obj:`int`, optional): Maximum total size of entries in bytes
+        timeout (:obj:`float`, optional): Seconds to wait for a lock held by another process
+
+    Returns:
+        :class:`AssemblyCache` of {
+            'connection': :obj:`sqlite3.Connection`,
+            'maxSize': int,
+            'hits': int,
+            'misses': int
+        }
+
+        "hits" and "misses" count the lookups of assemblies.
+    """
+
+    def __init__(self, fileName, maxSize=256 * 1024 * 1024, timeout=60.0):
+        self.fileName = fileName
+        self.maxSize = maxSize
+        self.hits = 0
+        self.misses = 0
+
+        # transactions are opened explicitly, see transaction()
+        self.connection = sqlite3.connect(fileName, timeout=timeout, isolation_level=None)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        with self.transaction():
+            self.connection.execute('CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, accessTime REAL NOT NULL)')
+            self.connection.execute('CREATE INDEX IF NOT EXISTS entriesAccessTime ON entries (accessTime)')
+            self.connection.execute('CREATE TABLE IF NOT EXISTS metadata (key TEXT PRIMARY KEY, value INTEGER NOT NULL)')
+            # summed once for a file written before the total was kept
+            self.connection.execute("INSERT OR IGNORE INTO metadata (key, value) SELECT 'totalSize', COALESCE(SUM(size), 0) FROM entries")
+
+
+    @contextlib.contextmanager
+    def transaction(self):
+        """Holds the write lock for a block, committed at its end or rolled back on error
+
+            The lock is taken at the start, so a read followed by a write in the block does not conflict with other processes.
+        """
+        self.connection.execute('BEGIN IMMEDIATE')
+        try:
+            yield
+        except BaseException:
+            self.connection.execute('ROLLBACK')
+            raise
+        self.connection.execute('COMMIT')
+
+    def close(self):
+        """Closes the SQLite file"""
+        self.connection.close()
+
+    def getEntries(self, keys):
+        """Gets entries and marks them as recently used, within a transaction
+
+        Args:
+            keys (:obj:`list` of string): Keys of entries
+
+        Returns:
+            :obj:`dict` of string: object: Decoded values of the keys found
+        """
+        entries = {}
+        now = time.time()
+        for i in range(0, len(keys), QUERY_CHUNK_SIZE):
+            chunk = keys[i:(i + QUERY_CHUNK_SIZE)]
+            marks = ','.join('?' * len(chunk))
+            for (key, value) in self.connection.execute('SELECT key, value FROM entries WHERE key IN (%s)' % marks, chunk):
+                entries[key] = json.loads(value)
+            self.connection.execute('UPDATE entries SET accessTime = ? WHERE key IN (%s)' % marks, [now] + chunk)
+        return entries
+
+    def putEntries(self, entries):
+        """Adds or replaces entries, then evicts the least recently used ones over the size limit, within a transaction
+
+            The total size kept in the "metadata" table is updated by the sizes of the entries added, replaced and evicted.
+
+        Args:
+            entries (:obj:`dict` of string: object): JSON-serializable values by keys
+        """
+        now = time.time()
+        rows = []
+        totalSize = self.connection.execute("SELECT value FROM metadata WHERE key = 'totalSize'").fetchone()[0]
+        for (key, value) in entries.items():
+            value = json.dumps(value, separators=(',', ':'))
+            rows.append((key, value, len(key) + len(value), now))
+            totalSize += len(key) + len(value)
+        # replaced entries no longer count
+        keys = list(entries)
+        for i in range(0, len(keys), QUERY_CHUNK_SIZE):
+            chunk = keys[i:(i + QUERY_CHUNK_SIZE)]
+            marks = ','.join('?' * len(chunk))
+            totalSize -= self.connection.execute('SELECT COALESCE(SUM(size), 0) FROM entries WHERE key IN (%s)' % marks, chunk).fetchone()[0]
+        self.connection.executemany('INSERT OR REPLACE INTO entries (key, value, size, accessTime) VALUES (?, ?, ?, ?)', rows)
+
+        if totalSize > self.maxSize:
+            evictedKeys = []
+            for (key, size) in self.connection.execute('SELECT key, size FROM entries ORDER BY accessTime'):
+                if totalSize <= self.maxSize:
+                    break
+                evictedKeys.append((key,))
+                totalSize -= size
+            self.connection.executemany('DELETE FROM entries WHERE key = ?', evictedKeys)
+        self.connection.execute("UPDATE metadata SET value = ? WHERE key = 'totalSize'", (totalSize,))
+
+    def getAssemblyKey(self, reads, settings):
+        """Hashes all reads in order, with the overlap ratio and the settings of the search
+
+        Args:
+            reads (:obj:`list` of string): List of reads in string
+            settings (string): Settings that change the result, e.g. the engine
+
+        Returns:
+            string
+        """
+        digest = hashlib.sha1(('%s|%s' % (OVERLAP_RATIO, settings)).encode('utf-8'))
+        for read in reads:
+            digest.update(hashRead(read).encode('utf-8'))
+        return 'assembly:%s' % digest.hexdigest()
+
+    def getAssembly(self, reads, settings):
+        """Looks up the assembly of reads
+
+        Args:
+            reads (:obj:`list` of string): List of reads in string
+            settings (string): Settings that change the result, e.g. the engine
+
+        Returns:
+            :obj:`tuple` of (
+                result (string): The assembled result, or None if not found
+                tier (string): The engine that produced it, or None if not found
+            )
+        """
+        key = self.getAssemblyKey(reads, settings)
+        with self.transaction():
+            entry = self.getEntries([key]).get(key)
+        if entry is None:
+            self.misses += 1
+            return (None, None)
+        self.hits += 1
+        # unicode from json on python 2.x
+        return (str(entry['result']), str(entry['tier']))
+
+    def putAssembly(self, reads, settings, result, tier):
+        """Stores the assembly of reads, which should have passed the test
+
+        Args:
+            reads (:obj:`list` of string): List of reads in string
+            settings (string): Settings that change the result, e.g. the engine
+            result (string): The assembled result
+            tier (string): The engine that produced it
+        """
+        with self.transaction():
+            self.putEntries({self.getAssemblyKey(reads, settings): {'result': result, 'tier': tier}})
+
+    def getPairs(self, reads):
+        """Looks up the compared pairs of reads, as "knownPairs" of :class:`OverlapGraph`
+
+        Args:
+            reads (:obj:`list` of string): List of reads in string
+
+        Returns:
+            :obj:`dict` of `tuple(int, int)`: `tuple(bool, int)`: Results of pairs (i, j), for all pairs compared before
+        """
+        readHashes = [hashRead(read) for read in reads]
+        readIndices = {}
+        for (i, readHash) in enumerate(readHashes):
+            readIndices.setdefault(readHash, []).append(i)
+
+        with self.transaction():
+            entries = self.getEntries(['pairs:%s:%s' % (OVERLAP_RATIO, readHash) for readHash in readIndices])
+
+        knownPairs = {}
+        for (i, readHash) in enumerate(readHashes):
+            row = entries.get('pairs:%s:%s' % (OVERLAP_RATIO, readHash))
+            if row is None:
+                continue
+            for (otherHash, (isInside, matchStartIndex)) in row.items():
+                for j in readIndices.get(otherHash, ()):
+                    knownPairs[(i, j)] = (isInside, matchStartIndex)
+        return knownPairs
+
+    def putPairs(self, reads, pairs):
+        """Stores the compared pairs of reads, merged into the results stored before for each read
+
+        Args:
+            reads (:obj:`list` of string): List of reads in string
+            pairs (:obj:`dict` of `tuple(int, int)`: `tuple(bool, int)`): Results of pairs (i, j), as "pairs" of :class:`OverlapGraph`
+        """
+        readHashes = [hashRead(read) for read in reads]
+        rows = {}
+        for ((i, j), result) in pairs.items():
+            rows.setdefault(readHashes[i], {})[readHashes[j]] = list(result)
+
+        with self.transaction():
+            keys = ['pairs:%s:%s' % (OVERLAP_RATIO, readHash) for readHash in rows]
+            entries = self.getEntries(keys)
+            changedEntries = {}
+            for (key, readHash) in zip(keys, rows):
+                row = entries.get(key, {})
+                # only rewritten with new pairs
+                if any(otherHash not in row for otherHash in rows[readHash]):
+                    row.update(rows[readHash])
+                    changedEntries[key] = row
+            if len(changedEntries):
+                self.putEntries(changedEntries)
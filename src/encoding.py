@@ -0,0 +1,116 @@
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+NUCLEOTIDES = 'TCGA'
+
+
+class EncodedReadStore(object):
+    """Construct a store of reads packed at 2 bits per nucleotide, with vectorized comparison
+
+        T -> 00, C -> 01, G -> 10, A -> 11; 4 nucleotides per byte
+
+        All reads are concatenated into one packed array. Any region of any read is unpacked by its positions in a single NumPy operation, so comparisons run outside of the interpreter.
+
+    Args:
+        readsList (:obj:`list` of string): List of reads in string, of T/C/G/A only
+
+    Returns:
+        :class:`EncodedReadStore` of {
+            'packed': :obj:`numpy.ndarray` of uint8,
+            'starts': :obj:`numpy.ndarray` of int64,
+            'lengths': :obj:`numpy.ndarray` of int64
+        }
+
+    Raises:
+        ImportError: When NumPy is not installed
+        ValueError: When a read has characters other than T/C/G/A
+    """
+
+    def __init__(self, readsList):
+        if numpy is None:
+            raise ImportError('\033[41mNumPy\033[0m is required for encoded reads.')
+
+        self.lengths = numpy.array([len(read) for read in readsList], dtype=numpy.int64)
+        self.starts = numpy.zeros(len(readsList), dtype=numpy.int64)
+        if len(readsList):
+            self.starts[1:] = numpy.cumsum(self.lengths)[:-1]
+
+        codeTable = numpy.full(256, 255, dtype=numpy.uint8)
+        for (code, nucleotide) in enumerate(NUCLEOTIDES):
+            codeTable[ord(nucleotide)] = code
+        codes = codeTable[numpy.frombuffer(''.join(readsList).encode('ascii'), dtype=numpy.uint8)]
+        if numpy.any(codes == 255):
+            raise ValueError('\033[41mInvalid\033[0m nucleotides in reads, only (\033[94m%s\033[0m) can be encoded.' % NUCLEOTIDES)
+
+        # pad to whole bytes
+        codes = numpy.concatenate([codes, numpy.zeros((-len(codes)) % 4, dtype=numpy.uint8)]).reshape(-1, 4)
+        self.packed = (codes[:, 0] | (codes[:, 1] << 2) | (codes[:, 2] << 4) | (codes[:, 3] << 6)).astype(numpy.uint8)
+
+
+    def getCodes(self, positions):
+        """Unpacks nucleotide codes at positions of the concatenated reads
+
+        Args:
+            positions (:obj:`numpy.ndarray` of int): Positions in the concatenated reads
+
+        Returns:
+            :obj:`numpy.ndarray` of uint8: Codes from 0 to 3
+        """
+        return (self.packed[positions >> 2] >> ((positions & 3) << 1).astype(numpy.uint8)) & 3
+
+    def getRead(self, i):
+        """Decodes a read back to string
+
+        Args:
+            i (int): Index of the read
+
+        Returns:
+            string: The read
+        """
+        codes = self.getCodes(numpy.arange(self.starts[i], self.starts[i] + self.lengths[i]))
+        return ''.join(NUCLEOTIDES[code] for code in codes)
+
+    def verifyOverlaps(self, i, candidates, matchStartIndices):
+        """Checks the suffix of read i against the prefix of many candidate reads at once
+
+            ----------------                read i
+                 |   overlap   |
+                 ------------------------   candidate
+                 ^
+            matchStartIndex
+
+        Args:
+            i (int): Index of the read on the left
+            candidates (:obj:`list` of int): Indices of the reads on the right
+            matchStartIndices (:obj:`list` of int): Start index of the overlapping region in read i for each candidate
+
+        Returns:
+            :obj:`numpy.ndarray` of bool: Whether read i from "matchStartIndex" to its end equals the start of each candidate
+        """
+        candidates = numpy.asarray(candidates, dtype=numpy.int64)
+        matchStartIndices = numpy.asarray(matchStartIndices, dtype=numpy.int64)
+        overlapLengths = self.lengths[i] - matchStartIndices
+        isValid = (matchStartIndices >= 0) & (overlapLengths <= self.lengths[candidates])
+        overlapLengths = numpy.where(isValid, overlapLengths, 0)
+
+        # one flat array of positions for all overlapping regions
+        rowIndices = numpy.repeat(numpy.arange(len(candidates)), overlapLengths)
+        rowStarts = numpy.cumsum(overlapLengths) - overlapLengths
+        offsets = numpy.arange(rowIndices.size, dtype=numpy.int64) - rowStarts[rowIndices]
+        leftPositions = self.starts[i] + matchStartIndices[rowIndices] + offsets
+        rightPositions = self.starts[candidates][rowIndices] + offsets
+
+        isMismatch = self.getCodes(leftPositions) != self.getCodes(rightPositions)
+        mismatchCounts = numpy.bincount(rowIndices[isMismatch], minlength=len(candidates))
+        return isValid & (mismatchCounts == 0)
+
+    def getMemorySize(self):
+        """Gets the memory used by the packed reads
+
+        Returns:
+            int: Size in bytes
+        """
+        return self.packed.nbytes + self.starts.nbytes + self.lengths.nbytes
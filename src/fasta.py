@@ -1,52 +1,247 @@
-def readFasta(fileName):
+import gzip
+import io
+import mmap
+import os
+
+
+def toString(data):
+    """Converts bytes read from file to native string
+
+    Args:
+        data (bytes): Raw data
+
+    Returns:
+        string
+    """
+    return data if isinstance(data, str) else data.decode('ascii')
+
+
+def isGzipFile(fileName):
+    """Checks if a file is gzip compressed, by its magic number
+
+    Args:
+        fileName (string): Name of file.
+
+    Returns:
+        bool
+    """
+    with open(fileName, 'rb') as f:
+        return f.read(2) == b'\x1f\x8b'
+
+
+def parseFastaLines(lines):
+    """Parses FASTA records from lines, one record at a time
+
+    Args:
+        lines (iterable of bytes): Lines of FASTA file.
+
+    Yields:
+        `tuple(string, string)`: Label and sequence of each record.
+
+    Raises:
+        ValueError: When a sequence comes before any label.
+    """
+    label = None
+    pieces = []
+    for line in lines:
+        line = line.strip()
+
+        if line.startswith(b'>'):
+            if label is not None:
+                yield (toString(label), toString(b''.join(pieces)))
+            label = line[1:]
+            pieces = []
+        elif len(line):
+            if label is None:
+                raise ValueError('\033[41mMissing\033[0m label before sequence in input FASTA file.')
+            pieces.append(line)
+
+    if label is not None:
+        yield (toString(label), toString(b''.join(pieces)))
+
+
+def parseFastaMmap(data):
+    """Parses FASTA records from a memory-mapped file, slicing each record at once
+
+    Args:
+        data (:obj:`mmap.mmap`): Content of FASTA file.
+
+    Yields:
+        `tuple(string, string)`: Label and sequence of each record.
+
+    Raises:
+        ValueError: When a sequence comes before any label.
+    """
+    startIndex = data.find(b'>')
+    if startIndex == -1:
+        startIndex = len(data)
+    if len(data[0:startIndex].split()):
+        raise ValueError('\033[41mMissing\033[0m label before sequence in input FASTA file.')
+
+    while startIndex < len(data):
+        labelEndIndex = data.find(b'\n', startIndex)
+        if labelEndIndex == -1:
+            labelEndIndex = len(data)
+        endIndex = data.find(b'\n>', labelEndIndex)
+        endIndex = len(data) if endIndex == -1 else endIndex + 1
+
+        label = data[(startIndex + 1):labelEndIndex].strip()
+        sequence = b''.join(data[labelEndIndex:endIndex].split())
+        yield (toString(label), toString(sequence))
+        startIndex = endIndex
+
+
+def iterFasta(fileName, useMmap=False):
+    """Read sequences and labels from a FASTA file lazily, one record at a time.
+
+    Args:
+        fileName (string): Name of FASTA file, optionally gzip compressed.
+        useMmap (:obj:`bool`, optional): Whether to parse through memory-mapping, for large uncompressed files.
+
+    Yields:
+        `tuple(string, string)`: Label and sequence of each record.
+
+    Raises:
+        ValueError: When a sequence comes before any label.
+    """
+
+    if isGzipFile(fileName):
+        f = gzip.open(fileName, 'rb')
+        try:
+            for record in parseFastaLines(f):
+                yield record
+        finally:
+            f.close()
+        return
+
+    with open(fileName, 'rb') as f:
+        if useMmap and os.fstat(f.fileno()).st_size > 0:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                for record in parseFastaMmap(data):
+                    yield record
+            finally:
+                data.close()
+        else:
+            for record in parseFastaLines(f):
+                yield record
+
+
+def readFasta(fileName, useMmap=False):
     """Read sequences and labels from a FASTA file.
 
     Args:
-        fileName (string): Name of FASTA file.
+        fileName (string): Name of FASTA file, optionally gzip compressed.
+        useMmap (:obj:`bool`, optional): Whether to parse through memory-mapping, for large uncompressed files.
 
     Returns:
         readsList (:obj:`list` of :obj:`string`): List of sequencing reads.
         labelsList (:obj:`list` of :obj:`string`): List of read labels.
 
     Raises:
-        ValueError: When number of reads and labels do not match.
+        ValueError: When a read is missing its sequence or label.
     """
 
     labelsList = []
     readsList = []
-    singleRead = ''
+    for (label, singleRead) in iterFasta(fileName, useMmap):
+        if not len(singleRead):
+            raise ValueError('\033[41mMissing\033[0m sequence for label (\033[94m%s\033[0m) in input FASTA file' % label)
+        labelsList.append(label)
+        readsList.append(singleRead)
 
-    f = open(fileName, 'r')
-    for line in f.readlines():
-        line = line.strip()
+    print('\033[92mSUCCESS\033[0m: Read inputs from file (\033[94m%s\033[0m).' % fileName)
+    return (readsList, labelsList)
 
-        if line.startswith('>'):
-            labelsList.append(line[1:])
-            if len(singleRead):
-                readsList.append(singleRead)
-            singleRead = ''
-        else:
-            singleRead += line
 
-    readsList.append(singleRead)
-    f.close()
-    print('\033[92mSUCCESS\033[0m: Read inputs from file (\033[94m%s\033[0m).' % fileName)
+def toBytes(data):
+    """Converts native string to bytes for writing to file
 
-    if len(readsList) != len(labelsList):
-        raise ValueError('\033[41mMismatch\033[0m in number of sequences (\033[94m%s\033[0m) and labels (\033[94m%s\033[0m) from input FASTA file' % (len(readsList), len(labelsList)))
+    Args:
+        data (string): The string
 
-    return (readsList, labelsList)
+    Returns:
+        bytes
+    """
+    return data if isinstance(data, bytes) else data.encode('ascii')
 
 
-def writeFasta(fileName, sequenceList, labelList):
-    """Write sequences and labels to a FASTA file.
+def wrapSequence(sequence, lineWidth=None, blockSize=1048576):
+    """Splits a sequence into blocks of lines for writing
 
     Args:
-        fileName (string): Name of FASTA file.
+        sequence (string or iterable of string): The sequence, or consecutive chunks of it
+        lineWidth (:obj:`int`, optional): Maximum length of each line; no wrapping if not given
+        blockSize (:obj:`int`, optional): Approximate length of each block
+
+    Yields:
+        string: Blocks of lines, with line breaks; the last block ends the sequence with a line break
+    """
+    if isinstance(sequence, str):
+        sequence = [sequence]
+
+    if not lineWidth:
+        for chunk in sequence:
+            yield chunk
+        yield '\n'
+        return
+
+    blockSize = max(blockSize // lineWidth, 1) * lineWidth
+    remainder = ''
+    for chunk in sequence:
+        if len(remainder):
+            chunk = remainder + chunk
+        endIndex = len(chunk) - len(chunk) % lineWidth
+        for blockStartIndex in range(0, endIndex, blockSize):
+            blockEndIndex = min(blockStartIndex + blockSize, endIndex)
+            yield ''.join(
+                chunk[i:(i + lineWidth)] + '\n'
+                for i in range(blockStartIndex, blockEndIndex, lineWidth)
+            )
+        remainder = chunk[endIndex:]
+
+    if len(remainder):
+        yield remainder + '\n'
+
+
+def writeFastaRecords(fileName, records, lineWidth=None, bufferSize=1048576):
+    """Write sequences and labels to a FASTA file as they come.
+
+    Args:
+        fileName (string): Name of FASTA file; gzip compressed if it ends with ".gz".
+        records (iterable of `tuple(string, string)`): Label and sequence of each record; a sequence can also be an iterable of its consecutive chunks.
+        lineWidth (:obj:`int`, optional): Maximum length of sequence lines; no wrapping if not given.
+        bufferSize (:obj:`int`, optional): Size of write buffer in bytes.
 
     Returns:
+        int: Number of records written.
+    """
+
+    bufferedFile = io.open(fileName, 'wb', buffering=bufferSize)
+    f = gzip.GzipFile(fileobj=bufferedFile, mode='wb') if fileName.endswith('.gz') else bufferedFile
+
+    count = 0
+    try:
+        for (label, sequence) in records:
+            f.write(toBytes('>%s\n' % label))
+            for block in wrapSequence(sequence, lineWidth, bufferSize):
+                f.write(toBytes(block))
+            count += 1
+    finally:
+        f.close()
+        bufferedFile.close()
+
+    return count
+
+
+def writeFasta(fileName, sequenceList, labelList, lineWidth=None):
+    """Write sequences and labels to a FASTA file.
+
+    Args:
+        fileName (string): Name of FASTA file; gzip compressed if it ends with ".gz".
         sequenceList (:obj:`list` of :obj:`string` or string): List of sequencing reads.
         labelsList (:obj:`list` of :obj:`string` or string): List of read labels; must be same length as "sequenceList".
+        lineWidth (:obj:`int`, optional): Maximum length of sequence lines; no wrapping if not given.
 
     Raises:
         ValueError: When number of sequences and labels do not match.
@@ -58,10 +253,5 @@ def writeFasta(fileName, sequenceList, labelList):
     elif len(sequenceList) != len(labelList):
         raise ValueError('\033[41mMismatch\033[0m in number of sequences (\033[94m%s\033[0m) and labels (\033[94m%s\033[0m) to write to FASTA file' % (len(sequenceList), len(labelList)))
 
-    f = open(fileName, 'w')
-    for i in xrange(len(sequenceList)):
-        f.write('>%s\n' % labelList[i])
-        f.write('%s\n' % sequenceList[i])
-
-    f.close()
+    writeFastaRecords(fileName, zip(labelList, sequenceList), lineWidth)
     print('\033[92mSUCCESS\033[0m: Wrote result to file (\033[94m%s\033[0m).' % fileName)
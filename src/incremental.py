@@ -0,0 +1,252 @@
+from . import assembly
+from . import index
+from . import model
+from . import test
+
+
+# search states per read of a component, when no budget is given
+NODES_PER_READ = 1000
+
+
+class IncrementalAssembler(object):
+    """Construct an assembler that takes reads in batches, keeping its overlaps and contigs between batches
+
+        Each batch is only compared against the reads it can overlap or encompass (see :meth:`SeedIndex.findEncompassingCandidates`), and only the components (see :meth:`OverlapGraph.findComponents`) that the new reads touch are assembled again:
+
+            batch 1:  ------  ------  ------         ------  ------
+                      [  component A          ]     [  component B ]
+            batch 2:                        ------
+                      [  component A, re-assembled with the new read ]
+
+        Components are tracked by union-find over the overlaps and encompassments found so far. Each is assembled on its own, by :func:`assembly.assembleContigs`, into one contig or into the contigs of its best partial assembly.
+
+        Components are searched within a budget, by default of :data:`NODES_PER_READ` states per read: an incomplete batch can leave a component that is no single chain (e.g. across a repeat whose bridging reads are still to come), which no search assembles but an exhaustive one takes exponential time to rule out.
+
+        A touched component is first assembled from a reduced set of reads: the tiling path of each of its earlier contigs (see :meth:`findTilingPath`), and the new reads not already encompassed by them. Components with identical reads are always searched in full. So the search grows with the length of the contigs and the size of the batch, not with the coverage. The result is kept if it passes the test (see :func:`test.isValidAssembly`) against all reads of the component; otherwise all of them are searched again.
+
+    Args:
+        engine (:obj:`function`, optional): The search engine, :func:`assembly.assembleParts` if not given
+        k (:obj:`int`, optional): Length of seeds of :class:`SeedIndex`
+        maxSeconds (:obj:`float`, optional): Time limit of the search of each component (see :class:`BudgetedStateCache`)
+        maxNodes (:obj:`int`, optional): Limit of search states visited for each component; :data:`NODES_PER_READ` per read of the component if neither limit is given
+
+    Returns:
+        :class:`IncrementalAssembler` of {
+            'reads': :obj:`list` of string,
+            'readsList': :obj:`list` of :class:`PartData`,
+            'seedIndex': :class:`SeedIndex`,
+            'overlapGraph': :class:`OverlapGraph`,
+            'parents': :obj:`list` of int,
+            'members': :obj:`dict` of int: :obj:`list` of int,
+            'contigs': :obj:`dict` of int: :obj:`list` of string
+        }
+    """
+
+    def __init__(self, engine=None, k=16, maxSeconds=None, maxNodes=None):
+        self.engine = engine if engine is not None else assembly.assembleParts
+        self.maxSeconds = maxSeconds
+        self.maxNodes = maxNodes
+
+        # PartData of new reads share this list
+        self.reads = []
+        self.readsList = []
+        self.seedIndex = index.SeedIndex(k=k, hasAllSeeds=True)
+        self.overlapGraph = model.OverlapGraph([])
+
+        # union-find of components, keyed by their root read
+        self.parents = []
+        self.members = {}
+        self.contigs = {}
+
+
+    def __len__(self):
+        return len(self.reads)
+
+    def findRoot(self, i):
+        """Finds the root read of the component of read i
+
+        Args:
+            i (int): Index of the read
+
+        Returns:
+            int
+        """
+        while self.parents[i] != i:
+            # path halving
+            self.parents[i] = self.parents[self.parents[i]]
+            i = self.parents[i]
+        return i
+
+    def join(self, i, j):
+        """Merges the components of reads i and j, and their contigs
+
+        Args:
+            i (int): Index of a read
+            j (int): Index of another read
+
+        Returns:
+            int: The root read of the merged component
+        """
+        (i, j) = (self.findRoot(i), self.findRoot(j))
+        if i == j:
+            return i
+        if len(self.members[i]) < len(self.members[j]):
+            (i, j) = (j, i)
+        self.parents[j] = i
+        self.members[i].extend(self.members.pop(j))
+        self.contigs.setdefault(i, []).extend(self.contigs.pop(j, []))
+        return i
+
+    def addReads(self, reads):
+        """Adds a batch of reads, then assembles again the components they touch
+
+        Args:
+            reads (:obj:`list` of string): List of new reads in string
+
+        Returns:
+            int: Number of components assembled again
+        """
+        startIndex = len(self.reads)
+        for read in reads:
+            i = len(self.reads)
+            self.reads.append(read)
+            self.readsList.append(model.PartData(self.reads, i))
+            self.seedIndex.addRead(read)
+            self.parents.append(i)
+            self.members[i] = [i]
+
+        # only pairs with a new read, each once
+        pairs = set()
+        for j in range(startIndex, len(self.reads)):
+            pairs.update((j, i) for i in self.seedIndex.findRightCandidates(j))
+            pairs.update((i, j) for i in self.seedIndex.findEncompassingCandidates(j))
+        for (i, j) in self.overlapGraph.addReads(self.readsList, sorted(pairs)):
+            self.join(i, j)
+
+        newReads = {}
+        for j in range(startIndex, len(self.reads)):
+            newReads.setdefault(self.findRoot(j), []).append(j)
+        for (root, component) in newReads.items():
+            self.contigs[root] = self.resolveComponent(root, component)
+        return len(newReads)
+
+    def resolveComponent(self, root, newReads):
+        """Assembles a component again after new reads joined it, from its earlier contigs where possible
+
+        Args:
+            root (int): The root read of the component
+            newReads (:obj:`list` of int): Indices of the new reads in it
+
+        Returns:
+            :obj:`list` of string: The contigs of the component
+        """
+        component = sorted(self.members[root])
+        contigs = self.contigs.get(root, [])
+        # identical reads can be separate copies of a repeat (see ReadGroups), which a tiling path would drop
+        if not len(contigs) or len(set(self.reads[i] for i in component)) < len(component):
+            return self.assembleComponent(component)
+
+        isNew = set(newReads)
+        reducedComponent = set()
+        for tilingPath in self.findTilingPaths(contigs, [i for i in component if i not in isNew]):
+            reducedComponent.update(tilingPath)
+        reducedComponent.update(j for j in newReads if not any(self.reads[j] in contig for contig in contigs))
+        if len(reducedComponent) == len(component):
+            return self.assembleComponent(component)
+
+        reducedContigs = self.assembleComponent(sorted(reducedComponent))
+        if len(reducedContigs) == 1 and test.isValidAssembly(reducedContigs[0], [self.reads[i] for i in component]):
+            return reducedContigs
+        return self.assembleComponent(component)
+
+    def findTilingPaths(self, contigs, oldReads):
+        """Places the earlier reads of a component in its earlier contigs, and finds the tiling path of each contig (see :meth:`findTilingPath`)
+
+        Args:
+            contigs (:obj:`list` of string): The earlier contigs
+            oldReads (:obj:`list` of int): Indices of the earlier reads
+
+        Returns:
+            :obj:`list` of :obj:`list` of int: The reads of the tiling path of each contig, or all its reads where no tiling path is found; then the reads in no contig
+        """
+        placedReads = [[] for contig in contigs]
+        unplacedReads = []
+        for i in oldReads:
+            for (k, contig) in enumerate(contigs):
+                startIndex = contig.find(self.reads[i])
+                if startIndex != -1:
+                    placedReads[k].append((startIndex, i))
+                    break
+            else:
+                # kept as is, though every read should be in a contig
+                unplacedReads.append(i)
+
+        tilingPaths = []
+        for (contig, placed) in zip(contigs, placedReads):
+            tilingPath = self.findTilingPath(len(contig), placed)
+            tilingPaths.append(tilingPath if tilingPath is not None else [i for (startIndex, i) in placed])
+        tilingPaths.append(unplacedReads)
+        return tilingPaths
+
+    def findTilingPath(self, length, placed):
+        """Finds few reads of a contig that still chain from its start to its end, each the left neighbor of the next at its place in the contig
+
+            ----------                      picked
+               ----------                   (encompassed in the overlaps of the picked ones)
+                   ----------               picked
+                        ----------          picked
+
+            The read reaching farthest to the right is picked at each step.
+
+        Args:
+            length (int): Length of the contig
+            placed (:obj:`list` of `tuple(int, int)`): Start index of each read in the contig, and its index
+
+        Returns:
+            :obj:`list` of int: Indices of the reads on the path, or None if they do not chain through the contig
+        """
+        startIndices = dict((i, startIndex) for (startIndex, i) in placed)
+        firstReads = [i for (startIndex, i) in placed if startIndex == 0]
+        if not len(firstReads):
+            return None
+        i = max(firstReads, key=lambda i: self.overlapGraph.lengths[i])
+        tilingPath = [i]
+        while startIndices[i] + self.overlapGraph.lengths[i] < length:
+            nextReads = [
+                j
+                for j in self.overlapGraph.rightNeighbors[i]
+                if j in startIndices and startIndices[j] - startIndices[i] == self.overlapGraph.overlaps[(i, j)][0]
+            ]
+            nextReads = [j for j in nextReads if startIndices[j] + self.overlapGraph.lengths[j] > startIndices[i] + self.overlapGraph.lengths[i]]
+            if not len(nextReads):
+                return None
+            i = max(nextReads, key=lambda j: startIndices[j] + self.overlapGraph.lengths[j])
+            tilingPath.append(i)
+        return tilingPath
+
+    def assembleComponent(self, component):
+        """Assembles some reads of a component on their own
+
+        Args:
+            component (:obj:`list` of int): Indices of the reads, in the order they were added
+
+        Returns:
+            :obj:`list` of string: The assembled context of the reads as a single contig, or the contigs of their best partial assembly
+        """
+        readsList = model.initiateReadData([self.reads[i] for i in component])
+        maxNodes = self.maxNodes
+        if self.maxSeconds is None and maxNodes is None:
+            maxNodes = NODES_PER_READ * len(component)
+        failedStates = assembly.BudgetedStateCache(self.maxSeconds, maxNodes)
+        return assembly.assembleContigs(readsList, self.overlapGraph.subgraph(component), self.engine, failedStates)
+
+    def result(self):
+        """Lists the current contigs of all components
+
+        Returns:
+            :obj:`list` of string: The contigs, longest first; a single contig once all reads are assembled into one
+        """
+        contigs = []
+        for componentContigs in self.contigs.values():
+            contigs.extend(componentContigs)
+        return sorted(contigs, key=len, reverse=True)
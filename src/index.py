@@ -0,0 +1,437 @@
+import sys
+
+try:
+    maketrans = str.maketrans
+except AttributeError:
+    from string import maketrans
+
+
+# other characters, e.g. N, are their own complement
+COMPLEMENTS = maketrans('TCGAtcga', 'AGCTagct')
+
+
+def reverseComplement(sequence):
+    """Gets the reverse complement of a sequence, i.e. the same region read on the other strand
+
+    Args:
+        sequence (string): The sequence
+
+    Returns:
+        string
+    """
+    return sequence.translate(COMPLEMENTS)[::-1]
+
+
+class SeedIndex(object):
+    """Construct an index of k-mer seeds at both ends of the reads, to find probable neighbors without comparing every pair
+
+        ----------------                read i
+             |k-mer|
+             ------------------------   read j
+
+        If read i is the left neighbor of read j, the first k-mer of read j occurs in read i, and the last k-mer of read i occurs in read j. This holds as long as k is not longer than the minimum overlapping length. Reads too short for that are always returned as candidates.
+
+        With "hasAllSeeds", every k-mer of each read is also indexed, so reads added later can find the earlier reads on their left or encompassing them (see :meth:`findEncompassingCandidates`).
+
+    Args:
+        readsList (:obj:`list` of string, optional): List of reads in string, as from :func:`fasta.readFasta`
+        k (:obj:`int`, optional): Length of seeds
+        hasAllSeeds (:obj:`bool`, optional): Whether to index every k-mer of each read
+
+    Returns:
+        :class:`SeedIndex` of {
+            'prefixSeeds': :obj:`dict` of string: :obj:`list` of int,
+            'suffixSeeds': :obj:`dict` of string: :obj:`list` of int,
+            'allSeeds': :obj:`dict` of string: :obj:`set` of int, or None,
+            'shortReads': :obj:`list` of int
+        }
+    """
+
+    def __init__(self, readsList=(), k=16, hasAllSeeds=False):
+        self.k = k
+        self.readsList = []
+        self.prefixSeeds = {}
+        self.suffixSeeds = {}
+        self.allSeeds = {} if hasAllSeeds else None
+        self.shortReads = []
+
+        for read in readsList:
+            self.addRead(read)
+
+
+    def addRead(self, read):
+        """Adds a read to the index
+
+        Args:
+            read (string): The read
+
+        Returns:
+            int: The index of the read
+        """
+        i = len(self.readsList)
+        self.readsList.append(read)
+
+        # the minimum overlapping length is half of the read
+        if len(read) // 2 < self.k:
+            self.shortReads.append(i)
+        else:
+            self.prefixSeeds.setdefault(read[0:self.k], []).append(i)
+            self.suffixSeeds.setdefault(read[-self.k:], []).append(i)
+        if self.allSeeds is not None:
+            for startIndex in range(len(read) - self.k + 1):
+                self.allSeeds.setdefault(read[startIndex:(startIndex + self.k)], set()).add(i)
+        return i
+
+    def findSeeds(self, sequence, seeds):
+        """Finds reads whose seed occurs in the sequence
+
+        Args:
+            sequence (string): The sequence to scan
+            seeds (:obj:`dict` of string: :obj:`list` of int): "prefixSeeds" or "suffixSeeds"
+
+        Returns:
+            :obj:`set` of int: Indices of the reads
+        """
+        k = self.k
+        found = set()
+        for startIndex in range(len(sequence) - k + 1):
+            matches = seeds.get(sequence[startIndex:(startIndex + k)])
+            if matches is not None:
+                found.update(matches)
+        return found
+
+    def findRightCandidates(self, i):
+        """Finds reads that can be the right neighbor of, or be encompassed by, read i
+
+        Args:
+            i (int): Index of the read
+
+        Returns:
+            :obj:`set` of int: Indices of the candidate reads
+        """
+        candidates = self.findSeeds(self.readsList[i], self.prefixSeeds)
+        candidates.update(self.shortReads)
+        candidates.discard(i)
+        return candidates
+
+    def findLeftCandidates(self, j):
+        """Finds reads that can be the left neighbor of read j
+
+        Args:
+            j (int): Index of the read
+
+        Returns:
+            :obj:`set` of int: Indices of the candidate reads
+        """
+        read = self.readsList[j]
+        # the overlap is at most read j, which can be shorter than the seeds
+        if len(read) // 2 < self.k:
+            candidates = set(range(len(self.readsList)))
+        else:
+            candidates = self.findSeeds(read, self.suffixSeeds)
+            candidates.update(self.shortReads)
+        candidates.discard(j)
+        return candidates
+
+    def findEncompassingCandidates(self, j):
+        """Finds reads that can be the left neighbor of, or encompass, read j, i.e. reads where the first k-mer of read j occurs
+
+        Args:
+            j (int): Index of the read
+
+        Returns:
+            :obj:`set` of int: Indices of the candidate reads
+
+        Raises:
+            ValueError: When the index was built without "hasAllSeeds"
+        """
+        if self.allSeeds is None:
+            raise ValueError('\033[41mSeedIndex\033[0m was built without all seeds.')
+        read = self.readsList[j]
+        if len(read) // 2 < self.k:
+            candidates = set(range(len(self.readsList)))
+        else:
+            candidates = set(self.allSeeds.get(read[0:self.k], ()))
+            candidates.update(self.shortReads)
+        candidates.discard(j)
+        return candidates
+
+    def findSharingCandidates(self, j):
+        """Finds reads sharing any k-mer with read j, which can overlap it or encompass it with errors outside of that k-mer
+
+        Args:
+            j (int): Index of the read
+
+        Returns:
+            :obj:`set` of int: Indices of the candidate reads
+
+        Raises:
+            ValueError: When the index was built without "hasAllSeeds"
+        """
+        if self.allSeeds is None:
+            raise ValueError('\033[41mSeedIndex\033[0m was built without all seeds.')
+        read = self.readsList[j]
+        if len(read) // 2 < self.k:
+            candidates = set(range(len(self.readsList)))
+        else:
+            candidates = set(self.shortReads)
+            for startIndex in range(len(read) - self.k + 1):
+                candidates.update(self.allSeeds.get(read[startIndex:(startIndex + self.k)], ()))
+        candidates.discard(j)
+        return candidates
+
+    def getMemorySize(self):
+        """Estimates the memory used by the index, not counting the reads themselves
+
+        Returns:
+            int: Size in bytes
+        """
+        size = sys.getsizeof(self.shortReads)
+        for seeds in (self.prefixSeeds, self.suffixSeeds, self.allSeeds or {}):
+            size += sys.getsizeof(seeds)
+            for (seed, matches) in seeds.items():
+                size += sys.getsizeof(seed) + sys.getsizeof(matches)
+        return size
+
+
+class CanonicalSeedIndex(object):
+    """Construct an index of canonical k-mer seeds at both ends of the reads, to find probable neighbors on either strand
+
+        A k-mer and its reverse complement are indexed by one canonical form, the smaller of both. If read j is on the other strand of read i, the seeds at the ends of its reverse complement are the reverse complements of its own seeds:
+
+            ----------------                read i
+                 |k-mer|
+                 ------------------------   reverse complement of read j
+                                  |k-mer|   reverse complement of its first k-mer
+
+        So scanning read i for the canonical forms of the seeds at both ends of every read finds its neighbors on both strands, and on which strand each of them is: the same strand if the k-mer occurs in read i in the same form as in read j. Reads too short for seeds are returned on both strands (see :class:`SeedIndex`).
+
+    Args:
+        readsList (:obj:`list` of string, optional): List of reads in string, as from :func:`fasta.readFasta`
+        k (:obj:`int`, optional): Length of seeds
+
+    Returns:
+        :class:`CanonicalSeedIndex` of {
+            'seeds': :obj:`dict` of string: :obj:`list` of `tuple(int, bool)`,
+            'shortReads': :obj:`list` of int
+        }
+    """
+
+    def __init__(self, readsList=(), k=16):
+        self.k = k
+        self.readsList = []
+        self.seeds = {}
+        self.shortReads = []
+
+        for read in readsList:
+            self.addRead(read)
+
+
+    def addRead(self, read):
+        """Adds a read to the index
+
+        Args:
+            read (string): The read
+
+        Returns:
+            int: The index of the read
+        """
+        i = len(self.readsList)
+        self.readsList.append(read)
+
+        if len(read) // 2 < self.k:
+            self.shortReads.append(i)
+            return i
+        for seed in set([read[0:self.k], read[-self.k:]]):
+            reverseSeed = reverseComplement(seed)
+            # whether the seed is the canonical form
+            isForward = seed <= reverseSeed
+            self.seeds.setdefault(min(seed, reverseSeed), []).append((i, isForward))
+        return i
+
+    def findCandidates(self, i):
+        """Finds reads that can overlap read i or be encompassed by it, on either strand
+
+            Seeds are only at the ends of the reads, so a read encompassing read i is not found here, but read i is found among its candidates.
+
+        Args:
+            i (int): Index of the read
+
+        Returns:
+            :obj:`dict` of int: :obj:`set` of bool: Indices of the candidate reads, and whether each is on the same strand as read i (both if not known)
+        """
+        k = self.k
+        read = self.readsList[i]
+        reverseRead = reverseComplement(read)
+        if len(read) // 2 < k:
+            candidates = dict((j, set([True, False])) for j in range(len(self.readsList)))
+        else:
+            candidates = dict((j, set([True, False])) for j in self.shortReads)
+            for startIndex in range(len(read) - k + 1):
+                seed = read[startIndex:(startIndex + k)]
+                # the same k-mer of the reverse complement, read backwards
+                reverseSeed = reverseRead[(len(read) - startIndex - k):(len(read) - startIndex)]
+                matches = self.seeds.get(min(seed, reverseSeed))
+                if matches is None:
+                    continue
+                isForward = seed <= reverseSeed
+                for (j, isOtherForward) in matches:
+                    if seed == reverseSeed:
+                        # its own reverse complement, on either strand
+                        candidates.setdefault(j, set()).update([True, False])
+                    else:
+                        candidates.setdefault(j, set()).add(isForward == isOtherForward)
+        candidates.pop(i, None)
+        return candidates
+
+    def getMemorySize(self):
+        """Estimates the memory used by the index, not counting the reads themselves
+
+        Returns:
+            int: Size in bytes
+        """
+        size = sys.getsizeof(self.shortReads) + sys.getsizeof(self.seeds)
+        for (seed, matches) in self.seeds.items():
+            size += sys.getsizeof(seed) + sys.getsizeof(matches)
+        return size
+
+
+class SuffixArray(object):
+    """Construct a suffix array of a sequence, to find all occurrences of many reads without scanning the sequence for each of them
+
+        The suffixes of the sequence are sorted, so all suffixes starting with a read are next to each other:
+
+            sequence = ABAB
+            suffixArray = [2, 0, 3, 1] -> AB, ABAB, B, BAB
+
+        Suffixes are sorted by prefix doubling: by their first 1, 2, 4, ... characters, until all ranks are distinct.
+
+    Args:
+        sequence (string): The sequence to index, e.g. the assembled result
+
+    Returns:
+        :class:`SuffixArray` of {
+            'sequence': string,
+            'suffixArray': :obj:`list` of int
+        }
+    """
+
+    def __init__(self, sequence):
+        self.sequence = sequence
+        self.suffixArray = buildSuffixArray(sequence)
+
+    def findBounds(self, pattern, lowIndex=0):
+        """Finds the range of suffixes starting with the pattern, by binary search
+
+        Args:
+            pattern (string): The pattern
+            lowIndex (int, optional): Lower bound of the range to search, if known
+
+        Returns:
+            :obj:`tuple` of (
+                startIndex (int): Index of the first suffix in "suffixArray"
+                endIndex (int): Index after the last suffix in "suffixArray"
+            )
+        """
+        (sequence, suffixArray) = (self.sequence, self.suffixArray)
+        patternLength = len(pattern)
+
+        (low, high) = (lowIndex, len(suffixArray))
+        while low < high:
+            middle = (low + high) // 2
+            i = suffixArray[middle]
+            if sequence[i:(i + patternLength)] < pattern:
+                low = middle + 1
+            else:
+                high = middle
+        startIndex = low
+
+        high = len(suffixArray)
+        while low < high:
+            middle = (low + high) // 2
+            i = suffixArray[middle]
+            if sequence[i:(i + patternLength)] == pattern:
+                low = middle + 1
+            else:
+                high = middle
+        return (startIndex, low)
+
+    def findPositions(self, pattern):
+        """Finds all start indices of a pattern in the sequence, including overlapping ones
+
+        Args:
+            pattern (string): The pattern, matched literally
+
+        Returns:
+            :obj:`list` of int: Sorted start indices
+        """
+        (startIndex, endIndex) = self.findBounds(pattern)
+        return sorted(self.suffixArray[startIndex:endIndex])
+
+    def findPositionsBatch(self, patternsList):
+        """Finds all start indices of each pattern in the sequence
+
+            Patterns are looked up in sorted order, so each search starts where the previous one started.
+
+        Args:
+            patternsList (:obj:`list` of string): The patterns, matched literally
+
+        Returns:
+            :obj:`list` of :obj:`list` of int: Sorted start indices of each pattern, in the order of "patternsList"
+        """
+        positionsList = [None] * len(patternsList)
+        lowIndex = 0
+        for i in sorted(range(len(patternsList)), key=lambda x: patternsList[x]):
+            (lowIndex, endIndex) = self.findBounds(patternsList[i], lowIndex)
+            positionsList[i] = sorted(self.suffixArray[lowIndex:endIndex])
+        return positionsList
+
+    def getMemorySize(self):
+        """Estimates the memory used by the index, not counting the sequence itself
+
+        Returns:
+            int: Size in bytes
+        """
+        return sys.getsizeof(self.suffixArray) + sum(sys.getsizeof(i) for i in self.suffixArray)
+
+
+def buildSuffixArray(sequence, seedLength=16):
+    """Sorts the suffixes of a sequence by prefix doubling
+
+        The first round sorts by the first "seedLength" characters directly, which skips the shortest rounds.
+
+    Args:
+        sequence (string): The sequence
+        seedLength (:obj:`int`, optional): Number of characters to sort by in the first round
+
+    Returns:
+        :obj:`list` of int: Start indices of the suffixes in sorted order
+    """
+    sequenceLength = len(sequence)
+    suffixArray = list(range(sequenceLength))
+    ranks = [0] * sequenceLength
+
+    k = seedLength
+    keys = [sequence[i:(i + k)] for i in range(sequenceLength)]
+    while True:
+        suffixArray.sort(key=keys.__getitem__)
+
+        # ranks of the first k characters, from 1
+        rank = 0
+        previousKey = None
+        for i in suffixArray:
+            key = keys[i]
+            if key != previousKey:
+                rank += 1
+                previousKey = key
+            ranks[i] = rank
+
+        if rank == sequenceLength:
+            return suffixArray
+
+        # rank of the first k characters, then rank of the next k characters (0 if past the end)
+        keys = [
+            ranks[i] * (sequenceLength + 1) + (ranks[i + k] if i + k < sequenceLength else 0)
+            for i in range(sequenceLength)
+        ]
+        k *= 2
@@ -1,29 +1,175 @@
-class PartData:
+from . import test
+
+
+# layouts are hashed as polynomials modulo a Mersenne prime, see :func:`hashRead`
+LAYOUT_PRIME = (1 << 61) - 1
+LAYOUT_BASE = 0x2545F4914F6CDD1D % LAYOUT_PRIME
+
+
+def mixHash(x):
+    """Scrambles an integer into 64 bits, by the finalizer of splitmix64
+
+    Args:
+        x (int): The integer
+
+    Returns:
+        int
+    """
+    x = (x + 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & 0xFFFFFFFFFFFFFFFF
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & 0xFFFFFFFFFFFFFFFF
+    return x ^ (x >> 31)
+
+
+def hashRead(index):
+    """Hash of the layout of a single read
+
+        The layout of reads "i" at offsets "o" is hashed as the sum of "hashRead(i) * LAYOUT_BASE ** o", so the hash of two parts merged at an offset is computed from theirs (see :func:`joinLayoutHashes`), without walking their reads.
+
+    Args:
+        index (int): The index of the read
+
+    Returns:
+        int
+    """
+    return mixHash(index) % LAYOUT_PRIME
+
+
+def joinLayoutHashes(leftHash, rightHash, offset):
+    """Hash of the layout of two parts merged, from the hashes of their layouts (see :func:`hashRead`)
+
+    Args:
+        leftHash (int): Hash of the layout of the part on the left
+        rightHash (int): Hash of the layout of the part on the right
+        offset (int): The start index of the right part in the merged part
+
+    Returns:
+        int
+    """
+    return (leftHash + rightHash * pow(LAYOUT_BASE, offset, LAYOUT_PRIME)) % LAYOUT_PRIME
+
+
+class PartData(object):
     """Construct data representation of a "part", which can be either a single read or a partial assembly of reads
 
+        A partial assembly does not copy the sequences of its reads. It keeps the two parts it was merged from, and the offset of the right one:
+
+            ====================              leftPart
+            |   offset    |
+                          ==================  rightPart
+
+        Its layout of single reads is walked from these, and the sequence is only joined when needed. The hash of the layout is kept (see :func:`hashRead`), as the search tells its states apart by it.
+
     Args:
-        sequence (string): The sequence
-        left (:obj:`int`, optional): The minimum length of overlapping region with its left neighboring part.
-        right (:obj:`int`, optional): The minimum length of overlapping region with its right neighboring part.
+        readsList (:obj:`list` of string): List of all single reads in string
+        index (:obj:`int`, optional): The index of the single read, for a single read
+        leftPart (:class:`PartData`, optional): The part on the left, for a partial assembly
+        rightPart (:class:`PartData`, optional): The part on the right, for a partial assembly
+        offset (:obj:`int`, optional): The start index of "rightPart" in the partial assembly
 
     Returns:
         :class:`PartData` of {
-            'sequence': string,
+            'length': int,
             'left': int,
-            'right': int
+            'right': int,
+            'first': int,
+            'last': int,
+            'firstEnd': int,
+            'layoutHash': int,
+            'layoutKey': int
         }
     """
 
-    def __init__(self, sequence, left=None, right=None):
-        self.sequence = sequence
-        self.left = left if left is not None else len(sequence) / 2
-        self.right = right if right is not None else len(sequence) / 2
+    __slots__ = ('readsList', 'index', 'leftPart', 'rightPart', 'offset', 'length', 'left', 'right', 'first', 'last', 'firstEnd', 'layoutHash', 'layoutKey')
+
+    def __init__(self, readsList, index=None, leftPart=None, rightPart=None, offset=0):
+        self.readsList = readsList
+        self.index = index
+        self.leftPart = leftPart
+        self.rightPart = rightPart
+        self.offset = offset
+
+        if index is not None:
+            self.length = len(readsList[index])
+            self.left = self.length // 2
+            self.right = self.length // 2
+            self.first = index
+            self.last = index
+            self.firstEnd = self.length
+            self.layoutHash = hashRead(index)
+        else:
+            self.length = offset + rightPart.length
+            self.left = leftPart.left
+            self.right = rightPart.right
+            self.first = leftPart.first
+            self.last = rightPart.last
+            # the first read is overridden from the start of the right part
+            self.firstEnd = min(leftPart.firstEnd, offset)
+            self.layoutHash = joinLayoutHashes(leftPart.layoutHash, rightPart.layoutHash, offset)
+        # the term of self in the keys of search states, see :meth:`assembly.FailedStateCache.fingerprint`
+        self.layoutKey = mixHash(self.layoutHash)
 
 
     def __eq__(self, other):
         return (self.sequence == other.sequence)
 
 
+    def layout(self):
+        """Lists the single reads of self, from left to right
+
+        Returns:
+            :obj:`list` of `tuple(int, int)`: The index of each read and its start index in self
+        """
+        reads = []
+        stack = [(self, 0)]
+        while len(stack):
+            (part, offset) = stack.pop()
+            if part.index is not None:
+                reads.append((part.index, offset))
+            else:
+                stack.append((part.rightPart, offset + part.offset))
+                stack.append((part.leftPart, offset))
+        return reads
+
+    def getSequence(self, startIndex=0, endIndex=None):
+        """Joins the sequence of self, or a region of it
+
+            Each read overrides the reads before it from its start, as in :meth:`extendLeft`.
+
+        Args:
+            startIndex (:obj:`int`, optional): Start index of the region
+            endIndex (:obj:`int`, optional): End index of the region, defaults to the end of self
+
+        Returns:
+            string: The sequence of the region
+        """
+        if endIndex is None:
+            endIndex = self.length
+
+        # self always starts with its first read, up to the start of the next one, and ends with its last read
+        firstSequence = self.readsList[self.first]
+        lastSequence = self.readsList[self.last]
+        if endIndex <= self.firstEnd:
+            return firstSequence[startIndex:endIndex]
+        if startIndex >= self.length - len(lastSequence):
+            offset = self.length - len(lastSequence)
+            return lastSequence[(startIndex - offset):(endIndex - offset)]
+
+        pieces = []
+        for (i, offset) in reversed(self.layout()):
+            if offset >= endIndex:
+                continue
+            sequence = self.readsList[i]
+            pieces.append(sequence[max(startIndex - offset, 0):(endIndex - offset)])
+            endIndex = offset
+            if endIndex <= startIndex:
+                break
+        return ''.join(reversed(pieces))
+
+    @property
+    def sequence(self):
+        return self.getSequence()
+
     def isMatchInside(self, other):
         """Checks if self is encompassed by other
 
@@ -47,22 +193,23 @@ class PartData:
                         | len |
                   -------------              self
 
-            In this case, the overlap region should be at least as long as the smaller of self's right and the other's left.
+            In this case, the overlap region should be at least as long as the smaller of self's right and the other's left. Only the ends of self and other that can overlap are read.
 
         Args:
             other (:class:`PartData`): The other assembly to merge into
 
         Returns:
-            bool: Whether the self is left neighbor of other
+            int: The start index of overlapping region in self, or -1 if self is not left neighbor of other
         """
-        minOverlapLength = max(self.right, other.left)
-        overlapSequence = other.sequence[0:minOverlapLength]
-        matchStartIndex = self.sequence.rfind(overlapSequence)
-        if matchStartIndex != -1 and \
-            self.sequence[matchStartIndex:] == other.sequence[:(len(self.sequence)-matchStartIndex)]:
-            return matchStartIndex
-        else:
+        length = min(self.length, other.length)
+        minOverlapLength = min(max(self.right, other.left), other.length)
+        if minOverlapLength > length:
+            return -1
+
+        matchStartIndex = findOverlap(self.getSequence(self.length - length), other.getSequence(0, length), minOverlapLength)
+        if matchStartIndex == -1:
             return -1
+        return self.length - length + matchStartIndex
 
     def isMatchRight(self, other):
         """Checks if self is the right neighbor of other
@@ -82,19 +229,20 @@ class PartData:
         return other.isMatchLeft(self)
 
 
-    def extendLeft(self, other):
+    def extendLeft(self, other, matchStartIndex=None):
         """Assembles self and other when isMatchLeft
 
         Args:
             other (:obj:`PartData`): The other assembly to merge into
+            matchStartIndex (:obj:`int`, optional): The known result of isMatchLeft (e.g. from :class:`OverlapGraph`), skips the string search
 
 
         Returns:
             :class:`PartData`: The merged assembly
         """
-        matchStartIndex = self.isMatchLeft(other)
-        newSequence = self.sequence[0:matchStartIndex] + other.sequence
-        return PartData(newSequence, self.left, other.right)
+        if matchStartIndex is None:
+            matchStartIndex = self.isMatchLeft(other)
+        return PartData(self.readsList, leftPart=self, rightPart=other, offset=matchStartIndex)
 
     def extendRight(self, other):
         """Assembles self and other when isMatchRight
@@ -108,6 +256,464 @@ class PartData:
         return other.extendLeft(self)
 
 
+def findOverlap(leftSequence, rightSequence, minOverlapLength):
+    """Finds the overlapping region between the end of a sequence and the start of another
+
+        ----------------                leftSequence
+             |   overlap   |
+             ------------------------   rightSequence
+
+    Args:
+        leftSequence (string): The sequence on the left
+        rightSequence (string): The sequence on the right
+        minOverlapLength (int): The minimum length of overlapping region
+
+    Returns:
+        int: The start index of overlapping region in "leftSequence", or -1 if not matched
+    """
+    overlapSequence = rightSequence[0:minOverlapLength]
+    matchStartIndex = leftSequence.rfind(overlapSequence)
+    if matchStartIndex != -1 and \
+        leftSequence[matchStartIndex:] == rightSequence[:(len(leftSequence)-matchStartIndex)]:
+        return matchStartIndex
+    else:
+        return -1
+
+
+class OverlapGraph(object):
+    """Construct the pairwise overlap graph of single reads, computed once before assembling
+
+        ----------------                read i
+             |   overlap   |
+             ------------------------   read j
+
+        An edge i -> j is recorded when read i is the left neighbor of read j (i.e. :meth:`PartData.isMatchLeft`). Since a partial assembly only extends at its left-most and right-most single reads, the search can walk these adjacency lists instead of rescanning the sequences.
+
+        A read encompassed by another read can be spanned entirely by an overlap of partial assemblies, which is not a property of the single read pair. Parts ending with such reads are still checked against their sequences.
+
+        With a :class:`SeedIndex`, only pairs sharing a seed are compared, instead of every pair.
+        With an :class:`EncodedReadStore`, the overlapping regions of each read against all its candidates are verified in one vectorized comparison.
+        With "knownPairs" (e.g. from :class:`AssemblyCache`), pairs compared before are not compared again, and the newly compared pairs are kept in "pairs".
+        With a "matcher" (e.g. :class:`ApproximateMatcher`), pairs are compared by it instead of :meth:`PartData.isMatchLeft` and :meth:`PartData.isMatchInside`, and so are the parts checked against their sequences. Candidate pairs are then the reads sharing any seed (see :meth:`SeedIndex.findSharingCandidates`), so a pair is still found with errors in the seeds at the ends. "readStore" is not used with a matcher.
+
+    Args:
+        readsList (:obj:`list` of :class:`PartData`): List of single reads, indexed by their "first" (see :func:`initiateReadData`)
+        seedIndex (:class:`SeedIndex`, optional): Index of the same reads to find candidate pairs
+        readStore (:class:`EncodedReadStore`, optional): Encoded copy of the same reads to verify overlaps
+        knownPairs (:obj:`dict` of `tuple(int, int)`: `tuple(bool, int)`, optional): Results of pairs (i, j) compared before: whether read j is encompassed by read i (None if not known), and the start index of the overlapping region in read i (-1 if not matched)
+        matcher (:class:`ApproximateMatcher`, optional): Checks of overlaps and encompassment in place of the exact ones
+
+    Returns:
+        :class:`OverlapGraph` of {
+            'rightNeighbors': :obj:`list` of :obj:`set` of int,
+            'leftNeighbors': :obj:`list` of :obj:`set` of int,
+            'overlaps': :obj:`dict` of `tuple(int, int)`: `tuple(int, int)`,
+            'isContained': :obj:`list` of bool,
+            'pairs': :obj:`dict` of `tuple(int, int)`: `tuple(bool, int)`,
+            'matcher': :class:`ApproximateMatcher`
+        }
+    """
+
+    def __init__(self, readsList, seedIndex=None, readStore=None, knownPairs=None, matcher=None):
+        self.lengths = [read.length for read in readsList]
+        self.rightNeighbors = [set() for read in readsList]
+        self.leftNeighbors = [set() for read in readsList]
+        self.overlaps = {}
+        self.isContained = [False] * len(readsList)
+        # only kept with known pairs, to be stored back
+        self.pairs = None if knownPairs is None else {}
+        self.matcher = matcher
+        if matcher is not None:
+            readStore = None
+
+        # any shared seed, as errors can hit the seeds at the ends
+        sharingCandidates = None
+        if matcher is not None and seedIndex is not None:
+            sharingCandidates = [set() for read in readsList]
+            for j in range(len(readsList)):
+                for i in seedIndex.findSharingCandidates(j):
+                    sharingCandidates[i].add(j)
+
+        for (i, read) in enumerate(readsList):
+            if seedIndex is None:
+                candidates = range(len(readsList))
+            elif sharingCandidates is not None:
+                candidates = sorted(sharingCandidates[i])
+            else:
+                candidates = sorted(seedIndex.findRightCandidates(i))
+
+            unverifiedMatches = []
+            for j in candidates:
+                if i == j:
+                    continue
+                otherRead = readsList[j]
+
+                if knownPairs is not None:
+                    (isInside, matchStartIndex) = knownPairs.get((i, j), (None, None))
+                    if isInside is None:
+                        isInside = self.isMatchInside(otherRead, read)
+                    self.isContained[j] = self.isContained[j] or isInside
+                    if matchStartIndex is None:
+                        matchStartIndex = self.isMatchLeft(read, otherRead)
+                    self.pairs[(i, j)] = (isInside, matchStartIndex)
+                    if matchStartIndex != -1:
+                        self.addOverlap(i, j, matchStartIndex, max(read.right, otherRead.left))
+                    continue
+
+                if not self.isContained[j] and self.isMatchInside(otherRead, read):
+                    self.isContained[j] = True
+
+                if readStore is None:
+                    matchStartIndex = self.isMatchLeft(read, otherRead)
+                    if matchStartIndex != -1:
+                        self.addOverlap(i, j, matchStartIndex, max(read.right, otherRead.left))
+                else:
+                    # only locate the overlapping region here, same as findOverlap
+                    minOverlapLength = max(read.right, otherRead.left)
+                    matchStartIndex = read.sequence.rfind(otherRead.sequence[0:minOverlapLength])
+                    if matchStartIndex != -1:
+                        unverifiedMatches.append((j, matchStartIndex, minOverlapLength))
+
+            if len(unverifiedMatches):
+                isVerified = readStore.verifyOverlaps(
+                    i,
+                    [j for (j, matchStartIndex, minOverlapLength) in unverifiedMatches],
+                    [matchStartIndex for (j, matchStartIndex, minOverlapLength) in unverifiedMatches]
+                )
+                for (k, (j, matchStartIndex, minOverlapLength)) in enumerate(unverifiedMatches):
+                    if isVerified[k]:
+                        self.addOverlap(i, j, matchStartIndex, minOverlapLength)
+
+
+    def addOverlap(self, i, j, matchStartIndex, minOverlapLength):
+        """Records read i as the left neighbor of read j
+
+        Args:
+            i (int): Index of the left read
+            j (int): Index of the right read
+            matchStartIndex (int): Start index of the overlapping region in read i
+            minOverlapLength (int): The minimum length of overlapping region required for the pair
+        """
+        self.rightNeighbors[i].add(j)
+        self.leftNeighbors[j].add(i)
+        self.overlaps[(i, j)] = (matchStartIndex, minOverlapLength)
+
+    def isMatchLeft(self, part, other):
+        """Checks if part is the left neighbor of other, by :meth:`PartData.isMatchLeft` or by the matcher
+
+        Args:
+            part (:class:`PartData`): The assembly on the left
+            other (:class:`PartData`): The other assembly to merge into
+
+        Returns:
+            int: The start index of the overlapping region in part, or -1 if not matched
+        """
+        if self.matcher is None:
+            return part.isMatchLeft(other)
+        return self.matcher.isMatchLeft(part, other)
+
+    def isMatchInside(self, part, other):
+        """Checks if part is encompassed by other, by :meth:`PartData.isMatchInside` or by the matcher
+
+        Args:
+            part (:class:`PartData`): The assembly to check
+            other (:class:`PartData`): The other assembly to merge into
+
+        Returns:
+            bool
+        """
+        if self.matcher is None:
+            return part.isMatchInside(other)
+        return self.matcher.isMatchInside(part, other)
+
+    def findOverlap(self, leftSequence, rightSequence, minOverlapLength):
+        """Finds the overlapping region between two sequences, by :func:`findOverlap` or by the matcher
+
+        Args:
+            leftSequence (string): The sequence on the left
+            rightSequence (string): The sequence on the right
+            minOverlapLength (int): The minimum length of overlapping region
+
+        Returns:
+            int: The start index of overlapping region in "leftSequence", or -1 if not matched
+        """
+        if self.matcher is None:
+            return findOverlap(leftSequence, rightSequence, minOverlapLength)
+        return self.matcher.findOverlap(leftSequence, rightSequence, minOverlapLength)
+
+    def isValidAssembly(self, fullAssembly, readsList):
+        """Checks an assembly of the reads by :func:`test.isValidAssembly`, or by the matcher
+
+        Args:
+            fullAssembly (string): String of context
+            readsList (:obj:`list` of string): List of string targets
+
+        Returns:
+            bool
+        """
+        if self.matcher is None:
+            return test.isValidAssembly(fullAssembly, readsList)
+        return self.matcher.isValidAssembly(fullAssembly, readsList)
+
+    def addReads(self, readsList, pairs):
+        """Extends the graph with reads appended to readsList, comparing only the given pairs
+
+        Args:
+            readsList (:obj:`list` of :class:`PartData`): The same single reads, with the new reads at the end
+            pairs (:obj:`iterable` of `tuple(int, int)`): Pairs (i, j) to compare, each with a new read
+
+        Returns:
+            :obj:`list` of `tuple(int, int)`: The pairs where read i is the left neighbor of read j, or encompasses it
+        """
+        for read in readsList[len(self.lengths):]:
+            self.lengths.append(read.length)
+            self.rightNeighbors.append(set())
+            self.leftNeighbors.append(set())
+            self.isContained.append(False)
+
+        linkedPairs = []
+        for (i, j) in pairs:
+            (read, otherRead) = (readsList[i], readsList[j])
+            isInside = self.isMatchInside(otherRead, read)
+            self.isContained[j] = self.isContained[j] or isInside
+            matchStartIndex = self.isMatchLeft(read, otherRead)
+            if matchStartIndex != -1:
+                self.addOverlap(i, j, matchStartIndex, max(read.right, otherRead.left))
+            if isInside or matchStartIndex != -1:
+                linkedPairs.append((i, j))
+        return linkedPairs
+
+    def subgraph(self, indices):
+        """Extracts the overlaps among some of the reads, e.g. a component, renumbered in the given order
+
+        Args:
+            indices (:obj:`list` of int): Indices of the reads; the k-th of them becomes read k
+
+        Returns:
+            :class:`OverlapGraph`
+        """
+        newIndices = dict((i, k) for (k, i) in enumerate(indices))
+        graph = OverlapGraph([])
+        graph.lengths = [self.lengths[i] for i in indices]
+        graph.rightNeighbors = [set(newIndices[j] for j in self.rightNeighbors[i] if j in newIndices) for i in indices]
+        graph.leftNeighbors = [set(newIndices[j] for j in self.leftNeighbors[i] if j in newIndices) for i in indices]
+        graph.isContained = [self.isContained[i] for i in indices]
+        graph.matcher = self.matcher
+        for k in range(len(indices)):
+            for l in graph.rightNeighbors[k]:
+                graph.overlaps[(k, l)] = self.overlaps[(indices[k], indices[l])]
+        return graph
+
+    def findContainers(self, readsList):
+        """Finds a longer read encompassing each read, if any
+
+            Identical reads do not encompass each other, as each of them can be a separate copy of a repeat.
+
+        Args:
+            readsList (:obj:`list` of :class:`PartData`): The same single reads
+
+        Returns:
+            :obj:`list` of int: Index of the encompassing read, or None if there is none
+        """
+        containedIn = [None] * len(readsList)
+        for (j, read) in enumerate(readsList):
+            if not self.isContained[j]:
+                continue
+            for (i, otherRead) in enumerate(readsList):
+                if self.lengths[i] > self.lengths[j] and self.isMatchInside(read, otherRead):
+                    containedIn[j] = i
+                    break
+        return containedIn
+
+    def findComponents(self, readsList):
+        """Partitions the reads into groups that share no overlap, nor encompass each other
+
+            ------------   ------------              component 1
+                  -----------    --------
+                                         ------------------   component 2
+                                            ------
+
+        Args:
+            readsList (:obj:`list` of :class:`PartData`): The same single reads
+
+        Returns:
+            :obj:`list` of :obj:`list` of int: Indices of the reads in each component, ordered by their first read
+        """
+        componentOf = [None] * len(readsList)
+        containedIn = self.findContainers(readsList)
+        encompassed = [[] for read in readsList]
+        for (j, i) in enumerate(containedIn):
+            if i is not None:
+                encompassed[i].append(j)
+
+        components = []
+        for startRead in range(len(readsList)):
+            if componentOf[startRead] is not None:
+                continue
+            componentOf[startRead] = len(components)
+            component = [startRead]
+            stack = [startRead]
+            while len(stack):
+                i = stack.pop()
+                neighbors = list(self.rightNeighbors[i]) + list(self.leftNeighbors[i]) + encompassed[i]
+                if containedIn[i] is not None:
+                    neighbors.append(containedIn[i])
+                for j in neighbors:
+                    if componentOf[j] is None:
+                        componentOf[j] = len(components)
+                        component.append(j)
+                        stack.append(j)
+            components.append(sorted(component))
+        return components
+
+    def isEndSpanned(self, part, other):
+        """Checks if an overlap of part and other can span more than the reads at their ends, e.g. the last read of part entirely
+
+            ------ ========                   part (last read ====)
+                 ---------- ------------     other
+                 |   overlap      |
+
+            Such an overlap is not a property of the end reads, so it is checked against the sequences. It can only be longer than an end read when both parts are longer, or when the end read is encompassed by another read.
+
+        Args:
+            part (:class:`PartData`): The assembly on the left
+            other (:class:`PartData`): The other assembly to merge into
+
+        Returns:
+            bool
+        """
+        (i, j) = (part.last, other.first)
+        if self.isContained[i] or self.isContained[j]:
+            return True
+        return min(part.length, other.length) > min(self.lengths[i], self.lengths[j])
+
+    def matchLeft(self, part, other):
+        """Checks if part is the left neighbor of other, same as :meth:`PartData.isMatchLeft`
+
+            The overlap of the end reads, if any, is also the shortest overlap of the parts, which :meth:`PartData.isMatchLeft` takes. Otherwise the parts are only checked against their sequences if the overlap can span more than the end reads (see :meth:`isEndSpanned`).
+
+        Args:
+            part (:class:`PartData`): The assembly on the left
+            other (:class:`PartData`): The other assembly to merge into
+
+        Returns:
+            int: The start index of the overlapping region in part, or -1 if not matched
+        """
+        (i, j) = (part.last, other.first)
+        if self.isContained[i] or self.isContained[j]:
+            return self.isMatchLeft(part, other)
+        if (i, j) in self.overlaps:
+            return part.length - self.lengths[i] + self.overlaps[(i, j)][0]
+        if self.isEndSpanned(part, other):
+            return self.isMatchLeft(part, other)
+        return -1
+
+    def findRightParts(self, part, partsList):
+        """Finds parts in the list that part is the left neighbor of, in list order
+
+        Args:
+            part (:class:`PartData`): The assembly on the left
+            partsList (:obj:`list` of :class:`PartData`): The list of parts to search
+
+        Returns:
+            :obj:`list` of `tuple(PartData, int)`: Matched parts and the start index of the overlapping region in part
+        """
+        neighbors = self.rightNeighbors[part.last]
+        matches = []
+        for otherPart in partsList:
+            if otherPart is part or not (otherPart.first in neighbors or self.isEndSpanned(part, otherPart)):
+                continue
+            matchStartIndex = self.matchLeft(part, otherPart)
+            if matchStartIndex != -1:
+                matches.append((otherPart, matchStartIndex))
+        return matches
+
+    def findLeftParts(self, part, partsList):
+        """Finds parts in the list that are the left neighbor of part, in list order
+
+        Args:
+            part (:class:`PartData`): The assembly on the right
+            partsList (:obj:`list` of :class:`PartData`): The list of parts to search
+
+        Returns:
+            :obj:`list` of `tuple(PartData, int)`: Matched parts and the start index of the overlapping region in them
+        """
+        neighbors = self.leftNeighbors[part.first]
+        matches = []
+        for otherPart in partsList:
+            if otherPart is part or not (otherPart.last in neighbors or self.isEndSpanned(otherPart, part)):
+                continue
+            matchStartIndex = self.matchLeft(otherPart, part)
+            if matchStartIndex != -1:
+                matches.append((otherPart, matchStartIndex))
+        return matches
+
+
+class ReadGroups(object):
+    """Group identical reads into one representative with a multiplicity, and map reads encompassed by longer reads to them
+
+        ABA, BAB, ABA, BAB, ABC     ->  ABA x 2, BAB x 2, ABC x 1
+        ABCD, BC                    ->  ABCD x 1 (BC inside ABCD)
+
+        Copies of a representative are interchangeable, so a search can walk the representatives and only use a copy where a repeat needs it, instead of trying each copy in turn. Encompassed reads are covered by the sequence of their encompassing reads.
+
+    Args:
+        readsList (:obj:`list` of :class:`PartData`): List of single reads
+        overlapGraph (:class:`OverlapGraph`): Precomputed overlaps between the reads
+
+    Returns:
+        :class:`ReadGroups` of {
+            'representatives': :obj:`list` of int,
+            'representativeOf': :obj:`list` of int,
+            'multiplicity': :obj:`list` of int,
+            'containedIn': :obj:`list` of int,
+            'rightNeighbors': :obj:`dict` of int: :obj:`set` of int,
+            'leftNeighbors': :obj:`dict` of int: :obj:`set` of int,
+            'offsets': :obj:`dict` of `tuple(int, int)`: int
+        }
+    """
+
+    def __init__(self, readsList, overlapGraph):
+        self.containedIn = overlapGraph.findContainers(readsList)
+        self.representativeOf = []
+        self.multiplicity = [0] * len(readsList)
+
+        firstIndices = {}
+        for (i, read) in enumerate(readsList):
+            representative = firstIndices.setdefault(read.sequence, i)
+            self.representativeOf.append(representative)
+            if self.containedIn[i] is None:
+                self.multiplicity[representative] += 1
+        self.representatives = [
+            i
+            for i in range(len(readsList))
+            if self.representativeOf[i] == i and self.containedIn[i] is None
+        ]
+
+        # overlaps between copies of the same read become a self edge
+        self.rightNeighbors = dict((i, set()) for i in self.representatives)
+        self.leftNeighbors = dict((i, set()) for i in self.representatives)
+        self.offsets = {}
+        for ((i, j), (matchStartIndex, minOverlapLength)) in overlapGraph.overlaps.items():
+            if self.containedIn[i] is None and self.containedIn[j] is None:
+                (i, j) = (self.representativeOf[i], self.representativeOf[j])
+                self.rightNeighbors[i].add(j)
+                self.leftNeighbors[j].add(i)
+                self.offsets[(i, j)] = matchStartIndex
+
+
+    def __len__(self):
+        return len(self.representatives)
+
+    def countLeftOut(self):
+        """Counts reads encompassed by longer reads, which are not in any group
+
+        Returns:
+            int: Number of reads
+        """
+        return sum(1 for i in self.containedIn if i is not None)
+
+
 def initiateReadData(readsList):
     """Converts list of reads to list of :class:`PartData`
 
@@ -118,4 +724,4 @@ def initiateReadData(readsList):
         :obj:`list` of :class:`PartData`
     """
 
-    return [PartData(read) for read in readsList]
+    return [PartData(readsList, i) for i in range(len(readsList))]
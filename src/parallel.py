@@ -0,0 +1,198 @@
+import multiprocessing
+
+try:
+    from concurrent import futures
+except ImportError:
+    futures = None
+
+from . import assembly
+from . import index
+from . import model
+
+
+class CancellableStateCache(assembly.FailedStateCache):
+    """Dead-end cache of a worker, which reports every state as failed once any worker found a solution
+
+        The search then unwinds on its own, without being killed.
+
+    Args:
+        cancelEvent (:obj:`multiprocessing.Event`): Set when the search should stop
+        maxSize (:obj:`int`, optional): Maximum number of states to remember
+        checkInterval (:obj:`int`, optional): Number of states between checks of "cancelEvent"
+    """
+
+    def __init__(self, cancelEvent, maxSize=100000, checkInterval=1000):
+        super(CancellableStateCache, self).__init__(maxSize)
+        self.cancelEvent = cancelEvent
+        self.checkInterval = checkInterval
+        self.isCancelled = False
+        self.checkCount = 0
+
+
+    def isFailed(self, key, depth=0):
+        # the event is shared between processes, so it is only checked once in a while
+        self.checkCount += 1
+        if not self.isCancelled and self.checkCount % self.checkInterval == 0:
+            self.isCancelled = self.cancelEvent.is_set()
+        if self.isCancelled:
+            return True
+        return super(CancellableStateCache, self).isFailed(key, depth)
+
+
+# set in each worker process by initiateWorker()
+workerCancelEvent = None
+
+# branches split for each worker at most, as every branch is a task carrying the overlap graph
+MAX_BRANCHES_PER_WORKER = 16
+
+
+def initiateWorker(cancelEvent):
+    """Keeps the shared cancel event in a worker process
+
+    Args:
+        cancelEvent (:obj:`multiprocessing.Event`): Set when the search should stop
+    """
+    global workerCancelEvent
+    workerCancelEvent = cancelEvent
+
+
+def splitStates(readsList, overlapGraph, splitDepth, maxStates=None):
+    """Lists the distinct states of :func:`assembly.assembleParts` after a number of merges, in its search order
+
+        The states multiply by the number of merges at each depth, so only the first "maxStates" states are listed; the others are left to the serial search.
+
+    Args:
+        readsList (:obj:`list` of :class:`PartData`): The list of single reads to assemble
+        overlapGraph (:class:`OverlapGraph`): Precomputed overlaps between single reads
+        splitDepth (int): Number of merges
+        maxStates (:obj:`int`, optional): Maximum number of states; not limited if not given
+
+    Returns:
+        :obj:`list` of :obj:`list` of :class:`PartData`: Lists of parts, or fewer merged if the search ends earlier
+    """
+    states = [readsList]
+    for depth in range(splitDepth):
+        nextStates = []
+        stateKeys = set()
+        for partsList in states:
+            if len(partsList) == 1:
+                nextStates.append(partsList)
+                continue
+            for assembledPartsList in assembly.iterMergedParts(partsList, overlapGraph):
+                stateKey = frozenset(tuple(part.layout()) for part in assembledPartsList)
+                if stateKey not in stateKeys:
+                    stateKeys.add(stateKey)
+                    nextStates.append(assembledPartsList)
+                if maxStates is not None and len(nextStates) == maxStates:
+                    return nextStates
+        states = nextStates
+    return states
+
+
+def searchBranch(partsList, overlapGraph):
+    """Worker: :func:`assembly.assembleParts` from a state given by :func:`splitStates`, or from the single reads
+
+    Args:
+        partsList (:obj:`list` of :class:`PartData`): The list of parts to assemble
+        overlapGraph (:class:`OverlapGraph`): Precomputed overlaps between single reads
+
+    Returns:
+        sequence (string): The fully assembled context, or None if not found or cancelled
+    """
+    return assembly.assembleParts(partsList, overlapGraph, CancellableStateCache(workerCancelEvent))
+
+
+def assembleComponent(reads, engine, k):
+    """Worker: assembles the reads of one component on their own
+
+    Args:
+        reads (:obj:`list` of string): The reads of the component
+        engine (:obj:`function`): The search engine, e.g. :func:`assembly.assembleParts`
+        k (int): Length of seeds of :class:`SeedIndex`
+
+    Returns:
+        sequence (string): The assembled context of the component, or None if not found or cancelled
+    """
+    readsList = model.initiateReadData(reads)
+    overlapGraph = model.OverlapGraph(readsList, index.SeedIndex(reads, k))
+    return engine(readsList, overlapGraph, CancellableStateCache(workerCancelEvent))
+
+
+def runPool(tasks, workers, isFirstResult):
+    """Runs tasks in a process pool
+
+    Args:
+        tasks (:obj:`list` of `tuple(function, tuple)`): Worker functions and their arguments
+        workers (int): Number of worker processes
+        isFirstResult (bool): Whether to return as soon as any task returns a result, cancelling the others
+
+    Returns:
+        :obj:`list`: Results of the tasks in order, or a list of only the first result
+
+    Raises:
+        ImportError: When :mod:`concurrent.futures` is not available
+    """
+    if futures is None:
+        raise ImportError('\033[41mconcurrent.futures\033[0m is required for parallel assembly.')
+
+    cancelEvent = multiprocessing.Event()
+    executor = futures.ProcessPoolExecutor(max_workers=workers, initializer=initiateWorker, initargs=(cancelEvent,))
+    pendingFutures = []
+    try:
+        pendingFutures = [executor.submit(function, *arguments) for (function, arguments) in tasks]
+        if not isFirstResult:
+            return [future.result() for future in pendingFutures]
+
+        for future in futures.as_completed(pendingFutures):
+            result = future.result()
+            if result is not None:
+                return [result]
+        return [None]
+    finally:
+        # running workers see the event and unwind, queued ones are dropped
+        cancelEvent.set()
+        for future in pendingFutures:
+            future.cancel()
+        executor.shutdown(wait=True)
+
+
+def assembleParallel(readsList, overlapGraph, engine=None, workers=None, splitDepth=2, k=16):
+    """Assembles the reads in worker processes
+
+        If the reads fall into more than one component (see :meth:`OverlapGraph.findComponents`), each component is assembled by "engine" in its own worker.
+        Otherwise, the search of :func:`assembly.assembleParts` is split into its states after "splitDepth" merges (only the first "MAX_BRANCHES_PER_WORKER" states for each worker), each searched by a worker alongside the serial search from the start. Branches do not share their dead ends, so the serial search keeps parallel no slower than it. The first solution found is kept, and the remaining workers are cancelled. It is the same as the serial one when the reconstruction is unique.
+
+    Args:
+        readsList (:obj:`list` of :class:`PartData`): The list of single reads to assemble
+        overlapGraph (:class:`OverlapGraph`): Precomputed overlaps between single reads
+        engine (:obj:`function`, optional): The search engine for components; :func:`assembly.assembleParts` if not given
+        workers (:obj:`int`, optional): Number of worker processes; number of CPUs if not given
+        splitDepth (:obj:`int`, optional): Number of merges before splitting the search
+        k (:obj:`int`, optional): Length of seeds of :class:`SeedIndex` for components
+
+    Returns:
+        :obj:`list` of string: The assembled context of each component, None where it failed
+    """
+    if engine is None:
+        engine = assembly.assembleParts
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+    if not len(readsList):
+        return []
+
+    components = overlapGraph.findComponents(readsList)
+    if len(components) > 1:
+        tasks = [
+            (assembleComponent, ([readsList[i].sequence for i in component], engine, k))
+            for component in components
+        ]
+        return runPool(tasks, workers, False)
+
+    if engine is not assembly.assembleParts:
+        return [engine(readsList, overlapGraph, assembly.FailedStateCache())]
+
+    tasks = [(searchBranch, (readsList, overlapGraph))]
+    for partsList in splitStates(readsList, overlapGraph, splitDepth, workers * MAX_BRANCHES_PER_WORKER):
+        if partsList is not readsList:
+            tasks.append((searchBranch, (partsList, overlapGraph)))
+    return runPool(tasks, workers, True)
@@ -0,0 +1,333 @@
+import csv
+import json
+import os
+import sys
+import time
+
+from . import approx
+from . import assembly
+from . import assembly_graph
+from . import cache
+from . import encoding
+from . import fasta
+from . import incremental
+from . import index
+from . import model
+from . import parallel
+from . import stats
+from . import strand
+from . import test
+
+
+def addAssemblyArguments(parser):
+    """Adds the options of :func:`assembleFile` to a command line parser
+
+    Args:
+        parser (:obj:`argparse.ArgumentParser`): The parser
+    """
+    parser.add_argument('--mmap', action='store_true', help='Parse input file through memory-mapping, for large uncompressed files')
+    parser.add_argument('--line-width', type=int, default=0, help='Wrap sequence lines of output file at this width; no wrapping if 0')
+    parser.add_argument('--engine', type=str, choices=['recursive', 'iterative', 'graph'], default='recursive', help='Search engine for assembly')
+    parser.add_argument('--tiered', action='store_true', help='Try the single-pass greedy assembly first, and only search with the engine if its result does not pass the test')
+    parser.add_argument('--workers', type=int, default=1, help='Number of worker processes to search in parallel (Python 3 only); no parallel search if 1')
+    parser.add_argument('--split-depth', type=int, default=2, help='Number of merges before splitting the search across workers')
+    parser.add_argument('--time-limit', type=float, default=None, help='Stop the search after this many seconds, and write the best partial assembly as separate contigs')
+    parser.add_argument('--node-limit', type=int, default=None, help='Stop the search after visiting this many states, and write the best partial assembly as separate contigs')
+    parser.add_argument('--stats', type=str, nargs='?', const='', default=None, help='Write time, CPU time and peak memory of each phase, and counters of the search, as JSON to this file (inputFile_stats.json if not given)')
+    parser.add_argument('--cache', type=str, default=None, help='SQLite file to keep overlaps and assemblies across runs; unchanged inputs are not assembled again, and only overlaps of new reads are computed')
+    parser.add_argument('--cache-size', type=int, default=256, help='Maximum size of cache entries in MB, evicting the least recently used')
+    parser.add_argument('--max-errors', type=int, default=0, help='Accept up to this many mismatches in each read, for reads with sequencing errors (twice as many between overlapping reads); the assembly is then polished by the majority of the reads, and only tested for each read occurring in it within as many errors')
+    parser.add_argument('--edits', action='store_true', help='With --max-errors, also count insertions and deletions, not only mismatches')
+    parser.add_argument('--both-strands', action='store_true', help='Reads can be on either strand; reverse complement those on the other strand than the first read before assembling')
+    parser.add_argument('--kmer', type=int, default=16, help='Length of seeds to find overlapping reads')
+    parser.add_argument('--encoded', action='store_true', help='Verify overlaps on 2-bit encoded reads with NumPy (T/C/G/A only)')
+
+
+def getMatcher(options):
+    """Gets the checks of overlaps selected by the options
+
+    Args:
+        options (:obj:`argparse.Namespace`): Options added by :func:`addAssemblyArguments`
+
+    Returns:
+        :class:`ApproximateMatcher`: None for exact overlaps
+    """
+    if not options.max_errors:
+        return None
+    return approx.ApproximateMatcher(options.max_errors, options.edits)
+
+
+def orientReads(reads, options):
+    """Puts the reads on one strand if selected by the options (see :func:`strand.orientReads`)
+
+    Args:
+        reads (:obj:`list` of string): List of reads in string
+        options (:obj:`argparse.Namespace`): Options added by :func:`addAssemblyArguments`
+
+    Returns:
+        :obj:`list` of string: The reads, reverse complemented where on the other strand
+    """
+    if not options.both_strands:
+        return reads
+    (reads, isReversed, conflictsCount) = strand.orientReads(reads, options.kmer, getMatcher(options))
+    print('Strands: \033[95m%s\033[0m of \033[95m%s\033[0m reads reverse complemented, \033[95m%s\033[0m overlaps on the other strand.' % (sum(isReversed), len(reads), conflictsCount))
+    return reads
+
+
+def assembleFile(inputFile, options, outputDirectory=None):
+    """Reads, assembles, writes and tests one FASTA file of reads
+
+        The result is written to "inputFile_assembled.ext".
+
+    Args:
+        inputFile (string): Name of input FASTA file
+        options (:obj:`argparse.Namespace`): Options added by :func:`addAssemblyArguments`
+        outputDirectory (:obj:`string`, optional): Folder of the output files; next to the input file if not given
+
+    Returns:
+        :obj:`dict` of {
+            'inputFile': string,
+            'outputFile': string,
+            'readsCount': int,
+            'contigsCount': int,
+            'length': int,
+            'tier': string,
+            'isTested': bool,
+            'time': float
+        }
+
+    Raises:
+        Exception: When there are no reads or the assembly fails the test (see :func:`validateResult`)
+    """
+    t0 = time.time()
+    (fileName, fileExtension) = os.path.splitext(inputFile)
+    if outputDirectory is not None:
+        fileName = os.path.join(outputDirectory, os.path.basename(fileName))
+    outputFile = '%s_assembled%s' % (fileName, fileExtension)
+
+    # instrumented only on request and for this run, otherwise the original functions run
+    runStats = stats.NullStats()
+    if options.stats is not None:
+        runStats = stats.Stats()
+    assemblyCache = None
+    if options.cache is not None:
+        assemblyCache = cache.AssemblyCache(options.cache, options.cache_size * 1024 * 1024)
+    # engines that may give a different result for the same reads
+    cacheSettings = '%s%s' % (options.engine, ' tiered' if options.tiered else '')
+    matcher = getMatcher(options)
+    if matcher is not None:
+        cacheSettings += ' %s %s' % (matcher.maxErrors, 'edits' if matcher.isEdit else 'mismatches')
+
+    try:
+        with runStats.instrumented():
+            # Read from input FASTA file
+            with runStats.phase('readFasta'):
+                (reads, labels) = fasta.readFasta(inputFile, options.mmap)
+            if not len(reads):
+                raise ValueError('\033[41mMissing\033[0m reads in input FASTA file (\033[94m%s\033[0m).' % inputFile)
+            if options.both_strands:
+                with runStats.phase('orientReads'):
+                    reads = orientReads(reads, options)
+
+            # Perform assembly
+            (result, contigs, tier) = (None, None, None)
+            if assemblyCache is not None:
+                with runStats.phase('cache'):
+                    (result, tier) = assemblyCache.getAssembly(reads, cacheSettings)
+            isCached = result is not None
+            if isCached:
+                tier = '%s (cached)' % tier
+            else:
+                with runStats.phase('initiateReadData'):
+                    readsList = model.initiateReadData(reads)
+                (result, contigs, tier) = assembleReads(reads, readsList, options, runStats, assemblyCache)
+            print('\033[92mSUCCESS\033[0m: Finished assembly of reads for (\033[94m%s\033[0m) by \033[95m%s\033[0m.' % (outputFile, tier))
+
+            # Write to output FASTA file
+            with runStats.phase('writeFasta'):
+                if contigs is not None:
+                    contigLabels = ['%s_assembled_contig_%s' % (fileName, i + 1) for i in range(len(contigs))]
+                    fasta.writeFasta(outputFile, contigs, contigLabels, options.line_width)
+                else:
+                    fasta.writeFasta(outputFile, result, '%s_assembled' % fileName, options.line_width)
+
+            # Test if output is valid
+            if contigs is not None:
+                print('Partial assembly is \033[93mnot tested\033[0m.')
+            elif isCached:
+                print('Cached assembly was tested when stored.')
+            else:
+                with runStats.phase('validateAssembly'):
+                    validateResult(result, reads, labels, matcher)
+                if matcher is not None:
+                    print('\033[92mSUCCESS\033[0m: Test passed for assembly (\033[94m%s\033[0m), all reads within \033[95m%s\033[0m errors.' % (outputFile, matcher.maxErrors))
+                else:
+                    print('\033[92mSUCCESS\033[0m: Test passed for assembly (\033[94m%s\033[0m).' % outputFile)
+                if assemblyCache is not None:
+                    assemblyCache.putAssembly(reads, cacheSettings, result, tier)
+    finally:
+        if assemblyCache is not None:
+            assemblyCache.close()
+
+    print('Time elapsed: \033[95m%.2f s\033[0m.' % (time.time() - t0))
+    if options.stats is not None:
+        runStats.writeJson(options.stats or '%s_stats.json' % fileName)
+
+    isTested = contigs is None
+    if contigs is None:
+        contigs = [result]
+    return {
+        'inputFile': inputFile,
+        'outputFile': outputFile,
+        'readsCount': len(reads),
+        'contigsCount': len(contigs),
+        'length': sum(len(contig) for contig in contigs),
+        'tier': tier,
+        'isTested': isTested,
+        'time': time.time() - t0
+    }
+
+
+def validateResult(result, reads, labels, matcher=None):
+    """Tests a full assembly of the reads by :func:`test.validateAssembly`, or by :meth:`ApproximateMatcher.isValidAssembly` with a matcher
+
+    Args:
+        result (string): The fully assembled context
+        reads (:obj:`list` of string): List of reads in string
+        labels (:obj:`list` of string): Labels of the reads
+        matcher (:class:`ApproximateMatcher`, optional): Checks of overlaps with errors (see :func:`getMatcher`)
+
+    Raises:
+        Exception: When the assembly fails the test
+    """
+    if matcher is None:
+        test.validateAssembly(result, reads, labels)
+    elif not matcher.isValidAssembly(result, reads):
+        raise Exception('\033[41mERROR\033[0m: Reads do not cover assembled result within \033[93m%s\033[0m errors.' % matcher.maxErrors)
+
+
+def assembleReads(reads, readsList, options, runStats=None, assemblyCache=None):
+    """Assembles reads as selected by the options
+
+    Args:
+        reads (:obj:`list` of string): List of reads in string
+        readsList (:obj:`list` of :class:`PartData`): The same reads, from :func:`model.initiateReadData`
+        options (:obj:`argparse.Namespace`): Options added by :func:`addAssemblyArguments`
+        runStats (:class:`Stats`, optional): Record of phases
+        assemblyCache (:class:`AssemblyCache`, optional): Cache of compared pairs of reads, updated with the new pairs
+
+    Returns:
+        :obj:`tuple` of (
+            result (string): The fully assembled context, or None if only partially assembled
+            contigs (:obj:`list` of string): The contigs of the partial assembly, or None if fully assembled
+            tier (string): The engine that produced the result
+        )
+    """
+    if runStats is None:
+        runStats = stats.NullStats()
+    isBudgeted = options.time_limit is not None or options.node_limit is not None
+    result = None
+    contigs = None
+    if options.tiered:
+        # fast path, already tested if not None
+        with runStats.phase('assembleGreedy'):
+            result = assembly.assembleGreedy(readsList)
+        if result is not None:
+            return (result, None, 'greedy')
+
+    with runStats.phase('overlapGraph'):
+        matcher = getMatcher(options)
+        seedIndex = index.SeedIndex(reads, options.kmer, matcher is not None)
+        print('Seed index: k = \033[95m%s\033[0m, \033[95m%s\033[0m bytes.' % (seedIndex.k, seedIndex.getMemorySize()))
+        readStore = None
+        if options.encoded and matcher is not None:
+            print('Overlaps with errors are not encoded, ignoring \033[95m--encoded\033[0m.')
+        elif options.encoded:
+            readStore = encoding.EncodedReadStore(reads)
+            print('Encoded reads: \033[95m%s\033[0m bytes.' % readStore.getMemorySize())
+        if matcher is not None:
+            # cached pairs are exact
+            overlapGraph = model.OverlapGraph(readsList, seedIndex, matcher=matcher)
+            print('Overlaps within \033[95m%s\033[0m %s: \033[95m%s\033[0m.' % (matcher.maxErrors, 'edits' if matcher.isEdit else 'mismatches', len(overlapGraph.overlaps)))
+        elif assemblyCache is None:
+            overlapGraph = model.OverlapGraph(readsList, seedIndex, readStore)
+        else:
+            knownPairs = assemblyCache.getPairs(reads)
+            overlapGraph = model.OverlapGraph(readsList, seedIndex, readStore, knownPairs)
+            reusedCount = sum(1 for pair in overlapGraph.pairs if pair in knownPairs)
+            print('Overlap cache: \033[95m%s\033[0m pairs reused, \033[95m%s\033[0m compared.' % (reusedCount, len(overlapGraph.pairs) - reusedCount))
+            assemblyCache.putPairs(reads, overlapGraph.pairs)
+
+    if isBudgeted:
+        failedStates = assembly.BudgetedStateCache(options.time_limit, options.node_limit)
+    else:
+        failedStates = assembly.FailedStateCache()
+    engine = {
+        'recursive': assembly.assembleParts,
+        'iterative': assembly.assemblePartsIterative,
+        'graph': assembly_graph.assembleGraph
+    }[options.engine]
+    with runStats.phase('assembly'):
+        if options.workers > 1 and matcher is not None:
+            print('Overlaps with errors are only searched serially, ignoring \033[95m--workers\033[0m.')
+        if options.workers > 1 and not isBudgeted and matcher is None:
+            componentResults = parallel.assembleParallel(readsList, overlapGraph, engine, options.workers, options.split_depth, options.kmer)
+            if len(componentResults) == 1:
+                result = componentResults[0]
+            elif all(componentResult is not None for componentResult in componentResults):
+                # components share no overlap nor encompassment, so each is a contig of its own
+                print('Reads form \033[95m%s\033[0m separate components, keeping each as a contig.' % len(componentResults))
+                contigs = sorted(componentResults, key=len, reverse=True)
+            else:
+                print('Reads form \033[95m%s\033[0m separate components, not all assembled, keeping their best partial assemblies.' % len(componentResults))
+                contigs = assembly.assembleContigs(readsList, overlapGraph, engine, failedStates)
+        elif isBudgeted:
+            if options.workers > 1:
+                print('Search budget is only applied serially, ignoring \033[95m--workers\033[0m.')
+            # best effort: the contigs of the best partial assembly, if not fully assembled in time
+            contigs = assembly.assembleContigs(readsList, overlapGraph, engine, failedStates)
+            if len(contigs) == 1 and matcher is not None:
+                contigs = [matcher.polishAssembly(contigs[0], reads)]
+            if len(contigs) == 1 and overlapGraph.isValidAssembly(contigs[0], reads):
+                (result, contigs) = (contigs[0], None)
+            else:
+                print('Search stopped after \033[95m%s\033[0m states (\033[93m%s\033[0m), keeping \033[95m%s\033[0m contigs.' % (failedStates.nodeCount, 'budget exhausted' if failedStates.isExhausted else 'no solution', len(contigs)))
+        else:
+            if matcher is not None:
+                # errors can merge distinct copies of a repeat, so an assembly of exact overlaps is tried first, within a budget
+                exactStates = assembly.BudgetedStateCache(None, incremental.NODES_PER_READ * len(readsList))
+                result = engine(readsList, model.OverlapGraph(readsList, seedIndex), exactStates)
+                runStats.recordMax('maxDepth', exactStates.maxDepth)
+                if result is not None and not test.isValidAssembly(result, reads):
+                    result = None
+            if result is None:
+                result = engine(readsList, overlapGraph, failedStates)
+                if result is not None and matcher is not None:
+                    # the merges keep the errors of the reads on the right
+                    result = matcher.polishAssembly(result, reads)
+    print('Dead-end cache: \033[95m%s\033[0m hits, \033[95m%s\033[0m misses.' % (failedStates.hits, failedStates.misses))
+    runStats.recordMax('maxDepth', failedStates.maxDepth)
+
+    tier = options.engine if contigs is None else '%s (partial)' % options.engine
+    return (result, contigs, tier)
+
+
+def writeReport(fileName, records, fields):
+    """Writes records to a JSON file if the file name ends with ".json", otherwise to a CSV file
+
+    Args:
+        fileName (string): Name of output file
+        records (:obj:`list` of :obj:`dict`): One record for each run
+        fields (:obj:`list` of string): Keys of the records, as columns of CSV file
+    """
+    if fileName.endswith('.json'):
+        with open(fileName, 'w') as f:
+            json.dump(records, f, indent=2)
+    else:
+        # the csv module writes bytes on python 2.x
+        f = open(fileName, 'wb') if sys.version_info[0] < 3 else open(fileName, 'w', newline='')
+        with f:
+            writer = csv.DictWriter(f, fields)
+            writer.writeheader()
+            writer.writerows(records)
+    print('\033[92mSUCCESS\033[0m: Wrote \033[95m%s\033[0m records to file (\033[94m%s\033[0m).' % (len(records), fileName))
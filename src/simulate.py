@@ -0,0 +1,145 @@
+import os
+import random
+
+from . import fasta
+from . import index
+
+
+NUCLEOTIDES = 'TCGA'
+
+
+def simulateSequence(length, repeatFraction=0.0, repeatLength=50, rng=None):
+    """Generates a random full-length sequence, with copies of one repeat in it
+
+        ======RRRR==========RRRR====RRRR=====      R: the same repeat unit
+
+    Args:
+        length (int): Length of the sequence
+        repeatFraction (:obj:`float`, optional): Fraction of the sequence covered by copies of the repeat
+        repeatLength (:obj:`int`, optional): Length of the repeat unit
+        rng (:obj:`random.Random`, optional): Random number generator
+
+    Returns:
+        string: The sequence
+    """
+    if rng is None:
+        rng = random.Random()
+    sequence = [rng.choice(NUCLEOTIDES) for i in range(length)]
+
+    repeatCount = int(length * repeatFraction) // repeatLength if repeatLength > 0 else 0
+    if repeatCount:
+        repeat = [rng.choice(NUCLEOTIDES) for i in range(repeatLength)]
+        # non-overlapping slots, so each copy stays whole
+        slots = rng.sample(range(length // repeatLength), min(repeatCount, length // repeatLength))
+        for slot in slots:
+            sequence[(slot * repeatLength):((slot + 1) * repeatLength)] = repeat
+    return ''.join(sequence)
+
+
+def addErrors(read, errorRate=0.0, indelRate=0.0, rng=None):
+    """Adds sequencing errors to a read
+
+    Args:
+        read (string): The read
+        errorRate (:obj:`float`, optional): Probability of each nucleotide to be substituted
+        indelRate (:obj:`float`, optional): Probability of each nucleotide to be deleted, or to have a nucleotide inserted before it
+        rng (:obj:`random.Random`, optional): Random number generator
+
+    Returns:
+        string: The read with errors
+    """
+    if rng is None:
+        rng = random.Random()
+    nucleotides = []
+    for nucleotide in read:
+        if rng.random() < indelRate:
+            if rng.random() < 0.5:
+                continue
+            nucleotides.append(rng.choice(NUCLEOTIDES))
+        if rng.random() < errorRate:
+            nucleotide = rng.choice(NUCLEOTIDES.replace(nucleotide, ''))
+        nucleotides.append(nucleotide)
+    return ''.join(nucleotides)
+
+
+def simulateReads(sequence, readLength, coverage, duplicateRate=0.0, rng=None, errorRate=0.0, indelRate=0.0, reverseRate=0.0):
+    """Samples reads from a sequence, each neighbor pair overlapping by more than half of the read length
+
+        Start positions advance by a random step, of mean length "readLength / coverage", but never by half of the read length or more. So the reads cover the sequence from its start to its end, as in the challenge.
+
+    Args:
+        sequence (string): The full-length sequence
+        readLength (int): Length of each read, at most the length of "sequence"
+        coverage (float): Average number of reads covering each position
+        duplicateRate (:obj:`float`, optional): Probability of each read to be sequenced twice
+        rng (:obj:`random.Random`, optional): Random number generator
+        errorRate (:obj:`float`, optional): Probability of each nucleotide of a read to be substituted (see :func:`addErrors`)
+        indelRate (:obj:`float`, optional): Probability of each nucleotide of a read to be deleted or preceded by an insertion
+        reverseRate (:obj:`float`, optional): Probability of each read to be read from the other strand, i.e. reverse complemented
+
+    Returns:
+        :obj:`list` of string: The reads, in random order
+    """
+    if rng is None:
+        rng = random.Random()
+    readLength = min(readLength, len(sequence))
+    maxStep = max(1, min((readLength - 1) // 2, int(round(2 * readLength / float(coverage))) - 1))
+
+    reads = []
+    startIndex = 0
+    while True:
+        reads.append(sequence[startIndex:(startIndex + readLength)])
+        if rng.random() < duplicateRate:
+            reads.append(reads[-1])
+        if startIndex + readLength >= len(sequence):
+            break
+        startIndex = min(startIndex + rng.randint(1, maxStep), len(sequence) - readLength)
+
+    # the same reads as without errors for the same seed
+    if errorRate > 0 or indelRate > 0:
+        reads = [addErrors(read, errorRate, indelRate, rng) for read in reads]
+    if reverseRate > 0:
+        reads = [index.reverseComplement(read) if rng.random() < reverseRate else read for read in reads]
+    rng.shuffle(reads)
+    return reads
+
+
+def simulate(genomeLength, readLength, coverage, repeatFraction=0.0, repeatLength=50, duplicateRate=0.0, seed=None, errorRate=0.0, indelRate=0.0, reverseRate=0.0):
+    """Generates a full-length sequence and reads from it, the same for the same seed
+
+    Args:
+        genomeLength (int): Length of the full-length sequence
+        readLength (int): Length of each read
+        coverage (float): Average number of reads covering each position
+        repeatFraction (:obj:`float`, optional): Fraction of the sequence covered by copies of a repeat
+        repeatLength (:obj:`int`, optional): Length of the repeat unit
+        duplicateRate (:obj:`float`, optional): Probability of each read to be sequenced twice
+        seed (:obj:`int`, optional): Seed of the random number generator
+        errorRate (:obj:`float`, optional): Probability of each nucleotide of a read to be substituted
+        indelRate (:obj:`float`, optional): Probability of each nucleotide of a read to be deleted or preceded by an insertion
+        reverseRate (:obj:`float`, optional): Probability of each read to be reverse complemented
+
+    Returns:
+        :obj:`tuple` of (
+            sequence (string): The full-length sequence
+            reads (:obj:`list` of string): The reads
+        )
+    """
+    rng = random.Random(seed)
+    sequence = simulateSequence(genomeLength, repeatFraction, repeatLength, rng)
+    reads = simulateReads(sequence, readLength, coverage, duplicateRate, rng, errorRate, indelRate, reverseRate)
+    return (sequence, reads)
+
+
+def writeSimulation(fileName, sequence, reads):
+    """Writes simulated reads to a FASTA file, and the full-length sequence next to it as the expected result
+
+    Args:
+        fileName (string): Name of FASTA file of reads, e.g. "data/simulated_data.txt"
+        sequence (string): The full-length sequence
+        reads (:obj:`list` of string): The reads
+    """
+    fasta.writeFasta(fileName, reads, ['simulated_%04d' % i for i in range(len(reads))])
+
+    (name, extension) = os.path.splitext(fileName)
+    fasta.writeFasta('%s_reference%s' % (name, extension), sequence, '%s_reference' % name)
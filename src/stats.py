@@ -0,0 +1,213 @@
+import contextlib
+import json
+import os
+import sys
+import time
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+def getCpuTime():
+    """Gets the CPU time of the process so far
+
+    Returns:
+        float: User and system time in seconds
+    """
+    # finer than os.times(), on python 3.3+
+    if hasattr(time, 'process_time'):
+        return time.process_time()
+    times = os.times()
+    return times[0] + times[1]
+
+
+def getPeakRss():
+    """Gets the peak resident memory of the process so far
+
+    Returns:
+        int: Size in bytes, or None where :mod:`resource` is not available
+    """
+    if resource is None:
+        return None
+    peakRss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on linux, bytes on mac
+    return peakRss if sys.platform == 'darwin' else peakRss * 1024
+
+
+class Stats(object):
+    """Construct a record of time spent in each phase of a run, and of counters of the search
+
+        Counters come from wrapping functions in place for the time of a run (see :meth:`instrumented`), or are reported by the run (see :meth:`recordMax`). Nothing is wrapped unless asked, so a run without stats runs the original functions.
+
+    Returns:
+        :class:`Stats` of {
+            'phases': :obj:`list` of :obj:`dict`,
+            'functions': :obj:`dict` of string: :obj:`dict`,
+            'counters': :obj:`dict` of string: int
+        }
+    """
+
+    def __init__(self):
+        self.startTime = time.time()
+        self.phases = []
+        self.functions = {}
+        self.counters = {}
+        self.patches = []
+
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        """Records wall time, CPU time and peak resident memory of a block
+
+        Args:
+            name (string): Name of the phase
+        """
+        (wallTime, cpuTime) = (time.time(), getCpuTime())
+        try:
+            yield
+        finally:
+            self.phases.append({
+                'name': name,
+                'wallTime': time.time() - wallTime,
+                'cpuTime': getCpuTime() - cpuTime,
+                'peakRss': getPeakRss()
+            })
+
+    def patch(self, owner, name, wrapper):
+        """Replaces a function of a module or a class by a wrapper of it
+
+        Args:
+            owner (module or class): Where the function is defined
+            name (string): Name of the function
+            wrapper (:obj:`function`): Takes the original function, and returns its replacement
+        """
+        function = vars(owner)[name]
+        self.patches.append((owner, name, function))
+        setattr(owner, name, wrapper(function))
+
+    def countCalls(self, owner, name, counterName):
+        """Counts calls of a function
+
+        Args:
+            owner (module or class): Where the function is defined
+            name (string): Name of the function
+            counterName (string): Key in "counters"
+        """
+        counters = self.counters
+        counters.setdefault(counterName, 0)
+
+        def wrapper(function):
+            def counted(*args, **kwargs):
+                counters[counterName] += 1
+                return function(*args, **kwargs)
+            return counted
+        self.patch(owner, name, wrapper)
+
+    def timeCalls(self, owner, name):
+        """Records number of calls, total wall time and CPU time of a function, which should not be recursive
+
+        Args:
+            owner (module or class): Where the function is defined
+            name (string): Name of the function
+        """
+        record = self.functions.setdefault('%s.%s' % (owner.__name__.split('.')[-1], name), {
+            'calls': 0,
+            'wallTime': 0.0,
+            'cpuTime': 0.0
+        })
+
+        def wrapper(function):
+            def timed(*args, **kwargs):
+                (wallTime, cpuTime) = (time.time(), getCpuTime())
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    record['calls'] += 1
+                    record['wallTime'] += time.time() - wallTime
+                    record['cpuTime'] += getCpuTime() - cpuTime
+            return timed
+        self.patch(owner, name, wrapper)
+
+    def recordMax(self, counterName, value):
+        """Keeps the maximum of a value reported by the run, e.g. :attr:`FailedStateCache.maxDepth` as "maxDepth", the deepest state of the search
+
+        Args:
+            counterName (string): Key in "counters"
+            value (int): Value reported
+        """
+        self.counters[counterName] = max(self.counters.get(counterName, 0), value)
+
+    def instrument(self):
+        """Wraps the functions of overlaps, search and test to be counted or timed, until :meth:`restore`
+
+            * isMatchLeft: string comparisons of :meth:`PartData.isMatchLeft`
+            * nodes: search states visited, i.e. checks of :meth:`FailedStateCache.isFailed`
+            * backtracks: dead ends, i.e. :meth:`FailedStateCache.addFailed`
+
+            The steps of :func:`test.validateAssembly` are timed, including their calls by the search.
+        """
+        from . import assembly
+        from . import model
+        from . import test
+
+        self.countCalls(model.PartData, 'isMatchLeft', 'isMatchLeft')
+        self.countCalls(assembly.FailedStateCache, 'isFailed', 'nodes')
+        self.countCalls(assembly.FailedStateCache, 'addFailed', 'backtracks')
+        for name in ('findReadsPositions', 'placeReads', 'sweepPlacementChain', 'repairPlacementChain', 'insertPlacements'):
+            self.timeCalls(test, name)
+
+    def restore(self):
+        """Puts back the original functions"""
+        for (owner, name, function) in reversed(self.patches):
+            setattr(owner, name, function)
+        self.patches = []
+
+    @contextlib.contextmanager
+    def instrumented(self):
+        """Wraps the functions (see :meth:`instrument`) only inside a block, and puts them back even if it raises, or if wrapping fails half way"""
+        try:
+            self.instrument()
+            yield
+        finally:
+            self.restore()
+
+    def toDict(self):
+        """Converts the record to JSON-serializable data
+
+        Returns:
+            :obj:`dict`
+        """
+        return {
+            'phases': self.phases,
+            'functions': self.functions,
+            'counters': self.counters,
+            'wallTime': time.time() - self.startTime,
+            'peakRss': getPeakRss()
+        }
+
+    def writeJson(self, fileName):
+        """Writes the record to a JSON file
+
+        Args:
+            fileName (string): Name of JSON file
+        """
+        with open(fileName, 'w') as f:
+            json.dump(self.toDict(), f, indent=2, sort_keys=True)
+        print('\033[92mSUCCESS\033[0m: Wrote stats to file (\033[94m%s\033[0m).' % fileName)
+
+
+class NullStats(object):
+    """Stand-in for :class:`Stats` when stats are off, recording nothing"""
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        yield
+
+    def recordMax(self, counterName, value):
+        pass
+
+    @contextlib.contextmanager
+    def instrumented(self):
+        yield
@@ -0,0 +1,119 @@
+import collections
+
+from . import index
+from . import model
+
+
+class StrandClassifier(object):
+    """Construct the checks of which strand each pair of reads overlaps on, each pair checked once
+
+        Candidates on either strand come from :class:`CanonicalSeedIndex`. A candidate pair is checked on the strand given by the seeds: read j, or its reverse complement, has to overlap read i on either side, encompass it or be encompassed by it.
+
+    Args:
+        reads (:obj:`list` of string): List of reads in string
+        k (:obj:`int`, optional): Length of seeds
+        matcher (:class:`ApproximateMatcher`, optional): Checks of overlaps and encompassment in place of the exact ones
+
+    Returns:
+        :class:`StrandClassifier` of {
+            'seedIndex': :class:`CanonicalSeedIndex`,
+            'pairs': :obj:`dict` of `tuple(int, int)`: bool, or None if the strand is not told
+        }
+    """
+
+    def __init__(self, reads, k=16, matcher=None):
+        self.seedIndex = index.CanonicalSeedIndex(reads, k)
+        self.readsList = model.initiateReadData(reads)
+        self.reverseReadsList = model.initiateReadData([index.reverseComplement(read) for read in reads])
+        self.matcher = matcher
+        # keyed by the smaller index first
+        self.pairs = {}
+
+
+    def isMatch(self, part, other):
+        """Checks if two reads overlap on either side, or one encompasses the other
+
+        Args:
+            part (:class:`PartData`): The read
+            other (:class:`PartData`): The other read
+
+        Returns:
+            bool
+        """
+        matcher = self.matcher
+        if matcher is None:
+            return part.isMatchLeft(other) != -1 or other.isMatchLeft(part) != -1 or part.isMatchInside(other) or other.isMatchInside(part)
+        return matcher.isMatchLeft(part, other) != -1 or matcher.isMatchLeft(other, part) != -1 or matcher.isMatchInside(part, other) or matcher.isMatchInside(other, part)
+
+    def findNeighbors(self, i):
+        """Finds the reads overlapping read i, on the strand they overlap on
+
+            Pairs matching on both strands, e.g. across a region that is its own reverse complement, do not tell the strand and are left out.
+
+        Args:
+            i (int): Index of the read
+
+        Returns:
+            :obj:`list` of `tuple(int, bool)`: Index of each neighbor, and whether it is on the same strand as read i
+        """
+        neighbors = []
+        for (j, strands) in sorted(self.seedIndex.findCandidates(i).items()):
+            pair = (min(i, j), max(i, j))
+            if pair not in self.pairs:
+                matchingStrands = [
+                    isSameStrand
+                    for isSameStrand in sorted(strands, reverse=True)
+                    if self.isMatch(self.readsList[i], self.readsList[j] if isSameStrand else self.reverseReadsList[j])
+                ]
+                self.pairs[pair] = matchingStrands[0] if len(matchingStrands) == 1 else None
+            if self.pairs[pair] is not None:
+                neighbors.append((j, self.pairs[pair]))
+        return neighbors
+
+
+def orientReads(reads, k=16, matcher=None):
+    """Puts the reads on one strand, by reverse complementing those on the other strand
+
+        Reads linked by overlaps on either strand (see :class:`StrandClassifier`) are walked breadth-first from the read of smallest index, which keeps its strand; each read reached is put on the strand of the read it was reached from. A read reached on both strands keeps the first one, and is counted as a conflict.
+
+        Only one path between two reads is needed to orient them, so a few pairs missed by the seeds, or by errors in them, do not matter. A read encompassed by another is only found from the encompassing read (see :meth:`CanonicalSeedIndex.findCandidates`), so the neighbors of all reads are found first, both ways. The assembly search then runs on the oriented reads as on single strand reads.
+
+    Args:
+        reads (:obj:`list` of string): List of reads in string
+        k (:obj:`int`, optional): Length of seeds
+        matcher (:class:`ApproximateMatcher`, optional): Checks of overlaps and encompassment in place of the exact ones
+
+    Returns:
+        :obj:`tuple` of (
+            orientedReads (:obj:`list` of string): The reads, reverse complemented where on the other strand
+            isReversed (:obj:`list` of bool): Whether each read was reverse complemented
+            conflictsCount (int): Number of pairs overlapping on a strand other than the one their reads were put on
+        )
+    """
+    classifier = StrandClassifier(reads, k, matcher)
+    neighbors = [{} for read in reads]
+    for i in range(len(reads)):
+        for (j, isSameStrand) in classifier.findNeighbors(i):
+            neighbors[i][j] = isSameStrand
+            neighbors[j][i] = isSameStrand
+
+    isReversed = [None] * len(reads)
+    conflictsCount = 0
+    for startRead in range(len(reads)):
+        if isReversed[startRead] is not None:
+            continue
+        isReversed[startRead] = False
+        queue = collections.deque([startRead])
+        while len(queue):
+            i = queue.popleft()
+            for (j, isSameStrand) in sorted(neighbors[i].items()):
+                isOtherReversed = isReversed[i] == isSameStrand
+                if isReversed[j] is None:
+                    isReversed[j] = isOtherReversed
+                    queue.append(j)
+                elif isReversed[j] != isOtherReversed and i < j:
+                    # each pair counted once
+                    conflictsCount += 1
+
+    orientedReads = [index.reverseComplement(read) if isReversed[i] else read for (i, read) in enumerate(reads)]
+    return (orientedReads, isReversed, conflictsCount)
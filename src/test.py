@@ -1,8 +1,10 @@
-import re
+import bisect
 
+from . import index
 
-def findReadPosition(fullAssembly, read, label=''):
-    """Finds the index of a given target (read) inside the context (fullAssembly)
+
+def findReadPosition(fullAssembly, read, label='', suffixArray=None):
+    """Finds the index of a given target (read) inside the context (fullAssembly), matched literally and including overlapping matches
 
         ========================================= context
                   --------------                  target
@@ -13,9 +15,10 @@ def findReadPosition(fullAssembly, read, label=''):
         fullAssembly (string): String of context
         read (string): String target
         label (string, optional): Label of string target (for logging)
+        suffixArray (:class:`index.SuffixArray`, optional): Index of the context, to avoid scanning it
 
     Returns:
-        :obj:`tuple` of (
+        :obj:`list` of :obj:`tuple` of (
             startIndex (int): The start index of the target in the context
             endIndex (int): The end index of the target in the context
         )
@@ -23,20 +26,57 @@ def findReadPosition(fullAssembly, read, label=''):
     Raises:
         AssertionError: When the target is not found in the context
     """
+    if suffixArray is not None:
+        startIndices = suffixArray.findPositions(read)
+    else:
+        startIndices = []
+        startIndex = fullAssembly.find(read)
+        while startIndex != -1:
+            startIndices.append(startIndex)
+            startIndex = fullAssembly.find(read, startIndex + 1)
+
     matchIndices = [
-        (match.start(), match.end())
-        for match in re.finditer(read, fullAssembly)
+        (startIndex, startIndex + len(read))
+        for startIndex in startIndices
     ]
 
-    try:
-        assert(len(matchIndices) > 0)
-    except AssertionError:
-        raise Exception('\033[41mERROR\033[0m: Found NO match for read (\033[94m%s\033[0m) in assembled result.' % label)
+    if not len(matchIndices):
+        raise AssertionError('\033[41mERROR\033[0m: Found NO match for read (\033[94m%s\033[0m) in assembled result.' % label)
 
     return matchIndices
 
 
-def convertReadsToPositions(fullAssembly, readsList, labelsList=None):
+def findReadsPositions(fullAssembly, readsList, labelsList=None):
+    """Finds the indices of all targets (reads) inside the context (fullAssembly), indexing the context once by :class:`index.SuffixArray`
+
+    Args:
+        fullAssembly (string): String of context
+        readsList (:obj:`list` of string): List of string targets
+        labelsList (:obj:`list` of string, optional): List of label of string target (for logging)
+
+    Returns:
+        :obj:`list` of :obj:`list` of `tuple(int, int)`: Start and end indices tuples of each target, same as "findReadPosition()"
+
+    Raises:
+        AssertionError: When a target is not found in the context
+    """
+    if labelsList is None:
+        labelsList = [''] * len(readsList)
+
+    suffixArray = index.SuffixArray(fullAssembly)
+    readsCandidates = []
+    for (i, startIndices) in enumerate(suffixArray.findPositionsBatch(readsList)):
+        if not len(startIndices):
+            raise AssertionError('\033[41mERROR\033[0m: Found NO match for read (\033[94m%s\033[0m) in assembled result.' % labelsList[i])
+
+        readsCandidates.append([
+            (startIndex, startIndex + len(readsList[i]))
+            for startIndex in startIndices
+        ])
+    return readsCandidates
+
+
+def convertReadsToPositions(fullAssembly, readsList, labelsList=None, readsCandidates=None):
     """Find and sort indices of each tareget (read) in the context (fullAssembly)
 
         ========================================= context
@@ -55,19 +95,20 @@ def convertReadsToPositions(fullAssembly, readsList, labelsList=None):
         fullAssembly (string): String of context
         readsList (:obj:`list` of string): List of string targets
         labelsList (:obj:`list` of string, optional): List of label of string target (for logging)
+        readsCandidates (:obj:`list` of :obj:`list` of `tuple(int, int)`, optional): Indices of each target, as from "findReadsPositions()"
 
     Returns
         readsIndices (:obj:`list` of :obj:`list` of `tuple(int, int)`): List of start and end indices tuples sorted by start index
         labelsList: (:obj:`list` of string): Input "labelsList" sorted according to output "readsIndices"
 
     """
-    if labelsList is None:
-        labelsList = [''] * len(readsList)
+    if readsCandidates is None:
+        readsCandidates = findReadsPositions(fullAssembly, readsList, labelsList)
 
     readsIndicesCombinations = []
-    for i in xrange(len(readsList)):
+    for i in range(len(readsList)):
         # get all possible positions of a read
-        indexTuples = findReadPosition(fullAssembly, readsList[i], labelsList[i])
+        indexTuples = readsCandidates[i]
 
         if not len(readsIndicesCombinations):
             readsIndicesCombinations = [[indexTuple] for indexTuple in indexTuples]
@@ -111,7 +152,7 @@ def validateOverlapLengthEach(readsIndices, ratio=0.5):
     Returns:
         bool: Whether all the reads satisfy overlapping rule
     """
-    for i in xrange(1, len(readsIndices)):
+    for i in range(1, len(readsIndices)):
         previousRead = readsIndices[i - 1]
         currentRead = readsIndices[i]
 
@@ -168,3 +209,360 @@ def validateCoverage(fullAssembly, readsIndicesCombinations):
 
     raise AssertionError('\033[41mERROR\033[0m: Reads (\033[94m%s-%s\033[0m) do not cover full-length context (\033[93m%s\033[0m).' % (readsIndices[0][0], readsIndices[-1][1],fullAssemblyLength))
 
+
+def isNeighborValid(previousRead, currentRead, ratio=0.5):
+    """Check if a pair of neighboring reads satisfy the minimum overlapping rule, same as "validateOverlapLengthEach()"
+
+    Args:
+        previousRead (`tuple(int, int)`): Start and end indices of the read on the left
+        currentRead (`tuple(int, int)`): Start and end indices of the read on the right
+        ratio (float, optional): Minimum overlap ratio between neighbors
+
+    Returns:
+        bool: Whether the pair satisfy overlapping rule
+    """
+    overlapLength = previousRead[1] - currentRead[0]
+    return (overlapLength >= (previousRead[1] - previousRead[0]) * ratio) and (overlapLength >= (currentRead[1] - currentRead[0]) * ratio)
+
+
+def sweepPlacementChain(positions, nextPositions, sequenceCosts, copiesCount, contextLength):
+    """Finds the cheapest chain of valid neighbors from the start to the end of the context, in one sweep over candidate positions sorted by start index
+
+        The chain starts at index 0 of the context and one of its positions ends at the end of the context; reads encompassed by that one may still follow it.
+
+        ========================================= context
+        ----------                                position p, cheapest chain to p
+               ------------                       valid neighbors of p
+                    ------------
+
+        Each position keeps the best chain reaching it from the start, as its previous position, once without and once with the end of the context reached; positions are final once the sweep passes them, since links only go forward. A read with a single candidate position has to be on the chain, so no link skips over such a position. The best chain has the lowest sum of the costs of its reads, then the fewest positions, then the previous read with more copies.
+
+    Args:
+        positions (:obj:`list` of `tuple(int, int, int)`): Start index, end index and read of each candidate, sorted
+        nextPositions (:obj:`list` of :obj:`list` of int): Indices of the valid neighbors after each position, sorted
+        sequenceCosts (:obj:`list` of int): Cost of a position of each read
+        copiesCount (:obj:`list` of int): Number of copies of each read, i.e. of positions it can take
+        contextLength (int): Length of the context
+
+    Returns:
+        :obj:`list` of int: Indices of the positions of the chain, sorted, or None if there is none
+    """
+    candidatesCount = [0] * len(copiesCount)
+    for position in positions:
+        candidatesCount[position[2]] += 1
+    # the first position after each one that no link can skip
+    nextRequired = [len(positions)] * (len(positions) + 1)
+    for p in range(len(positions) - 1, -1, -1):
+        nextRequired[p] = p if candidatesCount[positions[p][2]] == 1 else nextRequired[p + 1]
+    lastRequired = max([p for p in range(len(positions)) if candidatesCount[positions[p][2]] == 1] or [-1])
+
+    # (cost, chain length, copies of the previous read) of the best chain to each position, without and with the end reached
+    best = [[None, None] for position in positions]
+    previous = [[None, None] for position in positions]
+    for p in range(min(nextRequired[0] + 1, len(positions))):
+        if positions[p][0] == 0:
+            best[p][int(positions[p][1] == contextLength)] = (sequenceCosts[positions[p][2]], 1, 0)
+
+    for p in range(len(positions)):
+        for isEndReached in (0, 1):
+            if best[p][isEndReached] is None:
+                continue
+            (cost, chainLength, copies) = best[p][isEndReached]
+            for q in nextPositions[p]:
+                if q > nextRequired[p + 1]:
+                    break
+                isNextEndReached = int(isEndReached or positions[q][1] == contextLength)
+                candidate = (cost + sequenceCosts[positions[q][2]], chainLength + 1, -copiesCount[positions[p][2]])
+                if best[q][isNextEndReached] is None or candidate < best[q][isNextEndReached]:
+                    best[q][isNextEndReached] = candidate
+                    previous[q][isNextEndReached] = (p, isEndReached)
+
+    ends = [p for p in range(max(0, lastRequired), len(positions)) if best[p][1] is not None]
+    if not len(ends):
+        return None
+    chain = []
+    state = (min(ends, key=lambda p: best[p][1]), 1)
+    while state is not None:
+        chain.append(state[0])
+        state = previous[state[0]][state[1]]
+    chain.reverse()
+    return chain
+
+
+def repairPlacementChain(positions, nextPositions, chain, copiesCount, contextLength, maxWidth=3):
+    """Reroute a chain of valid neighbors around each position of a read on it more often than its copies, through reads with copies left
+
+        --------                         ---------     positions of the chain kept
+             ---------  --------  -------              positions replaced
+              -------------  -------------             new route between the kept ones
+
+        The positions between the chain positions at most "maxWidth" before and after the one to give away are replaced by a route of valid neighbors between those, of reads with copies left and again without skipping a read with a single candidate position (see "sweepPlacementChain()"). The route takes reads with fewer candidates first, as those are wanted at fewer other places, then the fewest positions. Near the start and the end of the context, the route starts at index 0 or reaches the end of the context instead. Each reroute takes fewer positions past the copies of their reads, so the repair ends.
+
+    Args:
+        positions (:obj:`list` of `tuple(int, int, int)`): Start index, end index and read of each candidate, sorted
+        nextPositions (:obj:`list` of :obj:`list` of int): Indices of the valid neighbors after each position, sorted
+        chain (:obj:`list` of int): Indices of the positions of the chain, sorted
+        copiesCount (:obj:`list` of int): Number of copies of each read, i.e. of positions it can take
+        contextLength (int): Length of the context
+        maxWidth (int, optional): Maximum number of positions replaced on each side of the one to give away
+
+    Returns:
+        :obj:`list` of int: Indices of the positions of the repaired chain, sorted, or None if a read is still on it more often than its copies
+    """
+    candidatesCount = [0] * len(copiesCount)
+    for position in positions:
+        candidatesCount[position[2]] += 1
+    chain = list(chain)
+    placedCount = [0] * len(copiesCount)
+    for p in chain:
+        placedCount[positions[p][2]] += 1
+
+    def getCost(p):
+        s = positions[p][2]
+        return candidatesCount[s] if candidatesCount[s] > copiesCount[s] else 0
+
+    def findRoute(firstIndex, lastIndex):
+        # the positions of the chain strictly between firstIndex and lastIndex are replaced, -1 and len(chain) being the ends of the context
+        lowIndex = chain[firstIndex] if firstIndex >= 0 else -1
+        highIndex = chain[lastIndex] if lastIndex < len(chain) else len(positions)
+        isEndReached = any(positions[p][1] == contextLength for p in chain[:(firstIndex + 1)] + chain[lastIndex:])
+        requiredPositions = [p for p in range(lowIndex + 1, highIndex) if candidatesCount[positions[p][2]] == 1]
+        nextRequired = requiredPositions[0] if len(requiredPositions) else highIndex
+        lastRequired = requiredPositions[-1] if len(requiredPositions) else lowIndex
+
+        # (cost, chain length, previous state) of the best route to each position, without and with the end reached
+        best = {}
+        if lowIndex >= 0:
+            best[(lowIndex, int(isEndReached))] = (0, 0, None)
+        else:
+            for q in range(min(nextRequired + 1, highIndex)):
+                if positions[q][0] == 0 and placedCount[positions[q][2]] < copiesCount[positions[q][2]]:
+                    best[(q, int(isEndReached or positions[q][1] == contextLength))] = (getCost(q), 1, None)
+        ends = []
+        for p in range(max(lowIndex, 0), highIndex):
+            if candidatesCount[positions[p][2]] == 1 and p > lowIndex:
+                k = bisect.bisect(requiredPositions, p)
+                nextRequired = requiredPositions[k] if k < len(requiredPositions) else highIndex
+            for isEnd in (0, 1):
+                if (p, isEnd) not in best:
+                    continue
+                (cost, chainLength) = best[(p, isEnd)][:2]
+                if highIndex == len(positions) and isEnd and p >= lastRequired:
+                    ends.append((cost, chainLength, p, isEnd))
+                for q in nextPositions[p]:
+                    if q == highIndex and p >= lastRequired and (isEnd or positions[q][1] == contextLength):
+                        ends.append((cost, chainLength, p, isEnd))
+                    if q >= highIndex or q > nextRequired:
+                        break
+                    if placedCount[positions[q][2]] >= copiesCount[positions[q][2]]:
+                        continue
+                    state = (q, int(isEnd or positions[q][1] == contextLength))
+                    candidate = (cost + getCost(q), chainLength + 1, (p, isEnd))
+                    if state not in best or candidate[:2] < best[state][:2]:
+                        best[state] = candidate
+        if not len(ends):
+            return None
+        state = tuple(min(ends)[2:])
+        route = []
+        while state is not None and state[0] != lowIndex:
+            route.append(state[0])
+            state = best[state][2]
+        route.reverse()
+        return route
+
+    i = 0
+    while i < len(chain):
+        s = positions[chain[i]][2]
+        if placedCount[s] <= copiesCount[s]:
+            i += 1
+            continue
+        for width in range(1, maxWidth + 1):
+            (firstIndex, lastIndex) = (max(i - width, -1), min(i + width, len(chain)))
+            for p in chain[(firstIndex + 1):lastIndex]:
+                placedCount[positions[p][2]] -= 1
+            route = findRoute(firstIndex, lastIndex)
+            routeCount = {}
+            for p in route or []:
+                routeCount[positions[p][2]] = routeCount.get(positions[p][2], 0) + 1
+            if route is not None and all(placedCount[t] + routeCount[t] <= copiesCount[t] for t in routeCount):
+                chain[(firstIndex + 1):lastIndex] = route
+                for p in route:
+                    placedCount[positions[p][2]] += 1
+                i = firstIndex + 1
+                break
+            for p in chain[(firstIndex + 1):lastIndex]:
+                placedCount[positions[p][2]] += 1
+        else:
+            i += 1
+    if any(placedCount[s] > copiesCount[s] for s in range(len(copiesCount))):
+        return None
+    return chain
+
+
+def insertPlacements(positions, chain, ratio=0.5):
+    """Insert a position of each read missing from a chain of valid neighbors, between two neighbors both valid with it
+
+        -------------                 neighbor on the left
+              ------------            inserted read
+                  -------------       neighbor on the right
+
+        With reads of one length, any position between two valid neighbors is valid with both, so each missing read is inserted at its first candidate.
+
+    Args:
+        positions (:obj:`list` of `tuple(int, int, int)`): Start index, end index and read of each candidate, sorted
+        chain (:obj:`list` of int): Indices of the positions of the chain, sorted
+        ratio (float, optional): Minimum overlap ratio between neighbors
+
+    Returns:
+        :obj:`list` of int: Indices of the positions of the chain with the reads inserted, sorted; reads that fit nowhere are left out
+    """
+    chain = list(chain)
+    readPositions = {}
+    for (p, position) in enumerate(positions):
+        readPositions.setdefault(position[2], []).append(p)
+    placedSequences = set(positions[p][2] for p in chain)
+    for (s, candidates) in sorted(readPositions.items()):
+        if s in placedSequences:
+            continue
+        for p in candidates:
+            i = bisect.bisect(chain, p)
+            isLeftValid = isNeighborValid(positions[chain[i - 1]], positions[p], ratio) if i else positions[p][0] == 0
+            # the chain already reaches the end of the context
+            isRightValid = isNeighborValid(positions[p], positions[chain[i]], ratio) if i < len(chain) else True
+            if isLeftValid and isRightValid:
+                chain.insert(i, p)
+                break
+    return chain
+
+
+def placeReads(fullAssembly, readsList, labelsList=None, ratio=0.5, readsCandidates=None, maxSweeps=16):
+    """Choose one position for each target (read) in the context (fullAssembly), in a few sweeps over candidate positions instead of all combinations
+
+        Copies of a read share their positions, and a copy can always be stacked onto another at the same position, so each distinct read needs at least one and at most as many positions as its copies. The cheapest chain of valid neighbors from the start to the end of the context is found first (see "sweepPlacementChain()"), where a read with more candidates than copies costs more. A read in repeats may still be on the chain more often than its copies; the chain is then rerouted around it (see "repairPlacementChain()"), or else swept again with such reads costlier, at most "maxSweeps" times. Then the missing reads are inserted in the chain (see "insertPlacements()"). With reads of one length, any read can be inserted; a read that fits nowhere (e.g. with reads of different lengths) is made cheaper for the next sweep, so it is taken on the chain.
+
+        This costs a few linear sweeps rather than a search, so on a context made almost only of copies of one repeat, with few reads, a valid placement may be missed.
+
+    Args:
+        fullAssembly (string): String of context
+        readsList (:obj:`list` of string): List of string targets
+        labelsList (:obj:`list` of string, optional): List of label of string target (for logging)
+        ratio (float, optional): Minimum overlap ratio between neighbors
+        readsCandidates (:obj:`list` of :obj:`list` of `tuple(int, int)`, optional): Indices of each target, as from "findReadsPositions()"
+        maxSweeps (int, optional): Maximum number of sweeps over candidate positions
+
+    Returns:
+        readsIndices (:obj:`list` of `tuple(int, int)`): List of start and end indices tuples sorted by start index, or None if no placement covers the context with all neighbors satisfying the minimum overlapping rule
+    """
+    if readsCandidates is None:
+        readsCandidates = findReadsPositions(fullAssembly, readsList, labelsList)
+    if not len(readsList):
+        return None
+
+    # distinct reads, the same candidates for all copies
+    sequenceIndices = {}
+    readSequences = []
+    copiesCount = []
+    for (i, read) in enumerate(readsList):
+        if read not in sequenceIndices:
+            sequenceIndices[read] = len(copiesCount)
+            copiesCount.append(0)
+            readSequences.append(i)
+        copiesCount[sequenceIndices[read]] += 1
+
+    positions = sorted(
+        (startIndex, endIndex, s)
+        for (s, i) in enumerate(readSequences)
+        for (startIndex, endIndex) in readsCandidates[i]
+    )
+    contextLength = len(fullAssembly)
+    nextPositions = [None] * len(positions)
+    for (p, (startIndex, endIndex, s)) in enumerate(positions):
+        nextPositions[p] = []
+        q = p + 1
+        # sorted by start, so no position after the window is a neighbor
+        while q < len(positions) and endIndex - positions[q][0] >= (endIndex - startIndex) * ratio:
+            if isNeighborValid(positions[p], positions[q], ratio):
+                nextPositions[p].append(q)
+            q += 1
+
+    # reads with more candidates than copies may run out of them, costlier each sweep they do
+    candidatesCount = [0] * len(copiesCount)
+    for position in positions:
+        candidatesCount[position[2]] += 1
+    sequenceCosts = [int(candidatesCount[s] > copiesCount[s]) for s in range(len(copiesCount))]
+    for sweepIndex in range(maxSweeps):
+        chain = sweepPlacementChain(positions, nextPositions, sequenceCosts, copiesCount, contextLength)
+        if chain is None:
+            return None
+        repairedChain = repairPlacementChain(positions, nextPositions, chain, copiesCount, contextLength)
+        if repairedChain is None:
+            placedCount = [0] * len(copiesCount)
+            for p in chain:
+                placedCount[positions[p][2]] += 1
+            for s in range(len(copiesCount)):
+                sequenceCosts[s] += max(0, placedCount[s] - copiesCount[s])
+            continue
+        chain = insertPlacements(positions, repairedChain, ratio)
+        placedSequences = set(positions[p][2] for p in chain)
+        if len(placedSequences) == len(copiesCount):
+            break
+        # reads that fit nowhere on the chain are taken on it by the next sweep
+        for s in range(len(copiesCount)):
+            if s not in placedSequences:
+                sequenceCosts[s] -= 1
+    else:
+        return None
+
+    # extra copies are stacked onto the first position of their read
+    sequencePositions = [[] for s in copiesCount]
+    for p in chain:
+        sequencePositions[positions[p][2]].append(positions[p][:2])
+    readsIndices = []
+    for (s, indexTuples) in enumerate(sequencePositions):
+        readsIndices.extend(indexTuples)
+        readsIndices.extend([indexTuples[0]] * (copiesCount[s] - len(indexTuples)))
+    return sorted(readsIndices)
+
+
+def validateAssembly(fullAssembly, readsList, labelsList=None, ratio=0.5):
+    """Check that each read is inside the context, neighboring reads satisfy the minimum overlapping rule, and the context is fully covered, on a single placement of reads
+
+        Reads are placed by "placeReads()", in a few sweeps over their candidate positions, without checking all combinations of positions.
+
+    Args:
+        fullAssembly (string): String of context
+        readsList (:obj:`list` of string): List of string targets
+        labelsList (:obj:`list` of string, optional): List of label of string target (for logging)
+        ratio (float, optional): Minimum overlap ratio between neighbors
+
+    Raises:
+        AssertionError: When a read is not found in the context, or overlapping length or coverage is not satisfied
+    """
+    readsCandidates = findReadsPositions(fullAssembly, readsList, labelsList)
+    if placeReads(fullAssembly, readsList, labelsList, ratio, readsCandidates) is not None:
+        return
+
+    startIndex = min(indexTuple[0] for indexTuples in readsCandidates for indexTuple in indexTuples)
+    endIndex = max(indexTuple[1] for indexTuples in readsCandidates for indexTuple in indexTuples)
+    if startIndex != 0 or endIndex != len(fullAssembly):
+        raise AssertionError('\033[41mERROR\033[0m: Reads (\033[94m%s-%s\033[0m) do not cover full-length context (\033[93m%s\033[0m).' % (startIndex, endIndex, len(fullAssembly)))
+    raise AssertionError('\033[41mERROR\033[0m: Overlapping length does not satisfy ratio (\033[93m%s\033[0m).' % ratio)
+
+
+def isValidAssembly(fullAssembly, readsList, labelsList=None, ratio=0.5):
+    """Checks an assembly by "validateAssembly()", without raising
+
+    Args:
+        fullAssembly (string): String of context
+        readsList (:obj:`list` of string): List of string targets
+        labelsList (:obj:`list` of string, optional): List of label of string target (for logging)
+        ratio (float, optional): Minimum overlap ratio between neighbors
+
+    Returns:
+        bool: Whether the assembly passes the test
+    """
+    try:
+        validateAssembly(fullAssembly, readsList, labelsList, ratio)
+    except AssertionError:
+        return False
+    return True
@@ -0,0 +1,67 @@
+import argparse
+import unittest
+
+from src import approx
+from src import model
+from src import pipeline
+from src import simulate
+
+
+class ApproximateMatcherTest(unittest.TestCase):
+
+    def testShortSequence(self):
+        matcher = approx.ApproximateMatcher(2)
+        self.assertTrue(matcher.isSequenceInside('AC', 'GGGT'))
+        self.assertFalse(matcher.isSequenceInside('ACG', 'GG'))
+        self.assertEqual(matcher.findOccurrences('AC', 'GGG'), [(0, 2), (1, 3)])
+
+    def testOccurrences(self):
+        self.assertEqual(approx.ApproximateMatcher(1).findOccurrences('ACGT', 'TACCTACGT'), [(1, 5), (5, 9)])
+        self.assertEqual(approx.ApproximateMatcher(1, True).findOccurrences('ACGGT', 'TACGTT'), [(1, 6)])
+
+    def testValidAssembly(self):
+        matcher = approx.ApproximateMatcher(1)
+        self.assertTrue(matcher.isValidAssembly('ABCAD', ['AD', 'BC', 'CA', 'AD', 'AB', 'AD']))
+        self.assertTrue(matcher.isValidAssembly('ACGTACCT', ['ACGTA', 'GTTCCT']))
+        self.assertFalse(matcher.isValidAssembly('ACGTACCT', ['ACGTA', 'GTTC']))
+
+    def testAlignToText(self):
+        self.assertEqual(approx.alignToText('CAG', 'ACGT', 10), (1, 11, 13, {23: 'C', 24: 'A', 25: 'G'}))
+        self.assertEqual(approx.alignToText('ACT', 'ACGT'), (1, 0, 4, {1: 'A', 3: 'C', 5: '', 7: 'T'}))
+
+    def testBuildConsensus(self):
+        alignments = [approx.alignToText(read, 'ACGTTA') for read in ['ACGT', 'ACCT', 'CGTTA', 'GTA']]
+        self.assertEqual(approx.buildConsensus('ACGTTA', alignments, 1), 'ACGTTA')
+        # the majority, then the read off by 2 takes one of its own
+        alignments = [approx.alignToText(read, 'ACGTTA') for read in ['ACGTTA', 'ACGTTA', 'GTTA', 'AGGTGA']]
+        self.assertEqual(approx.buildConsensus('ACGTTA', alignments, 1), 'AGGTTA')
+
+
+class ApproximateAssemblyTest(unittest.TestCase):
+
+    def assemble(self, reads, arguments):
+        parser = argparse.ArgumentParser()
+        pipeline.addAssemblyArguments(parser)
+        options = parser.parse_args(arguments)
+        (result, contigs, tier) = pipeline.assembleReads(reads, model.initiateReadData(reads), options)
+        self.assertIsNone(contigs)
+        pipeline.validateResult(result, reads, None, pipeline.getMatcher(options))
+        return result
+
+    def testSimulatedMismatches(self):
+        for seed in range(3):
+            (sequence, reads) = simulate.simulate(1000, 80, 8, seed=seed, errorRate=0.005)
+            maxErrors = max(2, max(approx.findMinimumDistance(read, sequence) for read in reads))
+            result = self.assemble(reads, ['--max-errors', str(maxErrors)])
+            self.assertLessEqual(approx.findMinimumDistance(sequence, result), maxErrors)
+
+    def testSimulatedEdits(self):
+        for seed in range(2):
+            (sequence, reads) = simulate.simulate(600, 80, 8, seed=seed, errorRate=0.005, indelRate=0.003)
+            maxErrors = max(2, max(approx.findMinimumDistance(read, sequence) for read in reads))
+            result = self.assemble(reads, ['--max-errors', str(maxErrors), '--edits'])
+            self.assertLessEqual(approx.findMinimumDistance(sequence, result), maxErrors)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,233 @@
+import argparse
+import os
+import random
+import tempfile
+import unittest
+
+from src import assembly
+from src import assembly_graph
+from src import model
+from src import pipeline
+from src import simulate
+from src import stats
+from src import test
+
+
+ENGINES = (assembly.assembleParts, assembly.assemblePartsIterative, assembly_graph.assembleGraph)
+
+
+def assembleBaseline(reads, maxCalls=2000):
+    """The search before the overlap graph, on sequences: parts equal to a merged one are dropped with it"""
+    calls = [0]
+
+    def isMatchLeft(left, right):
+        (sequence, leftRight) = left
+        (otherSequence, otherLeft) = right
+        overlapSequence = otherSequence[0:max(leftRight, otherLeft)]
+        matchStartIndex = sequence.rfind(overlapSequence)
+        if matchStartIndex != -1 and sequence[matchStartIndex:] == otherSequence[:(len(sequence) - matchStartIndex)]:
+            return matchStartIndex
+        return -1
+
+    def search(parts):
+        calls[0] += 1
+        if calls[0] > maxCalls:
+            return None
+        if len(parts) == 1:
+            return parts[0][0]
+        for isLeft in (True, False):
+            for part in parts:
+                for neighbor in parts:
+                    if neighbor[0] == part[0]:
+                        continue
+                    (left, right) = (part, neighbor) if isLeft else (neighbor, part)
+                    matchStartIndex = isMatchLeft((left[0], left[2]), (right[0], right[1]))
+                    if matchStartIndex == -1:
+                        continue
+                    mergedPart = (left[0][0:matchStartIndex] + right[0], left[1], right[2])
+                    result = search([otherPart for otherPart in parts if otherPart[0] not in (part[0], neighbor[0])] + [mergedPart])
+                    if result is not None:
+                        return result
+        return None
+
+    return search([(read, len(read) // 2, len(read) // 2) for read in reads])
+
+
+class AssembleAgainstBaselineTest(unittest.TestCase):
+
+    def assertAssembled(self, reads):
+        for engine in ENGINES:
+            result = engine(model.initiateReadData(reads))
+            self.assertIsNotNone(result, '%s on %s' % (engine.__name__, reads))
+            self.assertTrue(test.isValidAssembly(result, reads), '%s on %s' % (engine.__name__, reads))
+
+    def testCopiesStacked(self):
+        # the copies of CCA have no separate place, the baseline drops one of them
+        reads = ['CCA', 'TCCCAACTT', 'CCA', 'GTCCCAACTT', 'CAA', 'GCGGT', 'GCGGTCC', 'GTCCCAA']
+        self.assertEqual(assembleBaseline(reads), 'GCGGTCCCAACTT')
+        self.assertAssembled(reads)
+
+    def testRandomReads(self):
+        rng = random.Random(0)
+        for trial in range(150):
+            genome = ''.join(rng.choice('AC' if trial % 2 else 'ACGT') for _ in range(rng.randint(10, 30)))
+            reads = [genome[:rng.randint(3, 10)], genome[-rng.randint(3, 10):]]
+            for _ in range(6):
+                length = rng.randint(3, 10)
+                startIndex = rng.randint(0, max(0, len(genome) - length))
+                reads.append(genome[startIndex:(startIndex + length)])
+            result = assembleBaseline(reads)
+            if result is not None and test.isValidAssembly(result, reads):
+                self.assertAssembled(reads)
+
+    def testIterativeSameAsRecursive(self):
+        readsLists = [['CCCC', 'AACCA', 'CCCCA', 'CCCAAACCA', 'CCAA', 'CCCC', 'CCCAAAC', 'ACCCCCC']]
+        rng = random.Random(1)
+        for trial in range(100):
+            genome = ''.join(rng.choice('AC') for _ in range(rng.randint(10, 30)))
+            readsLists.append([genome[:rng.randint(3, 10)], genome[-rng.randint(3, 10):]] + [
+                genome[startIndex:(startIndex + rng.randint(3, 10))]
+                for startIndex in (rng.randint(0, len(genome) - 3) for _ in range(10))
+            ])
+        # the same merges in the same order, so even stopped at the same state
+        for reads in readsLists:
+            self.assertEqual(
+                assembly.assemblePartsIterative(model.initiateReadData(reads), None, assembly.BudgetedStateCache(None, 1000)),
+                assembly.assembleParts(model.initiateReadData(reads), None, assembly.BudgetedStateCache(None, 1000)),
+                reads
+            )
+
+    def testEndSpanned(self):
+        # parts ending with reads that are not overlapping each other, but covered by the overlap of the parts
+        readsList = model.initiateReadData(['AACCGG', 'CCGGTT', 'GGTTAA', 'TTAACC'])
+        overlapGraph = model.OverlapGraph(readsList)
+        part = readsList[0].extendLeft(readsList[1], 2)
+        other = readsList[1].extendLeft(readsList[2], 2)
+        self.assertEqual(overlapGraph.matchLeft(part, other), part.isMatchLeft(other))
+
+    def testGraphPaths(self):
+        # without repeats, a single walk and no fork
+        (genome, reads) = simulate.simulate(400, 30, 6, seed=3)
+        readsList = model.initiateReadData(reads)
+        stringGraph = assembly_graph.StringGraph(readsList, model.OverlapGraph(readsList))
+        stringGraph.reduceTransitiveEdges()
+        failedStates = assembly.FailedStateCache()
+        paths = list(stringGraph.iterPaths(failedStates))
+        self.assertEqual([stringGraph.layoutPath(path).sequence for path in paths], [genome])
+        self.assertEqual(len(failedStates), 0)
+
+        (genome, reads) = simulate.simulate(300, 30, 6, repeatFraction=0.3, repeatLength=20, seed=0)
+        readsList = model.initiateReadData(reads)
+        stringGraph = assembly_graph.StringGraph(readsList, model.OverlapGraph(readsList))
+        stringGraph.reduceTransitiveEdges()
+        self.assertIn(genome, [stringGraph.layoutPath(path).sequence for path in stringGraph.iterPaths(assembly.FailedStateCache())])
+
+    def testMaxDepth(self):
+        (genome, reads) = simulate.simulate(300, 30, 6, repeatFraction=0.3, repeatLength=20, seed=1)
+        depths = []
+        for engine in (assembly.assembleParts, assembly.assemblePartsIterative):
+            failedStates = assembly.FailedStateCache()
+            self.assertEqual(engine(model.initiateReadData(reads), None, failedStates), genome)
+            depths.append(failedStates.maxDepth)
+        # a chain of all reads
+        self.assertEqual(depths, [len(reads) - 1] * 2)
+
+    def testInstrumentedRestored(self):
+        (isMatchLeft, placeReads) = (model.PartData.isMatchLeft, test.placeReads)
+        runStats = stats.Stats()
+        with self.assertRaises(ValueError):
+            with runStats.instrumented():
+                self.assertIsNot(test.placeReads, placeReads)
+                raise ValueError()
+        self.assertIs(model.PartData.isMatchLeft, isMatchLeft)
+        self.assertIs(test.placeReads, placeReads)
+
+
+class AssembleChainTest(unittest.TestCase):
+
+    def testSimulatedReads(self):
+        for seed in range(10):
+            (genome, reads) = simulate.simulate(500, 40, 6, duplicateRate=0.1, seed=seed)
+            readsList = model.initiateReadData(reads)
+            self.assertEqual(assembly.assembleChain(readsList, model.OverlapGraph(readsList), assembly.FailedStateCache()), genome)
+
+    def testRepeatsOfTwoLetters(self):
+        rng = random.Random(2)
+        for trial in range(10):
+            genome = ''.join(rng.choice('AB') for _ in range(rng.randint(40, 80)))
+            reads = [genome[startIndex:(startIndex + 12)] for startIndex in range(0, len(genome) - 12, 3)] + [genome[-12:]]
+            readsList = model.initiateReadData(reads)
+            result = assembly.assembleChain(readsList, model.OverlapGraph(readsList), assembly.FailedStateCache())
+            self.assertIsNotNone(result, reads)
+            self.assertTrue(test.isValidAssembly(result, reads), reads)
+
+    def testDeadEnds(self):
+        # two separate pieces, both without a left and without a right neighbor
+        reads = ['AACCGG', 'CCGGTT', 'GGTTAA', 'CATGCA', 'TGCACT']
+        readsList = model.initiateReadData(reads)
+        overlapGraph = model.OverlapGraph(readsList)
+        self.assertEqual(assembly.countDeadEnds(readsList, overlapGraph), (2, 2))
+        self.assertEqual(assembly.countDeadEnds(readsList[:3], overlapGraph), (1, 1))
+        self.assertIsNone(assembly.assembleChain(readsList, overlapGraph, assembly.FailedStateCache()))
+        for engine in ENGINES:
+            self.assertIsNone(engine(model.initiateReadData(reads)))
+
+
+class ReadGroupsTest(unittest.TestCase):
+
+    def getReadGroups(self, reads):
+        readsList = model.initiateReadData(reads)
+        return model.ReadGroups(readsList, model.OverlapGraph(readsList))
+
+    def testMultiplicity(self):
+        readGroups = self.getReadGroups(['ABA', 'BAB', 'ABA', 'BAB', 'ABC'])
+        self.assertEqual(readGroups.representatives, [0, 1, 4])
+        self.assertEqual(readGroups.representativeOf, [0, 1, 0, 1, 4])
+        self.assertEqual([readGroups.multiplicity[i] for i in readGroups.representatives], [2, 2, 1])
+        self.assertEqual(readGroups.countLeftOut(), 0)
+        # copies overlapping each other become a self edge, as in ABABA
+        self.assertEqual(readGroups.rightNeighbors[0], set([0, 1, 4]))
+        self.assertEqual(readGroups.leftNeighbors[0], set([0, 1]))
+
+    def testEncompassed(self):
+        readGroups = self.getReadGroups(['ABCD', 'BC', 'BC', 'CDE'])
+        self.assertEqual(readGroups.representatives, [0, 3])
+        self.assertEqual(readGroups.containedIn, [None, 0, 0, None])
+        self.assertEqual(readGroups.countLeftOut(), 2)
+        self.assertEqual(readGroups.multiplicity[1], 0)
+
+    def testSimulatedCopies(self):
+        for seed in range(5):
+            (genome, reads) = simulate.simulate(300, 30, 8, repeatFraction=0.5, repeatLength=20, duplicateRate=0.3, seed=seed)
+            readGroups = self.getReadGroups(reads)
+            self.assertEqual(sum(readGroups.multiplicity) + readGroups.countLeftOut(), len(reads))
+            for (i, read) in enumerate(reads):
+                self.assertEqual(reads[readGroups.representativeOf[i]], read)
+            for i in readGroups.representatives:
+                self.assertEqual(readGroups.multiplicity[i], reads.count(reads[i]))
+
+    def testChainOfCopies(self):
+        # copies are placed as one group, not tried one by one
+        for seed in range(5):
+            (genome, reads) = simulate.simulate(300, 30, 8, duplicateRate=0.5, seed=seed)
+            readsList = model.initiateReadData(reads)
+            failedStates = assembly.FailedStateCache()
+            self.assertEqual(assembly.assembleChain(readsList, model.OverlapGraph(readsList), failedStates), genome)
+            self.assertEqual(len(failedStates), 0)
+
+
+class AssembleFileTest(unittest.TestCase):
+
+    def testNoReads(self):
+        parser = argparse.ArgumentParser()
+        pipeline.addAssemblyArguments(parser)
+        with tempfile.TemporaryDirectory() as directory:
+            inputFile = os.path.join(directory, 'empty.fasta')
+            open(inputFile, 'w').close()
+            with self.assertRaisesRegex(ValueError, 'Missing'):
+                pipeline.assembleFile(inputFile, parser.parse_args([]))
+            self.assertEqual(os.listdir(directory), ['empty.fasta'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from src import cache
+from src import model
+from src import simulate
+
+
+class AssemblyCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.fileName = os.path.join(self.directory, 'cache.sqlite')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def getTotalSize(self, assemblyCache):
+        totalSize = assemblyCache.connection.execute("SELECT value FROM metadata WHERE key = 'totalSize'").fetchone()[0]
+        self.assertEqual(totalSize, assemblyCache.connection.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0])
+        return totalSize
+
+    def testAssembly(self):
+        reads = ['ACGTAC', 'TACGGA']
+        assemblyCache = cache.AssemblyCache(self.fileName)
+        self.assertEqual(assemblyCache.getAssembly(reads, 'recursive'), (None, None))
+        assemblyCache.putAssembly(reads, 'recursive', 'ACGTACGGA', 'recursive')
+        self.assertEqual(assemblyCache.getAssembly(reads, 'recursive'), ('ACGTACGGA', 'recursive'))
+        # the settings and the order of reads are part of the key
+        self.assertEqual(assemblyCache.getAssembly(reads, 'graph'), (None, None))
+        self.assertEqual(assemblyCache.getAssembly(reads[::-1], 'recursive'), (None, None))
+        self.assertEqual((assemblyCache.hits, assemblyCache.misses), (1, 3))
+        assemblyCache.close()
+
+        assemblyCache = cache.AssemblyCache(self.fileName)
+        self.assertEqual(assemblyCache.getAssembly(reads, 'recursive'), ('ACGTACGGA', 'recursive'))
+        assemblyCache.close()
+
+    def testEviction(self):
+        assemblyCache = cache.AssemblyCache(self.fileName, maxSize=400)
+        values = dict(('key%s' % i, 'x' * 80) for i in range(4))
+        for (key, value) in sorted(values.items()):
+            with assemblyCache.transaction():
+                assemblyCache.putEntries({key: value})
+            time.sleep(0.01)
+        self.assertEqual(self.getTotalSize(assemblyCache), 4 * (4 + 82))
+
+        # key0 used again, so key1 is the least recently used
+        with assemblyCache.transaction():
+            self.assertEqual(assemblyCache.getEntries(['key0']), {'key0': values['key0']})
+        time.sleep(0.01)
+        with assemblyCache.transaction():
+            assemblyCache.putEntries({'key4': 'x' * 80})
+        with assemblyCache.transaction():
+            self.assertEqual(sorted(assemblyCache.getEntries(sorted(values) + ['key4'])), ['key0', 'key2', 'key3', 'key4'])
+        self.assertEqual(self.getTotalSize(assemblyCache), 4 * (4 + 82))
+
+        # a replaced entry counts once
+        with assemblyCache.transaction():
+            assemblyCache.putEntries({'key4': 'x' * 20})
+        self.assertEqual(self.getTotalSize(assemblyCache), 3 * (4 + 82) + (4 + 22))
+        assemblyCache.close()
+
+    def getOtherPairs(self, knownPairs):
+        # copies of a read share their results, also with themselves
+        return dict(((i, j), result) for ((i, j), result) in knownPairs.items() if i != j)
+
+    def testPairs(self):
+        (genome, reads) = simulate.simulate(300, 30, 6, repeatFraction=0.3, repeatLength=15, duplicateRate=0.1, seed=0)
+        readsList = model.initiateReadData(reads)
+        overlapGraph = model.OverlapGraph(readsList)
+
+        assemblyCache = cache.AssemblyCache(self.fileName)
+        cachedGraph = model.OverlapGraph(readsList, knownPairs=assemblyCache.getPairs(reads))
+        assemblyCache.putPairs(reads, cachedGraph.pairs)
+        self.assertEqual(self.getOtherPairs(assemblyCache.getPairs(reads)), cachedGraph.pairs)
+
+        # reads in another order, with a new read, only compare the new pairs
+        newReads = reads[::-1] + ['ACGT' * 8]
+        newReadsList = model.initiateReadData(newReads)
+        knownPairs = assemblyCache.getPairs(newReads)
+        self.assertEqual(len(self.getOtherPairs(knownPairs)), len(reads) * (len(reads) - 1))
+        cachedGraph = model.OverlapGraph(newReadsList, knownPairs=knownPairs)
+        self.assertEqual(cachedGraph.overlaps, model.OverlapGraph(newReadsList).overlaps)
+        self.assertEqual(cachedGraph.isContained, model.OverlapGraph(newReadsList).isContained)
+        self.assertEqual(model.OverlapGraph(readsList, knownPairs=assemblyCache.getPairs(reads)).overlaps, overlapGraph.overlaps)
+        assemblyCache.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
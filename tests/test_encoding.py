@@ -0,0 +1,42 @@
+import unittest
+
+from src import encoding
+from src import model
+from src import simulate
+
+
+@unittest.skipIf(encoding.numpy is None, 'NumPy is not installed')
+class EncodedReadStoreTest(unittest.TestCase):
+
+    def testGetRead(self):
+        reads = ['ACGT', 'T', 'GGCATTACA', 'CCCCCCC']
+        readStore = encoding.EncodedReadStore(reads)
+        self.assertEqual([readStore.getRead(i) for i in range(len(reads))], reads)
+        with self.assertRaises(ValueError):
+            encoding.EncodedReadStore(['ACGN'])
+
+    def testSameAsFindOverlap(self):
+        (genome, reads) = simulate.simulate(300, 30, 8, repeatFraction=0.5, repeatLength=12, seed=0)
+        reads += [genome[:9], genome[100:113], genome[-11:]]
+        readStore = encoding.EncodedReadStore(reads)
+        for (i, read) in enumerate(reads):
+            for minOverlapLength in (1, 5, 15):
+                candidates = [j for j in range(len(reads)) if j != i]
+                # located as by the overlap graph, -1 if not found
+                matchStartIndices = [read.rfind(reads[j][0:minOverlapLength]) for j in candidates]
+                isVerified = readStore.verifyOverlaps(i, candidates, matchStartIndices)
+                for (k, j) in enumerate(candidates):
+                    isOverlap = matchStartIndices[k] != -1 and model.findOverlap(read, reads[j], minOverlapLength) == matchStartIndices[k]
+                    self.assertEqual(bool(isVerified[k]), isOverlap, (read, reads[j], minOverlapLength))
+
+    def testSameOverlapGraph(self):
+        (genome, reads) = simulate.simulate(300, 30, 8, repeatFraction=0.5, repeatLength=12, duplicateRate=0.1, seed=1)
+        readsList = model.initiateReadData(reads)
+        overlapGraph = model.OverlapGraph(readsList)
+        encodedGraph = model.OverlapGraph(readsList, readStore=encoding.EncodedReadStore(reads))
+        self.assertEqual(encodedGraph.overlaps, overlapGraph.overlaps)
+        self.assertEqual(encodedGraph.isContained, overlapGraph.isContained)
+
+
+if __name__ == '__main__':
+    unittest.main()
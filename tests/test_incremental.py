@@ -0,0 +1,62 @@
+import random
+import unittest
+
+from src import assembly
+from src import incremental
+from src import model
+from src import parallel
+from src import simulate
+from src import test
+
+
+class IncrementalAssemblerTest(unittest.TestCase):
+
+    def testSameAsAllAtOnce(self):
+        for seed in range(5):
+            (genome, reads) = simulate.simulate(400, 40, 8, duplicateRate=0.1, seed=seed)
+            random.Random(seed).shuffle(reads)
+            assembler = incremental.IncrementalAssembler()
+            for startIndex in range(0, len(reads), 20):
+                assembler.addReads(reads[startIndex:(startIndex + 20)])
+            self.assertEqual(len(assembler), len(reads))
+
+            # a unique reconstruction, the same by every search
+            readsList = model.initiateReadData(reads)
+            result = assembly.assembleParts(readsList)
+            self.assertEqual(result, genome)
+            self.assertEqual(parallel.assembleParallel(readsList, model.OverlapGraph(readsList), workers=2), [result])
+            self.assertEqual(assembler.result(), [result])
+
+    def testRepeats(self):
+        for seed in range(5):
+            (genome, reads) = simulate.simulate(300, 40, 8, repeatFraction=0.3, repeatLength=20, seed=seed)
+            assembler = incremental.IncrementalAssembler(maxNodes=2000)
+            for startIndex in range(0, len(reads), 20):
+                assembler.addReads(reads[startIndex:(startIndex + 20)])
+            [result] = assembler.result()
+            self.assertTrue(test.isValidAssembly(result, reads))
+
+    def testSameOverlapGraph(self):
+        (genome, reads) = simulate.simulate(300, 30, 6, repeatFraction=0.5, repeatLength=15, duplicateRate=0.2, seed=0)
+        reads += [genome[:10], genome[100:110], genome[-12:]]
+        # only the overlaps are compared, not the contigs
+        assembler = incremental.IncrementalAssembler(k=8, maxNodes=100)
+        for startIndex in range(0, len(reads), 7):
+            assembler.addReads(reads[startIndex:(startIndex + 7)])
+        overlapGraph = model.OverlapGraph(model.initiateReadData(reads))
+        self.assertEqual(assembler.overlapGraph.overlaps, overlapGraph.overlaps)
+        self.assertEqual(assembler.overlapGraph.isContained, overlapGraph.isContained)
+
+    def testComponents(self):
+        (genome, reads) = simulate.simulate(300, 40, 6, seed=0)
+        (otherGenome, otherReads) = simulate.simulate(300, 40, 6, seed=1)
+        assembler = incremental.IncrementalAssembler()
+        self.assertEqual(assembler.addReads(reads + otherReads), 2)
+        self.assertEqual(sorted(assembler.result()), sorted([genome, otherGenome]))
+        # only the component touched by the batch
+        self.assertEqual(assembler.addReads([genome[100:140], genome[200:240]]), 1)
+        self.assertEqual(sorted(assembler.result()), sorted([genome, otherGenome]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+import random
+import unittest
+
+from src import index
+from src import model
+from src import simulate
+
+
+def simulateMixedReads(seed):
+    """Reads of different lengths, with repeats and copies, some too short for seeds"""
+    rng = random.Random(seed)
+    (genome, reads) = simulate.simulate(400, 40, 8, repeatFraction=0.5, repeatLength=20, duplicateRate=0.1, seed=seed)
+    for _ in range(10):
+        length = rng.randint(5, 60)
+        startIndex = rng.randint(0, len(genome) - length)
+        reads.append(genome[startIndex:(startIndex + length)])
+    return reads
+
+
+class SeedIndexTest(unittest.TestCase):
+
+    def testCandidatesOfOverlaps(self):
+        for seed in range(5):
+            readsList = model.initiateReadData(simulateMixedReads(seed))
+            seedIndex = index.SeedIndex([read.sequence for read in readsList], k=12)
+            for (i, read) in enumerate(readsList):
+                (rightCandidates, leftCandidates) = (seedIndex.findRightCandidates(i), seedIndex.findLeftCandidates(i))
+                for (j, otherRead) in enumerate(readsList):
+                    if i == j:
+                        continue
+                    if read.isMatchLeft(otherRead) != -1:
+                        self.assertIn(j, rightCandidates)
+                    if otherRead.isMatchLeft(read) != -1:
+                        self.assertIn(j, leftCandidates)
+                    if otherRead.isMatchInside(read):
+                        self.assertIn(j, rightCandidates)
+
+    def testSameOverlapGraph(self):
+        readsList = model.initiateReadData(simulateMixedReads(0))
+        overlapGraph = model.OverlapGraph(readsList)
+        seededGraph = model.OverlapGraph(readsList, index.SeedIndex([read.sequence for read in readsList], k=12))
+        self.assertEqual(seededGraph.overlaps, overlapGraph.overlaps)
+        self.assertEqual(seededGraph.isContained, overlapGraph.isContained)
+
+    def testShortReads(self):
+        seedIndex = index.SeedIndex(['ACGTACGTAC', 'GGGG', 'TTTTACGTAC'], k=4)
+        self.assertEqual(seedIndex.shortReads, [1])
+        self.assertEqual(seedIndex.findRightCandidates(0), set([1]))
+        self.assertEqual(seedIndex.findRightCandidates(1), set())
+        # a short read can end a read with an overlap shorter than the seeds
+        self.assertEqual(seedIndex.findLeftCandidates(1), set([0, 2]))
+
+
+class CanonicalSeedIndexTest(unittest.TestCase):
+
+    def testCandidatesOnBothStrands(self):
+        for seed in range(3):
+            reads = simulateMixedReads(seed)
+            reads = [index.reverseComplement(read) if i % 3 == 0 else read for (i, read) in enumerate(reads)]
+            readsList = model.initiateReadData(reads)
+            reverseReadsList = model.initiateReadData([index.reverseComplement(read) for read in reads])
+            seedIndex = index.CanonicalSeedIndex(reads, k=12)
+            for (i, read) in enumerate(readsList):
+                candidates = seedIndex.findCandidates(i)
+                for j in range(len(reads)):
+                    if i == j:
+                        continue
+                    for (isSameStrand, otherRead) in ((True, readsList[j]), (False, reverseReadsList[j])):
+                        # reads encompassing read i find it from their side
+                        if read.isMatchLeft(otherRead) != -1 or otherRead.isMatchLeft(read) != -1 or otherRead.isMatchInside(read):
+                            self.assertIn(isSameStrand, candidates.get(j, ()), (i, j))
+
+
+def findAll(sequence, pattern):
+    positions = []
+    position = sequence.find(pattern)
+    while position != -1:
+        positions.append(position)
+        position = sequence.find(pattern, position + 1)
+    return positions
+
+
+class SuffixArrayTest(unittest.TestCase):
+
+    def testSortedSuffixes(self):
+        rng = random.Random(0)
+        for trial in range(50):
+            sequence = ''.join(rng.choice('AC' if trial % 2 else 'ACGT') for _ in range(rng.randint(1, 200)))
+            for seedLength in (1, 3, 16):
+                self.assertEqual(
+                    index.buildSuffixArray(sequence, seedLength),
+                    sorted(range(len(sequence)), key=lambda i: sequence[i:])
+                )
+
+    def testSameAsFind(self):
+        rng = random.Random(1)
+        for trial in range(50):
+            sequence = ''.join(rng.choice('AC' if trial % 2 else 'ACGT') for _ in range(rng.randint(1, 300)))
+            suffixArray = index.SuffixArray(sequence)
+            patternsList = []
+            for _ in range(20):
+                length = rng.randint(1, 12)
+                startIndex = rng.randint(0, len(sequence))
+                patternsList.append(sequence[startIndex:(startIndex + length)] or 'A')
+                patternsList.append(''.join(rng.choice('ACGT') for _ in range(length)))
+            for pattern in patternsList:
+                self.assertEqual(suffixArray.findPositions(pattern), findAll(sequence, pattern), pattern)
+            self.assertEqual(suffixArray.findPositionsBatch(patternsList), [findAll(sequence, pattern) for pattern in patternsList])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+
+from src import assembly
+from src import index
+from src import model
+from src import parallel
+from src import simulate
+from src import test
+
+
+class AssembleParallelTest(unittest.TestCase):
+
+    def testSameAsSerial(self):
+        for seed in range(3):
+            (genome, reads) = simulate.simulate(400, 40, 6, duplicateRate=0.1, seed=seed)
+            readsList = model.initiateReadData(reads)
+            overlapGraph = model.OverlapGraph(readsList)
+            result = assembly.assembleParts(model.initiateReadData(reads), model.OverlapGraph(readsList))
+            self.assertEqual(result, genome)
+            self.assertEqual(parallel.assembleParallel(readsList, overlapGraph, workers=2), [result])
+
+    def testRepeats(self):
+        # the first solution of any branch, not always the serial one
+        for seed in range(3):
+            (genome, reads) = simulate.simulate(200, 30, 6, repeatFraction=0.5, repeatLength=20, seed=seed)
+            readsList = model.initiateReadData(reads)
+            [result] = parallel.assembleParallel(readsList, model.OverlapGraph(readsList), workers=2)
+            self.assertTrue(test.isValidAssembly(result, reads))
+
+    def testComponents(self):
+        reads = []
+        genomes = []
+        for seed in range(3):
+            (genome, componentReads) = simulate.simulate(300, 40, 6, seed=seed)
+            genomes.append(genome)
+            reads += componentReads
+        readsList = model.initiateReadData(reads)
+        overlapGraph = model.OverlapGraph(readsList, index.SeedIndex(reads))
+        components = overlapGraph.findComponents(readsList)
+        self.assertEqual(len(components), 3)
+
+        for engine in (assembly.assembleParts, assembly.assemblePartsIterative):
+            results = parallel.assembleParallel(readsList, overlapGraph, engine, workers=2)
+            serialResults = []
+            for component in components:
+                componentReads = [reads[i] for i in component]
+                serialResults.append(engine(model.initiateReadData(componentReads)))
+            self.assertEqual(results, serialResults)
+            self.assertEqual(sorted(results), sorted(genomes))
+
+    def testSplitStates(self):
+        (genome, reads) = simulate.simulate(100, 20, 5, repeatFraction=0.5, repeatLength=10, duplicateRate=0.2, seed=0)
+        readsList = model.initiateReadData(reads)
+        overlapGraph = model.OverlapGraph(readsList)
+        states = parallel.splitStates(readsList, overlapGraph, 2)
+        self.assertTrue(len(states))
+        stateKeys = set()
+        for partsList in states:
+            self.assertEqual(len(partsList), len(reads) - 2)
+            # each read is in exactly one part
+            self.assertEqual(sorted(i for part in partsList for (i, startIndex) in part.layout()), list(range(len(reads))))
+            stateKeys.add(frozenset(tuple(part.layout()) for part in partsList))
+        self.assertEqual(len(stateKeys), len(states))
+
+        # the first states in the search order, stopped before the second merge here
+        firstStates = parallel.splitStates(readsList, overlapGraph, 1)
+        self.assertGreater(len(firstStates), 10)
+        self.assertEqual(parallel.splitStates(readsList, overlapGraph, 2, 10), firstStates[:10])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+
+from src import assembly
+from src import index
+from src import model
+from src import simulate
+from src import strand
+
+
+class OrientReadsTest(unittest.TestCase):
+
+    def testSimulatedReverseReads(self):
+        for seed in range(5):
+            # no repeats, so the assembly is unique
+            (genome, reads) = simulate.simulate(500, 40, 8, seed=seed, reverseRate=0.5)
+            reverseGenome = index.reverseComplement(genome)
+            (orientedReads, isReversed, conflictsCount) = strand.orientReads(reads)
+            self.assertEqual(conflictsCount, 0)
+            self.assertTrue(any(isReversed))
+            # on the strand of the first read
+            sequence = genome if reads[0] in genome else reverseGenome
+            self.assertTrue(all(read in sequence for read in orientedReads))
+            self.assertEqual(orientedReads, [index.reverseComplement(read) if isReversed[i] else read for (i, read) in enumerate(reads)])
+            self.assertIn(assembly.assembleParts(model.initiateReadData(orientedReads)), [genome, reverseGenome])
+
+    def testRepeats(self):
+        for seed in range(5):
+            (genome, reads) = simulate.simulate(500, 40, 8, repeatFraction=0.3, repeatLength=20, duplicateRate=0.1, seed=seed, reverseRate=0.5)
+            (orientedReads, isReversed, conflictsCount) = strand.orientReads(reads)
+            self.assertEqual(conflictsCount, 0)
+            sequence = genome if reads[0] in genome else index.reverseComplement(genome)
+            self.assertTrue(all(read in sequence for read in orientedReads))
+
+    def testEncompassedRead(self):
+        # the first read is only linked to the read encompassing it, on the other strand
+        genome = 'GATCCTAAGGCACCTGATTCGGAGTTCCAACATCGTGCGATAGCTTAGCCGTCAAGTCTACGGTACGATTCAGCAAGCTTGCCTAGTGAACGGCAGGTCATTG'
+        reads = [index.reverseComplement(genome[20:60]), genome[10:70], genome[40:100]]
+        (orientedReads, isReversed, conflictsCount) = strand.orientReads(reads)
+        self.assertEqual((isReversed, conflictsCount), ([False, True, True], 0))
+
+    def testSameStrand(self):
+        (genome, reads) = simulate.simulate(300, 30, 6, seed=0)
+        (orientedReads, isReversed, conflictsCount) = strand.orientReads(reads, 8)
+        self.assertEqual((orientedReads, conflictsCount), (reads, 0))
+        self.assertFalse(any(isReversed))
+
+    def testReverseComplement(self):
+        self.assertEqual(index.reverseComplement('AACGTN'), 'NACGTT')
+        self.assertEqual(index.reverseComplement('acgg'), 'ccgt')
+
+
+if __name__ == '__main__':
+    unittest.main()
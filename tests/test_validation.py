@@ -0,0 +1,74 @@
+import random
+import unittest
+
+from src import simulate
+from src import test
+
+
+class ValidateAssemblyTest(unittest.TestCase):
+
+    def testSimulatedReferences(self):
+        rng = random.Random(0)
+        for seed in range(300):
+            genomeLength = rng.randint(30, 400)
+            readLength = rng.randint(8, min(60, genomeLength))
+            (genome, reads) = simulate.simulate(
+                genomeLength, readLength, rng.choice([3, 6, 10]),
+                repeatFraction=rng.choice([0.0, 0.3, 0.6, 0.9]),
+                repeatLength=rng.randint(3, readLength),
+                duplicateRate=rng.choice([0.0, 0.2]),
+                seed=seed
+            )
+            test.validateAssembly(genome, reads)
+
+    def testSeeds(self):
+        for seed in range(20):
+            (genome, reads) = simulate.simulate(300, 30, 6, repeatFraction=0.5, repeatLength=20, duplicateRate=0.1, seed=seed)
+            test.validateAssembly(genome, reads)
+
+    def testPlacement(self):
+        (genome, reads) = simulate.simulate(200, 20, 5, repeatFraction=0.6, repeatLength=15, duplicateRate=0.2, seed=4)
+        readsIndices = test.placeReads(genome, reads)
+        self.assertEqual(len(readsIndices), len(reads))
+        self.assertEqual(readsIndices, sorted(readsIndices))
+        self.assertEqual(readsIndices[0][0], 0)
+        self.assertEqual(max(indexTuple[1] for indexTuple in readsIndices), len(genome))
+        self.assertTrue(test.validateOverlapLengthEach(readsIndices))
+
+    def testReadsPositions(self):
+        (genome, reads) = simulate.simulate(300, 20, 6, repeatFraction=0.6, repeatLength=10, duplicateRate=0.2, seed=2)
+        readsPositions = test.findReadsPositions(genome, reads)
+        self.assertEqual(readsPositions, [test.findReadPosition(genome, read) for read in reads])
+        with self.assertRaises(AssertionError):
+            test.findReadsPositions(genome, reads + ['X'])
+
+    def testEncompassedReadAfterEnd(self):
+        reads = ['ABCDA', 'ABCCCD', 'CDACCB', 'CDABC', 'CCBCDA', 'CD', 'ABC', 'CCC', 'CCDA']
+        test.validateAssembly('ABCDACCBCDABCCCDA', reads)
+
+    def testCopies(self):
+        # each read is needed at two positions
+        with self.assertRaises(AssertionError):
+            test.validateAssembly('ABCABCABC', ['ABCA', 'CABC'])
+        test.validateAssembly('ABCABCABC', ['ABCA', 'CABC', 'ABCA', 'CABC'])
+
+    def testReadsOfDifferentLengths(self):
+        # 'ACA' fits nowhere on the shortest chain, so it has to be on the chain
+        test.validateAssembly('AACACAAACA', ['AACACAAACA', 'ACA', 'AAC', 'CACAAACA', 'ACA'])
+
+    def testMissingRead(self):
+        with self.assertRaises(AssertionError):
+            test.validateAssembly('ABCDEFGH', ['ABCDE', 'DEFGH', 'XYZ'])
+        self.assertFalse(test.isValidAssembly('ABCDEFGH', ['ABCDE', 'DEFGH', 'XYZ']))
+
+    def testCoverage(self):
+        with self.assertRaises(AssertionError):
+            test.validateAssembly('ABCDEFGH', ['ABCDE', 'CDEFG'])
+
+    def testOverlapLength(self):
+        with self.assertRaises(AssertionError):
+            test.validateAssembly('ABCDEFGH', ['ABCDE', 'EFGH'])
+
+
+if __name__ == '__main__':
+    unittest.main()